@@ -1,10 +1,16 @@
+import io
+
 from dotenv import load_dotenv
 from flask import Flask, jsonify, make_response, Response, request
 # from flask_cors import CORS
 
 from meal_max.models import kitchen_model
 from meal_max.models.battle_model import BattleModel
-from meal_max.utils.sql_utils import check_database_connection, check_table_exists
+from meal_max.utils.metrics import CONTENT_TYPE, instrument_app, render_metrics
+from meal_max.utils.random_utils import random_buffer
+from meal_max.utils.stream_parsers import iter_csv_records, iter_ndjson_records
+from meal_max.utils.sql_trace import get_sql_trace_stats
+from meal_max.utils.sql_utils import check_database_connection, check_table_exists, get_pool_stats
 
 
 # Load environment variables from .env file
@@ -16,6 +22,9 @@ app = Flask(__name__)
 # uncomment this
 # CORS(app)
 
+# Record request counts and latency for every route
+instrument_app(app)
+
 # Initialize the BattleModel
 battle_model = BattleModel()
 
@@ -58,6 +67,67 @@ def db_check() -> Response:
     except Exception as e:
         return make_response(jsonify({'error': str(e)}), 404)
 
+@app.route('/metrics', methods=['GET'])
+def metrics() -> Response:
+    """
+    Route to expose request, database and random.org metrics to Prometheus.
+
+    Returns:
+        The metrics in the Prometheus text exposition format.
+    """
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+@app.route('/api/sql-trace-stats', methods=['GET'])
+def sql_trace_stats() -> Response:
+    """
+    Route to get per-statement timings collected when SQL_TRACE is enabled.
+
+    Query Parameter:
+        - limit (int, optional): Return only this many statements, slowest total time first.
+
+    Returns:
+        JSON response with the count, total, mean, p99 and max time of each statement template.
+    """
+    app.logger.info('Retrieving SQL trace stats')
+    try:
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError:
+        return make_response(jsonify({'error': 'limit must be an integer'}), 400)
+    return make_response(jsonify({'status': 'success', 'statements': get_sql_trace_stats(limit)}), 200)
+
+@app.route('/api/db-pool-stats', methods=['GET'])
+def db_pool_stats() -> Response:
+    """
+    Route to get the usage counters of the database connection pool.
+
+    Returns:
+        JSON response with the pool size, connections in use and wait counts.
+    """
+    app.logger.info('Retrieving database pool stats')
+    return make_response(jsonify({'status': 'success', 'pool': get_pool_stats()}), 200)
+
+@app.route('/api/meal-cache-stats', methods=['GET'])
+def meal_cache_stats() -> Response:
+    """
+    Route to get the counters of the meal lookup cache.
+
+    Returns:
+        JSON response with the cache size, hits, misses and evictions.
+    """
+    app.logger.info('Retrieving meal cache stats')
+    return make_response(jsonify({'status': 'success', 'meal_cache': kitchen_model.get_meal_cache_stats()}), 200)
+
+@app.route('/api/random-buffer-stats', methods=['GET'])
+def random_buffer_stats() -> Response:
+    """
+    Route to get the metrics of the prefetching random number buffer.
+
+    Returns:
+        JSON response with the buffer level, underruns and refill latencies.
+    """
+    app.logger.info('Retrieving random buffer stats')
+    return make_response(jsonify({'status': 'success', 'random_buffer': random_buffer.stats()}), 200)
+
 
 ##########################################################
 #
@@ -115,6 +185,43 @@ def add_meal() -> Response:
         app.logger.error("Failed to add combatant: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/import-meals', methods=['POST'])
+def import_meals() -> Response:
+    """
+    Route to bulk import meals from a CSV or NDJSON request body.
+
+    The body is parsed as it is read, so uploads of any size use constant memory.
+    CSV bodies need a header row naming the meal, cuisine, price and difficulty columns;
+    NDJSON bodies hold one JSON object with those keys per line.
+
+    Query Parameter:
+        - format (str, optional): 'csv' or 'ndjson'. Defaults to the request content type.
+        - upsert (bool, optional): If true, update existing meals instead of reporting duplicates.
+
+    Returns:
+        JSON response with the import counts and the row numbers of rejected rows.
+    Raises:
+        400 error if the format is not supported.
+        500 error if there is an issue writing to the database.
+    """
+    app.logger.info('Bulk importing meals')
+    try:
+        upsert = request.args.get('upsert', 'false').lower() == 'true'
+        body_format = request.args.get('format') or request.mimetype.split('/')[-1]
+        if body_format == 'csv':
+            records = iter_csv_records(io.TextIOWrapper(request.stream, encoding='utf-8', newline=''))
+        elif body_format in ('ndjson', 'x-ndjson', 'jsonl'):
+            records = iter_ndjson_records(request.stream)
+        else:
+            return make_response(jsonify({'error': 'Unsupported format, use csv or ndjson'}), 400)
+
+        summary = kitchen_model.import_meals(records, upsert=upsert)
+        app.logger.info("Imported meals: %d inserted, %d updated", summary['inserted'], summary['updated'])
+        return make_response(jsonify({'status': 'success', **summary}), 200)
+    except Exception as e:
+        app.logger.error("Failed to import meals: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/delete-meal/<int:meal_id>', methods=['DELETE'])
 def delete_meal(meal_id: int) -> Response:
     """
@@ -150,7 +257,7 @@ def get_meal_by_id(meal_id: int) -> Response:
         app.logger.info(f"Retrieving meal by ID: {meal_id}")
 
         meal = kitchen_model.get_meal_by_id(meal_id)
-        return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
+        return make_response(jsonify({'status': 'success', 'meal': meal.to_dict()}), 200)
     except Exception as e:
         app.logger.error(f"Error retrieving meal by ID: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
@@ -173,7 +280,7 @@ def get_meal_by_name(meal_name: str) -> Response:
             return make_response(jsonify({'error': 'Meal name is required'}), 400)
 
         meal = kitchen_model.get_meal_by_name(meal_name)
-        return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
+        return make_response(jsonify({'status': 'success', 'meal': meal.to_dict()}), 200)
     except Exception as e:
         app.logger.error(f"Error retrieving meal by name: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
@@ -206,6 +313,37 @@ def battle() -> Response:
         app.logger.error(f"Battle error: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/battle-batch', methods=['POST'])
+def battle_batch() -> Response:
+    """
+    Route to run many battles between pairs of meals in one request.
+
+    Expected JSON Input:
+        - matchups (list): A list of [meal, meal] name pairs.
+
+    Returns:
+        JSON response with the winner of each matchup, in order.
+    Raises:
+        400 error if the matchups are missing or malformed.
+        500 error if there is an issue during the battles.
+    """
+    try:
+        data = request.get_json()
+        matchups = data.get('matchups') if data else None
+
+        if not isinstance(matchups, list) or not all(isinstance(matchup, list) and len(matchup) == 2 for matchup in matchups):
+            return make_response(jsonify({'error': 'matchups must be a list of [meal, meal] pairs'}), 400)
+
+        app.logger.info('Running a batch of %d battles', len(matchups))
+
+        meals = kitchen_model.get_meals_by_names(name for matchup in matchups for name in matchup)
+        winners = battle_model.battle_batch([(meals[name_1], meals[name_2]) for name_1, name_2 in matchups])
+
+        return make_response(jsonify({'status': 'battles complete', 'winners': winners}), 200)
+    except Exception as e:
+        app.logger.error(f"Battle batch error: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/clear-combatants', methods=['POST'])
 def clear_combatants() -> Response:
     """
@@ -236,7 +374,7 @@ def get_combatants() -> Response:
     try:
         app.logger.info('Getting combatants...')
         combatants = battle_model.get_combatants()
-        return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
+        return make_response(jsonify({'status': 'success', 'combatants': [meal.to_dict() for meal in combatants]}), 200)
     except Exception as e:
         app.logger.error("Failed to get combatants: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
@@ -269,7 +407,7 @@ def prep_combatant() -> Response:
         except Exception as e:
             app.logger.error("Failed to prepare combatant: %s", str(e))
             return make_response(jsonify({'error': str(e)}), 500)
-        return make_response(jsonify({'status': 'combatant prepared', 'combatants': combatants}), 200)
+        return make_response(jsonify({'status': 'combatant prepared', 'combatants': [meal.to_dict() for meal in combatants]}), 200)
 
     except Exception as e:
         app.logger.error("Failed to prepare combatants: %s", str(e))
@@ -290,17 +428,26 @@ def get_leaderboard() -> Response:
 
     Query Parameters:
         - sort (str): The field to sort by ('wins', 'battles', or 'win_pct'). Default is 'wins'.
+        - limit (int, optional): The maximum number of meals to return. Default is all of them.
+        - offset (int, optional): The number of top-ranked meals to skip. Default is 0.
 
     Returns:
         JSON response with a sorted leaderboard of meals.
     Raises:
+        400 error if limit or offset is not a valid integer.
         500 error if there is an issue generating the leaderboard.
     """
     try:
         sort_by = request.args.get('sort', 'wins')  # Default sort by wins
-        app.logger.info("Generating leaderboard sorted by %s", sort_by)
-
-        leaderboard_data = kitchen_model.get_leaderboard(sort_by)
+        try:
+            limit = request.args.get('limit')
+            limit = int(limit) if limit is not None else None
+            offset = int(request.args.get('offset', 0))
+        except ValueError:
+            return make_response(jsonify({'error': 'limit and offset must be integers'}), 400)
+        app.logger.info("Generating leaderboard sorted by %s (limit=%s, offset=%d)", sort_by, limit, offset)
+
+        leaderboard_data = kitchen_model.get_leaderboard(sort_by, limit=limit, offset=offset)
 
         return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
     except Exception as e:
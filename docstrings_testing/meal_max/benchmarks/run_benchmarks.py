@@ -0,0 +1,188 @@
+"""
+Benchmarks for the meal_max model and endpoint hot paths.
+
+Each size runs against a fresh temporary SQLite database seeded with that many
+meals, with random.org replaced by a local random source. Results are written
+as JSON so they can be compared between releases.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 1000000 --repeat 5 --output results.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+# The modules read their settings at import time, so point them at the
+# benchmark database and silence per-call logging before importing them.
+WORK_DIR = tempfile.mkdtemp(prefix="meal_max_bench_")
+DB_PATH = os.path.join(WORK_DIR, "meal_max.db")
+CREATE_TABLE_PATH = os.path.join(APP_DIR, "sql", "create_meal_table.sql")
+os.environ["DB_PATH"] = DB_PATH
+os.environ["SQL_CREATE_TABLE_PATH"] = CREATE_TABLE_PATH
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from app import app  # noqa: E402
+from meal_max.models import kitchen_model  # noqa: E402
+from meal_max.models.battle_model import BattleModel  # noqa: E402
+from meal_max.utils import random_utils  # noqa: E402
+
+CUISINES = ["Italian", "Mexican", "Japanese", "Indian", "French", "Thai"]
+DIFFICULTIES = ["LOW", "MED", "HIGH"]
+
+
+def stub_random_source(seed: int = 411) -> None:
+    """
+    Replaces random.org with a seeded local generator.
+    """
+    rng = random.Random(seed)
+    random_utils.random_buffer._fetch = lambda num: [round(rng.random(), 2) for _ in range(num)]
+
+
+def seed_database(size: int, seed: int = 411) -> None:
+    """
+    Recreates the schema and inserts `size` meals with random battle records.
+    """
+    rng = random.Random(seed)
+    with open(CREATE_TABLE_PATH) as fh:
+        script = fh.read()
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.executescript(script)
+
+        def meals():
+            for meal_id in range(1, size + 1):
+                battles = rng.randint(0, 50)
+                yield (f"Meal {meal_id}", rng.choice(CUISINES), round(rng.uniform(1, 50), 2),
+                       rng.choice(DIFFICULTIES), battles, rng.randint(0, battles))
+
+        conn.executemany(
+            "INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES (?, ?, ?, ?, ?, ?)",
+            meals()
+        )
+        conn.execute("""
+            INSERT INTO meal_leaderboard (meal_id, battles, wins, win_pct)
+            SELECT id, battles, wins, wins * 1.0 / battles FROM meals WHERE battles > 0
+        """)
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    kitchen_model.meal_cache.clear()
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> dict:
+    """
+    Times `fn` `repeat` times after one warm-up call and returns summary statistics in seconds.
+    """
+    if setup:
+        setup()
+    fn()
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "max": max(timings),
+    }
+
+
+def run_size(size: int, repeat: int) -> List[dict]:
+    """
+    Seeds a database with `size` meals and runs every benchmark against it.
+    """
+    seed_database(size)
+    stub_random_source()
+    rng = random.Random(size)
+    client = app.test_client()
+    battle_model = BattleModel()
+
+    def random_meal() -> kitchen_model.Meal:
+        meal_id = rng.randint(1, size)
+        return kitchen_model.Meal(id=meal_id, meal=f"Meal {meal_id}", cuisine="Italian", price=10.0, difficulty="MED")
+
+    def prep_battle() -> None:
+        battle_model.clear_combatants()
+        battle_model.prep_combatant(random_meal())
+        battle_model.prep_combatant(random_meal())
+
+    def expect_ok(response) -> None:
+        if response.status_code >= 400:
+            raise RuntimeError(f"Benchmark request failed with {response.status_code}: {response.get_data(as_text=True)}")
+
+    benchmarks = {
+        "model.get_leaderboard[wins,limit=10]": (lambda: kitchen_model.get_leaderboard("wins", limit=10), None),
+        "model.get_leaderboard[win_pct,limit=10]": (lambda: kitchen_model.get_leaderboard("win_pct", limit=10), None),
+        "model.get_leaderboard[wins,all]": (lambda: kitchen_model.get_leaderboard("wins"), None),
+        "model.get_meal_by_id[uncached]": (lambda: kitchen_model.get_meal_by_id(rng.randint(1, size)),
+                                            kitchen_model.meal_cache.clear),
+        "model.get_meal_by_name[cached]": (lambda: kitchen_model.get_meal_by_name("Meal 1"), None),
+        "model.battle": (battle_model.battle, prep_battle),
+        "model.battle_batch[100]": (lambda: battle_model.battle_batch([(random_meal(), random_meal()) for _ in range(100)]), None),
+        "http.leaderboard[limit=10]": (lambda: expect_ok(client.get("/api/leaderboard?sort=wins&limit=10")), None),
+        "http.get_meal_by_id": (lambda: expect_ok(client.get(f"/api/get-meal-by-id/{rng.randint(1, size)}")), None),
+        "http.battle": (lambda: expect_ok(client.get("/api/battle")),
+                        lambda: (client.post("/api/clear-combatants"),
+                                 client.post("/api/prep-combatant", json={"meal": f"Meal {rng.randint(1, size)}"}),
+                                 client.post("/api/prep-combatant", json={"meal": f"Meal {rng.randint(1, size)}"}))),
+    }
+
+    results = []
+    for name, (fn, setup) in benchmarks.items():
+        stats = measure(fn, repeat, setup)
+        results.append({"benchmark": name, "size": size, **stats})
+        print(f"{name:<45} size={size:<8} median={stats['median'] * 1000:9.3f} ms", file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the meal_max hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="Numbers of meals to seed (e.g. 1000 100000 1000000).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark.")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    args = parser.parse_args()
+
+    results = []
+    try:
+        for size in args.sizes:
+            results.extend(run_size(size, args.repeat))
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    report = {
+        "app": "meal_max",
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
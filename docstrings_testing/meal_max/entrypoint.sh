@@ -13,5 +13,9 @@ else
     echo "Skipping database creation."
 fi
 
+# Upgrade an existing database to the latest schema; this never drops data
+echo "Applying database migrations..."
+python -m meal_max.utils.migrations || exit 1
+
 # Start the Python application
 exec python app.py
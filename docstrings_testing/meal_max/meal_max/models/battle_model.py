@@ -1,9 +1,9 @@
 import logging
-from typing import List
+from typing import List, Tuple
 
-from meal_max.models.kitchen_model import Meal, update_meal_stats
+from meal_max.models.kitchen_model import Meal, update_meal_stats, update_meal_stats_batch
 from meal_max.utils.logger import configure_logger
-from meal_max.utils.random_utils import get_random
+from meal_max.utils.random_utils import get_buffered_random, random_buffer
 
 
 logger = logging.getLogger(__name__)
@@ -64,8 +64,8 @@ class BattleModel:
         # Log the delta and normalized delta
         logger.info("Delta between scores: %.3f", delta)
 
-        # Get random number from random.org
-        random_number = get_random()
+        # Get random number prefetched from random.org
+        random_number = get_buffered_random()
 
         # Log the random number
         logger.info("Random number from random.org: %.3f", random_number)
@@ -90,6 +90,51 @@ class BattleModel:
 
         return winner.meal
 
+    def battle_batch(self, matchups: List[Tuple[Meal, Meal]]) -> List[str]:
+        """
+        Runs many independent battles at once, without touching the combatants list.
+
+        Scores for every meal are computed in one pass, all random numbers are
+        drawn in one request and all stats are written in one transaction.
+
+        Args:
+            matchups (List[Tuple[Meal, Meal]]): The pairs of meals to battle.
+
+        Returns:
+            List[str]: The name of the winning meal of each matchup, in order.
+
+        Raises:
+            ValueError: When a matchup does not have exactly two combatants
+        """
+        if any(len(matchup) != 2 for matchup in matchups):
+            logger.error("Every matchup in a battle batch needs exactly two combatants.")
+            raise ValueError("Every matchup must have exactly two combatants.")
+        if not matchups:
+            return []
+
+        logger.info("Running a batch of %d battles", len(matchups))
+
+        scores_1 = self.get_battle_scores([matchup[0] for matchup in matchups])
+        scores_2 = self.get_battle_scores([matchup[1] for matchup in matchups])
+        deltas = [abs(score_1 - score_2) / 100 for score_1, score_2 in zip(scores_1, scores_2)]
+        random_numbers = random_buffer.get_many(len(matchups))
+
+        winners = []
+        results = []
+        for (combatant_1, combatant_2), delta, random_number in zip(matchups, deltas, random_numbers):
+            if delta > random_number:
+                winner, loser = combatant_1, combatant_2
+            else:
+                winner, loser = combatant_2, combatant_1
+            winners.append(winner.meal)
+            results.append((winner.id, 'win'))
+            results.append((loser.id, 'loss'))
+
+        update_meal_stats_batch(results)
+
+        logger.info("Finished a batch of %d battles", len(matchups))
+        return winners
+
     def clear_combatants(self):
         """
         Clear the combatants list. 
@@ -118,6 +163,19 @@ class BattleModel:
 
         return score
 
+    def get_battle_scores(self, combatants: List[Meal]) -> List[float]:
+        """
+        Compute the battle scores of many combatants in one pass, using the same formula as get_battle_score.
+
+        Args:
+            combatants (List[Meal]): the (combatant) meals which the battle scores are to be calculated for
+        """
+        difficulty_modifier = {"HIGH": 1, "MED": 2, "LOW": 3}
+        return [
+            (combatant.price * len(combatant.cuisine)) - difficulty_modifier[combatant.difficulty]
+            for combatant in combatants
+        ]
+
     def get_combatants(self) -> List[Meal]:
         """ 
         Returns the list of meal combatants that participate in the battle
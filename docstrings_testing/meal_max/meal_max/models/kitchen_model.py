@@ -1,19 +1,43 @@
+from collections import defaultdict
 from dataclasses import dataclass
 import logging
+import math
 import os
 import sqlite3
-from typing import Any
+from typing import Any, Dict, Iterable, List, NoReturn, Optional, Tuple
 
+from meal_max.utils.cache import LRUCache
 from meal_max.utils.sql_utils import get_db_connection
 from meal_max.utils.logger import configure_logger
+from meal_max.utils.metrics import timed_db
 
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+SQL_PARAMETER_CHUNK_SIZE = 500
+
+# Read-through cache for meal lookups by id and by name. The cache is per process,
+# so with several workers the TTL bounds how long another worker's delete goes unseen.
+MEAL_CACHE_SIZE = int(os.getenv("MEAL_CACHE_SIZE", "256"))
+MEAL_CACHE_TTL = float(os.getenv("MEAL_CACHE_TTL", "30"))
+
+meal_cache = LRUCache(MEAL_CACHE_SIZE, MEAL_CACHE_TTL)
+
+# Bulk import: rows per transaction, and how many row problems are reported individually
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+IMPORT_MAX_REPORTED_ISSUES = int(os.getenv("IMPORT_MAX_REPORTED_ISSUES", "1000"))
+
+VALID_DIFFICULTIES = frozenset(['LOW', 'MED', 'HIGH'])
+
+
 @dataclass
 class Meal:
+    # Slots instead of a per-instance __dict__: caches and battles hold many meals
+    __slots__ = ("id", "meal", "cuisine", "price", "difficulty")
+
     id: int
     meal: str
     cuisine: str
@@ -29,8 +53,27 @@ class Meal:
         if self.difficulty not in ['LOW', 'MED', 'HIGH']:
             raise ValueError("Difficulty must be 'LOW', 'MED', or 'HIGH'.")
 
+    @classmethod
+    def from_row(cls, row: Tuple[int, str, str, float, str]) -> "Meal":
+        """
+        Builds a meal from a trusted (id, meal, cuisine, price, difficulty) row without validating it.
+
+        Only use this for rows read back from the meals table, whose values were
+        validated when they were written.
+        """
+        meal = object.__new__(cls)
+        meal.id, meal.meal, meal.cuisine, meal.price, meal.difficulty = row
+        return meal
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the meal's fields as a dictionary, for JSON responses.
+        """
+        return {'id': self.id, 'meal': self.meal, 'cuisine': self.cuisine,
+                'price': self.price, 'difficulty': self.difficulty}
 
 
+@timed_db
 def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
     """
     Creates and adds a new meal to the database.
@@ -65,6 +108,7 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
                 VALUES (?, ?, ?, ?)
             """, (meal, cuisine, price, difficulty))
             conn.commit()
+            meal_cache.invalidate(("name", meal))
 
             logger.info("Meal successfully added to the database: %s", meal)
 
@@ -77,6 +121,162 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
         raise e
 
 
+def _validate_meal_records(records: List[Tuple[int, Any]]) -> Tuple[List[Tuple[int, Tuple[str, str, float, str]]], List[Tuple[int, str]]]:
+    """
+    Validates a chunk of imported records in a single pass, with the same rules as create_meal.
+
+    Args:
+        records (List[Tuple[int, Any]]): (row number, record) pairs, where the record is a mapping
+            of meal fields or the ValueError raised while parsing its line.
+
+    Returns:
+        Tuple[List, List]: The valid (row number, (meal, cuisine, price, difficulty)) rows,
+            and the (row number, error) pairs of the invalid ones.
+    """
+    rows = []
+    invalid = []
+    for row_number, record in records:
+        if isinstance(record, ValueError):
+            invalid.append((row_number, str(record)))
+            continue
+        meal, cuisine, price, difficulty = (record.get(field) for field in ("meal", "cuisine", "price", "difficulty"))
+        if not isinstance(meal, str) or not meal.strip():
+            invalid.append((row_number, "Missing or invalid meal"))
+            continue
+        if not isinstance(cuisine, str) or not cuisine.strip():
+            invalid.append((row_number, "Missing or invalid cuisine"))
+            continue
+        if isinstance(price, str):
+            try:
+                price = float(price)
+            except ValueError:
+                pass
+        if not isinstance(price, (int, float)) or isinstance(price, bool) or not math.isfinite(price) or price <= 0:
+            invalid.append((row_number, f"Invalid price: {price}. Price must be a positive number."))
+            continue
+        if difficulty not in VALID_DIFFICULTIES:
+            invalid.append((row_number, f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'."))
+            continue
+        rows.append((row_number, (meal, cuisine, float(price), difficulty)))
+    return rows, invalid
+
+@timed_db
+def import_meals(records: Iterable[Tuple[int, Any]], upsert: bool = False, chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Bulk inserts meals from a stream of parsed records.
+
+    Records are validated per chunk and written with executemany, one transaction per
+    chunk. Without `upsert`, rows whose name already exists (or repeats an earlier row)
+    are skipped and reported as duplicates. With `upsert`, they update the cuisine,
+    price and difficulty of the existing meal instead, so re-running an import is
+    idempotent. Deleted meals are never revived. Only one chunk is held in memory at a time.
+
+    Args:
+        records (Iterable[Tuple[int, Any]]): (row number, record) pairs, where the record is
+            a mapping of meal fields or the ValueError raised while parsing its line.
+        upsert (bool): If True, update existing meals instead of reporting them as duplicates.
+        chunk_size (int): The number of rows written per transaction.
+
+    Returns:
+        Dict[str, Any]: The counts of rows read, inserted, updated, duplicate and invalid,
+            plus up to IMPORT_MAX_REPORTED_ISSUES issues of the form {'row', 'error'}.
+
+    Raises:
+        sqlite3.Error: If a database error occurs. Chunks committed before the error are kept.
+    """
+    summary: Dict[str, Any] = {'rows': 0, 'inserted': 0, 'updated': 0, 'duplicates': 0, 'invalid': 0,
+                               'issues': [], 'issues_truncated': False}
+
+    def report(row_number: int, error: str) -> None:
+        if len(summary['issues']) < IMPORT_MAX_REPORTED_ISSUES:
+            summary['issues'].append({'row': row_number, 'error': error})
+        else:
+            summary['issues_truncated'] = True
+
+    def write_chunk(cursor: sqlite3.Cursor, conn: sqlite3.Connection, chunk: List[Tuple[int, Any]]) -> None:
+        rows, invalid = _validate_meal_records(chunk)
+        summary['invalid'] += len(invalid)
+        for row_number, error in invalid:
+            report(row_number, error)
+
+        # Look up which of the names already exist, and whether they are deleted
+        names = list(dict.fromkeys(row[0] for _, row in rows))
+        deleted_by_name: Dict[str, bool] = {}
+        for start in range(0, len(names), SQL_PARAMETER_CHUNK_SIZE):
+            name_chunk = names[start:start + SQL_PARAMETER_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in name_chunk)
+            cursor.execute(f"SELECT meal, deleted FROM meals WHERE meal IN ({placeholders})", name_chunk)
+            deleted_by_name.update((meal, bool(deleted)) for meal, deleted in cursor.fetchall())
+
+        writes = []
+        updated_names = set()
+        for row_number, row in rows:
+            meal = row[0]
+            if deleted_by_name.get(meal):
+                summary['duplicates'] += 1
+                report(row_number, f"Meal with name '{meal}' has been deleted")
+            elif meal not in deleted_by_name:
+                summary['inserted'] += 1
+                deleted_by_name[meal] = False
+                writes.append(row)
+            elif upsert:
+                summary['updated'] += 1
+                updated_names.add(meal)
+                writes.append(row)
+            else:
+                summary['duplicates'] += 1
+                report(row_number, f"Meal with name '{meal}' already exists")
+
+        if writes:
+            if upsert:
+                cursor.executemany("""
+                    INSERT INTO meals (meal, cuisine, price, difficulty)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(meal) DO UPDATE SET
+                        cuisine = excluded.cuisine,
+                        price = excluded.price,
+                        difficulty = excluded.difficulty
+                    WHERE deleted = FALSE
+                """, writes)
+            else:
+                # DO NOTHING covers meals inserted by another writer since the check above
+                cursor.executemany("""
+                    INSERT INTO meals (meal, cuisine, price, difficulty)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(meal) DO NOTHING
+                """, writes)
+                lost = len(writes) - cursor.rowcount
+                summary['inserted'] -= lost
+                summary['duplicates'] += lost
+        conn.commit()
+
+        if updated_names:
+            meal_cache.invalidate_where(lambda cached: cached.meal in updated_names)
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Starting bulk meal import in chunks of %d (upsert=%s)", chunk_size, upsert)
+
+            chunk: List[Tuple[int, Any]] = []
+            for record in records:
+                summary['rows'] += 1
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    write_chunk(cursor, conn, chunk)
+                    chunk = []
+            if chunk:
+                write_chunk(cursor, conn, chunk)
+
+    except sqlite3.Error as e:
+        logger.error("Database error during bulk meal import: %s", str(e))
+        raise e
+
+    logger.info("Imported %d rows: %d inserted, %d updated, %d duplicates, %d invalid",
+                summary['rows'], summary['inserted'], summary['updated'], summary['duplicates'], summary['invalid'])
+    return summary
+
+@timed_db
 def clear_meals() -> None:
     """
     Recreates the meals table, effectively deleting all meals.
@@ -90,11 +290,34 @@ def clear_meals() -> None:
             cursor = conn.cursor()
             cursor.executescript(create_table_script)
             conn.commit()
+            meal_cache.clear()
             logger.info("Meals cleared successfully.")
     except sqlite3.Error as e:
         logger.error("Database error while clearing meals: %s", str(e))
         raise e
 
+def _raise_unavailable_meal(cursor: sqlite3.Cursor, meal_id: int) -> NoReturn:
+    """
+    Explains why a conditional write matched no live meal.
+
+    Only called after an UPDATE ... WHERE deleted = FALSE touched no row, so
+    the common path needs no separate existence check.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the failed write.
+        meal_id (int): The id number of the meal.
+
+    Raises:
+        ValueError: If the meal has been deleted or does not exist.
+    """
+    cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
+    if cursor.fetchone() is None:
+        logger.info("Meal with ID %s not found", meal_id)
+        raise ValueError(f"Meal with ID {meal_id} not found")
+    logger.info("Meal with ID %s has been deleted", meal_id)
+    raise ValueError(f"Meal with ID {meal_id} has been deleted")
+
+@timed_db
 def delete_meal(meal_id: int) -> None:
     """
     Marks a meal as deleted in the database.
@@ -114,18 +337,15 @@ def delete_meal(meal_id: int) -> None:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
-            try:
-                deleted = cursor.fetchone()[0]
-                if deleted:
-                    logger.info("Meal with ID %s has already been deleted", meal_id)
-                    raise ValueError(f"Meal with ID {meal_id} has been deleted")
-            except TypeError:
-                logger.info("Meal with ID %s not found", meal_id)
-                raise ValueError(f"Meal with ID {meal_id} not found")
+            cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ? AND deleted = FALSE RETURNING meal", (meal_id,))
+            row = cursor.fetchone()
+            if row is None:
+                _raise_unavailable_meal(cursor, meal_id)
 
-            cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ?", (meal_id,))
+            cursor.execute("DELETE FROM meal_leaderboard WHERE meal_id = ?", (meal_id,))
             conn.commit()
+            meal_cache.invalidate(("id", meal_id))
+            meal_cache.invalidate(("name", row[0]))
 
             logger.info("Meal with ID %s marked as deleted.", meal_id)
 
@@ -133,39 +353,53 @@ def delete_meal(meal_id: int) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
-def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
+@timed_db
+def get_leaderboard(sort_by: str="wins", limit: Optional[int]=None, offset: int=0) -> list[dict[str, Any]]:
     """
     Gets the meal leaderboard sorted by either wins or wins percentage.
 
+    Reads the meal_leaderboard summary table, which update_meal_stats keeps
+    current, so a page is served by walking an index instead of scanning and
+    sorting the meals table.
+
     Args:
         sort_by (str): Determines the sorting criteria for the leaderboard, defaulting to "wins".
+        limit (Optional[int]): The maximum number of meals to return, defaulting to all of them.
+        offset (int): The number of top-ranked meals to skip, defaulting to 0.
 
     Raises:
-        ValueError: If `sort_by` is not 'wins' or 'win_pct'.
+        ValueError: If `sort_by` is not 'wins' or 'win_pct', or if `limit` or
+            `offset` is negative.
         sqlite3.Error: If a database error occurs.
 
     Returns:
-        dict: A dictionary where each key is a string category, and each value 
-            is a row correlating to that category.
+        list: A list of dictionaries, one per ranked meal, with its battle
+            stats and win percentage.
 
     """
     query = """
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
+        SELECT m.id, m.meal, m.cuisine, m.price, m.difficulty, l.battles, l.wins, l.win_pct
+        FROM meal_leaderboard l JOIN meals m ON m.id = l.meal_id
     """
 
     if sort_by == "win_pct":
-        query += " ORDER BY win_pct DESC"
+        query += " ORDER BY l.win_pct DESC, l.meal_id"
     elif sort_by == "wins":
-        query += " ORDER BY wins DESC"
+        query += " ORDER BY l.wins DESC, l.meal_id"
     else:
         logger.error("Invalid sort_by parameter: %s", sort_by)
         raise ValueError("Invalid sort_by parameter: %s" % sort_by)
 
+    if (limit is not None and limit < 0) or offset < 0:
+        logger.error("Invalid leaderboard page: limit=%s, offset=%s", limit, offset)
+        raise ValueError("Leaderboard limit and offset must not be negative")
+
+    query += " LIMIT ? OFFSET ?"
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query)
+            cursor.execute(query, (-1 if limit is None else limit, offset))
             rows = cursor.fetchall()
 
         leaderboard = []
@@ -189,6 +423,19 @@ def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
         logger.error("Database error: %s", str(e))
         raise e
 
+def _cache_meal(meal: Meal, generation: int) -> None:
+    """
+    Caches a live meal under both its id and its name, unless the cache was invalidated since `generation` was read.
+    """
+    meal_cache.put(("id", meal.id), meal, generation)
+    meal_cache.put(("name", meal.meal), meal, generation)
+
+def get_meal_cache_stats() -> dict:
+    """
+    Returns the hit, miss and eviction counters of the meal lookup cache.
+    """
+    return meal_cache.stats()
+
 def get_meal_by_id(meal_id: int) -> Meal:
     """
     Gets a meal based on its id.
@@ -203,6 +450,20 @@ def get_meal_by_id(meal_id: int) -> Meal:
     Returns:
         Meal: The meal object with the specified id.
 
+    """
+    hit, meal = meal_cache.get(("id", meal_id))
+    if hit:
+        return meal
+    # Taken before the read, so a delete that lands in between keeps the meal out of the cache
+    generation = meal_cache.generation
+    meal = _fetch_meal_by_id(meal_id)
+    _cache_meal(meal, generation)
+    return meal
+
+@timed_db
+def _fetch_meal_by_id(meal_id: int) -> Meal:
+    """
+    Reads a meal by id from the database; see get_meal_by_id.
     """
     try:
         with get_db_connection() as conn:
@@ -214,7 +475,7 @@ def get_meal_by_id(meal_id: int) -> Meal:
                 if row[5]:
                     logger.info("Meal with ID %s has been deleted", meal_id)
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                return Meal.from_row(row[:5])
             else:
                 logger.info("Meal with ID %s not found", meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
@@ -238,6 +499,20 @@ def get_meal_by_name(meal_name: str) -> Meal:
     Returns:
         Meal: The meal object with the specified name.
 
+    """
+    hit, meal = meal_cache.get(("name", meal_name))
+    if hit:
+        return meal
+    # Taken before the read, so a delete that lands in between keeps the meal out of the cache
+    generation = meal_cache.generation
+    meal = _fetch_meal_by_name(meal_name)
+    _cache_meal(meal, generation)
+    return meal
+
+@timed_db
+def _fetch_meal_by_name(meal_name: str) -> Meal:
+    """
+    Reads a meal by name from the database; see get_meal_by_name.
     """
     try:
         with get_db_connection() as conn:
@@ -249,7 +524,7 @@ def get_meal_by_name(meal_name: str) -> Meal:
                 if row[5]:
                     logger.info("Meal with name %s has been deleted", meal_name)
                     raise ValueError(f"Meal with name {meal_name} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                return Meal.from_row(row[:5])
             else:
                 logger.info("Meal with name %s not found", meal_name)
                 raise ValueError(f"Meal with name {meal_name} not found")
@@ -259,6 +534,53 @@ def get_meal_by_name(meal_name: str) -> Meal:
         raise e
 
 
+@timed_db
+def get_meals_by_names(meal_names: Iterable[str]) -> Dict[str, Meal]:
+    """
+    Gets several meals by name with set-based queries.
+
+    Args:
+        meal_names (Iterable[str]): The names of the meals to get.
+
+    Raises:
+        ValueError: If any of the meals is deleted or not found.
+        sqlite3.Error: If a database error occurs.
+
+    Returns:
+        Dict[str, Meal]: The meal object for each requested name.
+
+    """
+    unique_names = list(dict.fromkeys(meal_names))
+    try:
+        rows = []
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(unique_names), SQL_PARAMETER_CHUNK_SIZE):
+                chunk = unique_names[start:start + SQL_PARAMETER_CHUNK_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor.execute(f"SELECT id, meal, cuisine, price, difficulty, deleted FROM meals WHERE meal IN ({placeholders})", chunk)
+                rows.extend(cursor.fetchall())
+
+        meals = {}
+        for row in rows:
+            if row[5]:
+                logger.info("Meal with name %s has been deleted", row[1])
+                raise ValueError(f"Meal with name {row[1]} has been deleted")
+            meals[row[1]] = Meal.from_row(row[:5])
+
+        for meal_name in unique_names:
+            if meal_name not in meals:
+                logger.info("Meal with name %s not found", meal_name)
+                raise ValueError(f"Meal with name {meal_name} not found")
+
+        return meals
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+@timed_db
 def update_meal_stats(meal_id: int, result: str) -> None:
     """
     Updates the battle stats for a meal based on the result.
@@ -276,28 +598,104 @@ def update_meal_stats(meal_id: int, result: str) -> None:
         None
 
     """
+    if result not in ('win', 'loss'):
+        raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
-            try:
-                deleted = cursor.fetchone()[0]
-                if deleted:
+            cursor.execute("""
+                UPDATE meals SET battles = battles + 1, wins = wins + ?
+                WHERE id = ? AND deleted = FALSE
+                RETURNING battles, wins
+            """, (1 if result == 'win' else 0, meal_id))
+            row = cursor.fetchone()
+            if row is None:
+                _raise_unavailable_meal(cursor, meal_id)
+
+            # Keep the leaderboard summary in step with the new stats
+            battles, wins = row
+            cursor.execute("""
+                INSERT INTO meal_leaderboard (meal_id, battles, wins, win_pct)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(meal_id) DO UPDATE SET
+                    battles = excluded.battles, wins = excluded.wins, win_pct = excluded.win_pct
+            """, (meal_id, battles, wins, wins / battles))
+
+            conn.commit()
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+@timed_db
+def update_meal_stats_batch(results: Iterable[Tuple[int, str]]) -> None:
+    """
+    Updates the battle stats for many meals in a single transaction.
+
+    Results for the same meal are aggregated, and the leaderboard summary is
+    refreshed once per meal.
+
+    Args:
+        results (Iterable[Tuple[int, str]]): (meal_id, result) pairs, where
+            result is either 'win' or 'loss'.
+
+    Raises:
+        ValueError: If any meal is deleted or not found, or if any result is
+            not 'win' or 'loss'. No stats are updated in that case.
+        sqlite3.Error: If a database error occurs.
+
+    Returns:
+        None
+
+    """
+    deltas = defaultdict(lambda: [0, 0])  # meal_id -> [battles, wins]
+    for meal_id, result in results:
+        if result not in ('win', 'loss'):
+            raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
+        deltas[meal_id][0] += 1
+        if result == 'win':
+            deltas[meal_id][1] += 1
+    if not deltas:
+        return
+
+    meal_ids = list(deltas)
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            # Take the write lock before the check, so no meal can be deleted between it and the writes
+            cursor.execute("BEGIN IMMEDIATE")
+            deleted_by_id = {}
+            for start in range(0, len(meal_ids), SQL_PARAMETER_CHUNK_SIZE):
+                chunk = meal_ids[start:start + SQL_PARAMETER_CHUNK_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor.execute(f"SELECT id, deleted FROM meals WHERE id IN ({placeholders})", chunk)
+                deleted_by_id.update(cursor.fetchall())
+
+            for meal_id in meal_ids:
+                if meal_id not in deleted_by_id:
+                    logger.info("Meal with ID %s not found", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} not found")
+                if deleted_by_id[meal_id]:
                     logger.info("Meal with ID %s has been deleted", meal_id)
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
-            except TypeError:
-                logger.info("Meal with ID %s not found", meal_id)
-                raise ValueError(f"Meal with ID {meal_id} not found")
-
-            if result == 'win':
-                cursor.execute("UPDATE meals SET battles = battles + 1, wins = wins + 1 WHERE id = ?", (meal_id,))
-            elif result == 'loss':
-                cursor.execute("UPDATE meals SET battles = battles + 1 WHERE id = ?", (meal_id,))
-            else:
-                raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
 
+            cursor.executemany(
+                "UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ? AND deleted = FALSE",
+                [(battles, wins, meal_id) for meal_id, (battles, wins) in deltas.items()]
+            )
+            cursor.executemany("""
+                INSERT INTO meal_leaderboard (meal_id, battles, wins, win_pct)
+                SELECT id, battles, wins, wins * 1.0 / battles FROM meals WHERE id = ? AND deleted = FALSE
+                ON CONFLICT(meal_id) DO UPDATE SET
+                    battles = excluded.battles, wins = excluded.wins, win_pct = excluded.win_pct
+            """, [(meal_id,) for meal_id in meal_ids])
             conn.commit()
 
+            logger.info("Battle stats updated for %d meals", len(meal_ids))
+
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
-        raise e
\ No newline at end of file
+        raise e
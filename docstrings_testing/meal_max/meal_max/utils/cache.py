@@ -0,0 +1,140 @@
+from collections import OrderedDict
+import logging
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from meal_max.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded least-recently-used cache with an optional TTL.
+
+    Read-through callers take `generation` before loading a value and pass it
+    to put(), so a value loaded before an invalidation is not cached after it.
+
+    Attributes:
+        max_size (int): The maximum number of entries; 0 disables caching.
+        ttl (float, optional): Seconds an entry stays valid, or None to keep entries until evicted.
+    """
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.max_size = max(0, max_size)
+        self.ttl = ttl if ttl else None
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """
+        A counter bumped by every invalidation and clear.
+        """
+        with self._lock:
+            return self._generation
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Looks up a key and marks it as recently used.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Tuple[bool, Any]: (True, value) on a hit, or (False, None) on a miss or an expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[1] >= self.ttl:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, entry[0]
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Stores a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to cache.
+            generation (int, optional): The generation read before loading the value;
+                if the cache has been invalidated since, the value is not stored.
+        """
+        if self.max_size == 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Removes a single key, if present.
+
+        Args:
+            key (Hashable): The cache key.
+        """
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(key, None) is not None:
+                self._invalidations += 1
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> None:
+        """
+        Removes every entry whose value matches a predicate.
+
+        Args:
+            predicate (Callable[[Any], bool]): Returns True for values that should be dropped.
+        """
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, (value, _) in self._entries.items() if predicate(value)]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += len(stale)
+
+    def clear(self) -> None:
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self._generation += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the cache counters.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations,
+            }
@@ -0,0 +1,326 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+import functools
+import inspect
+import logging
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from flask import Flask, g, request
+
+from meal_max.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from half a millisecond to ten seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    """
+    Escapes a label value for the text exposition format.
+    """
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """
+    Formats label pairs as {name="value",...}, or an empty string if there are none.
+    """
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric(ABC):
+    """
+    Base class for a metric family with a fixed set of label names.
+
+    Attributes:
+        name (str): The metric name.
+        documentation (str): The HELP text.
+        label_names (Tuple[str, ...]): The names of the labels, in order.
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """
+        Returns the exposition lines for this metric family.
+        """
+
+
+class Counter(_Metric):
+    """
+    A monotonically increasing count per label set.
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """
+        Adds `amount` to the value for the given label values.
+        """
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """
+        Returns the current value for the given label values.
+        """
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        lines = self._header()
+        for label_values, value in values:
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    A value per label set that can go up and down.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {} if label_names else {(): 0}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """
+        Adds `amount` to the value for the given label values.
+        """
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        """
+        Subtracts `amount` from the value for the given label values.
+        """
+        self.inc(*label_values, amount=-amount)
+
+    def value(self, *label_values: str) -> float:
+        """
+        Returns the current value for the given label values.
+        """
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        lines = self._header()
+        for label_values, value in values:
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    """
+    Observations counted into fixed buckets per label set, with their sum and count.
+
+    Attributes:
+        buckets (Tuple[float, ...]): The upper bounds of the buckets, in increasing order.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """
+        Records one observation for the given label values.
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, *label_values: str) -> int:
+        """
+        Returns the number of observations for the given label values.
+        """
+        with self._lock:
+            state = self._values.get(label_values)
+            return sum(state[0]) if state else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(label_values, list(state[0]), state[1]) for label_values, state in self._values.items()]
+        lines = self._header()
+        for label_values, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.label_names, label_values, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+##################################################
+# Registry
+##################################################
+
+_registry: List[_Metric] = []
+
+
+def register(metric: _Metric) -> _Metric:
+    """
+    Adds a metric to the set rendered by render_metrics().
+    """
+    _registry.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    """
+    Renders every registered metric in the Prometheus text exposition format.
+    """
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUESTS = register(Counter(
+    "http_requests_total", "HTTP requests handled, by method, route and status.", ("method", "route", "status")))
+HTTP_REQUEST_SECONDS = register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency in seconds, by method and route.", ("method", "route")))
+HTTP_REQUESTS_IN_FLIGHT = register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled."))
+DB_CALL_SECONDS = register(Histogram(
+    "db_call_duration_seconds", "Time spent in model functions that query the database, by function.", ("function",)))
+DB_CALL_ERRORS = register(Counter(
+    "db_call_errors_total", "Database errors raised by model functions, by function.", ("function",)))
+RANDOM_ORG_SECONDS = register(Histogram(
+    "random_org_request_duration_seconds", "random.org request latency in seconds, by function.", ("function",)))
+RANDOM_ORG_FAILURES = register(Counter(
+    "random_org_failures_total", "Failed random.org requests, by function.", ("function",)))
+
+
+##################################################
+# Instrumentation
+##################################################
+
+def timed(histogram: Histogram, errors: Counter, error_types: Tuple[Type[BaseException], ...] = (Exception,)) -> Callable:
+    """
+    Decorator that records how long each call takes, labelled with the function name.
+
+    Args:
+        histogram (Histogram): Receives the duration of every call.
+        errors (Counter): Incremented when the call raises one of `error_types`.
+        error_types (Tuple[Type[BaseException], ...]): The exceptions that count as failures.
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.isgeneratorfunction(func):
+            raise TypeError(f"Cannot time generator function {func.__name__}")
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except error_types:
+                errors.inc(name)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start, name)
+        return wrapper
+    return decorator
+
+
+def timed_db(func: Callable) -> Callable:
+    """
+    Decorator that records the time a model function spends, and its sqlite3 errors.
+    """
+    return timed(DB_CALL_SECONDS, DB_CALL_ERRORS, (sqlite3.Error,))(func)
+
+
+def timed_random_org(func: Callable) -> Callable:
+    """
+    Decorator that records random.org request latency and failures.
+    """
+    return timed(RANDOM_ORG_SECONDS, RANDOM_ORG_FAILURES)(func)
+
+
+def instrument_app(app: Flask) -> None:
+    """
+    Records request counts, latency and in-flight requests for every route of a Flask app.
+
+    Requests are labelled with the route pattern (e.g. /api/get-meal-by-id/<int:meal_id>)
+    rather than the path, so the number of series stays bounded.
+
+    Args:
+        app (Flask): The application to instrument.
+    """
+    @app.before_request
+    def _start_request_timer() -> None:
+        g._metrics_start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _record_request(response):
+        _observe_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _finish_request(exc: Optional[BaseException]) -> None:
+        if getattr(g, "_metrics_start", None) is None:
+            return
+        if exc is not None and not getattr(g, "_metrics_recorded", False):
+            _observe_request(500)
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        g._metrics_start = None
+
+
+def _observe_request(status: int) -> None:
+    """
+    Records the current request under its route pattern.
+    """
+    start = getattr(g, "_metrics_start", None)
+    if start is None:
+        return
+    route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+    HTTP_REQUESTS.inc(request.method, route, str(status))
+    HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, route)
+    g._metrics_recorded = True
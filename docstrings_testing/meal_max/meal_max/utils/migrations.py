@@ -0,0 +1,155 @@
+import logging
+import os
+import re
+import sqlite3
+import sys
+from typing import Iterator, List, NamedTuple
+
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import DB_PATH
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# load the migrations directory from the environment, defaulting to sql/migrations next to the package
+MIGRATIONS_DIR = os.getenv(
+    "SQL_MIGRATIONS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sql", "migrations")
+)
+
+# migration files are named <version>_<description>.sql, e.g. 0003_leaderboard_covering_indexes.sql
+_MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+
+class Migration(NamedTuple):
+    """
+    One schema migration script.
+
+    Attributes:
+        version (int): The schema version the database is at once the script has run.
+        name (str): The description part of the file name.
+        path (str): The path of the SQL script.
+    """
+    version: int
+    name: str
+    path: str
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """
+    Lists the migration scripts in a directory in version order.
+
+    Args:
+        directory (str): The directory holding the <version>_<description>.sql files.
+
+    Returns:
+        List[Migration]: The migrations, numbered consecutively from 1.
+
+    Raises:
+        ValueError: If the versions have duplicates or gaps.
+    """
+    migrations = []
+    for file_name in os.listdir(directory):
+        match = _MIGRATION_FILE.match(file_name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, file_name)))
+    migrations.sort()
+
+    for expected, migration in enumerate(migrations, start=1):
+        if migration.version != expected:
+            logger.error("Migration %s has version %d, expected %d", migration.path, migration.version, expected)
+            raise ValueError(f"Migration versions must be consecutive from 1: expected {expected}, got {migration.version}")
+    return migrations
+
+
+def _split_statements(script: str) -> Iterator[str]:
+    """
+    Splits a SQL script into complete statements, keeping trigger bodies whole.
+    """
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            yield statement
+            statement = ""
+    if statement.strip():
+        yield statement
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    Returns the schema version recorded in the database header (PRAGMA user_version).
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path: str = DB_PATH, directory: str = MIGRATIONS_DIR) -> int:
+    """
+    Brings a database up to the latest schema version without dropping any data.
+
+    Pending migrations are applied in order inside one write transaction, which
+    also records the new version, so a failing script leaves the database as it
+    was and concurrent runs apply each migration once. Scripts must not begin
+    or commit transactions themselves.
+
+    Args:
+        db_path (str): The path of the SQLite database file; it is created if missing.
+        directory (str): The directory holding the migration scripts.
+
+    Returns:
+        int: The schema version after migrating.
+
+    Raises:
+        ValueError: If the database is newer than the latest migration, or the
+            migration files are misnumbered.
+        sqlite3.Error: If a migration fails.
+    """
+    migrations = load_migrations(directory)
+    latest = migrations[-1].version if migrations else 0
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA busy_timeout = 5000;")
+        conn.execute("BEGIN IMMEDIATE")
+        current = get_schema_version(conn)
+        if current > latest:
+            conn.rollback()
+            logger.error("Database schema version %d is newer than the latest migration %d", current, latest)
+            raise ValueError(f"Database schema version {current} is newer than the latest migration {latest}")
+
+        pending = [migration for migration in migrations if migration.version > current]
+        if not pending:
+            conn.rollback()
+            logger.info("Database schema is up to date at version %d", current)
+            return current
+
+        try:
+            for migration in pending:
+                logger.info("Applying migration %04d_%s", migration.version, migration.name)
+                with open(migration.path, "r") as fh:
+                    script = fh.read()
+                for statement in _split_statements(script):
+                    conn.execute(statement)
+            # PRAGMA does not accept bound parameters; the version is an int from the file name
+            conn.execute(f"PRAGMA user_version = {latest}")
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error("Migration failed, schema left at version %d: %s", current, str(e))
+            raise e
+
+        # Refresh planner statistics for the new indexes
+        conn.execute("PRAGMA optimize")
+        logger.info("Database migrated from schema version %d to %d", current, latest)
+        return latest
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    try:
+        migrate()
+    except (ValueError, sqlite3.Error):
+        sys.exit(1)
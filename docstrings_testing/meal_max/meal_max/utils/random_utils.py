@@ -1,12 +1,29 @@
+from collections import deque
 import logging
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
 import requests
 
 from meal_max.utils.logger import configure_logger
+from meal_max.utils.metrics import timed_random_org
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# buffered random source sizing, tunable from the environment
+RANDOM_BATCH_SIZE = int(os.getenv("RANDOM_BATCH_SIZE", "100"))
+RANDOM_LOW_WATER = int(os.getenv("RANDOM_LOW_WATER", "20"))
+RANDOM_HIGH_WATER = int(os.getenv("RANDOM_HIGH_WATER", "200"))
+
+# random.org refuses requests for more than this many fractions at once
+MAX_BATCH_SIZE = 10000
+
+
+@timed_random_org
 def get_random() -> float:
     """
     Obtain a Random number from random.org
@@ -45,3 +62,207 @@ def get_random() -> float:
         logger.error("Request to random.org failed: %s", e)
         raise RuntimeError("Request to random.org failed: %s" % e)
 
+
+@timed_random_org
+def get_random_batch(num: int) -> List[float]:
+    """
+    Obtain several random numbers from random.org in a single request.
+
+    Args:
+        num (int): How many numbers to fetch, between 1 and 10000.
+
+    Raises:
+        ValueError: If `num` is out of range or the response from random.org is not valid.
+        RuntimeError: Request to random.org timed out.
+        RuntimeError: Request to random.org had failed.
+    """
+    if num < 1 or num > MAX_BATCH_SIZE:
+        raise ValueError(f"Invalid batch size: {num}. Must be between 1 and {MAX_BATCH_SIZE}.")
+
+    url = f"https://www.random.org/decimal-fractions/?num={num}&dec=2&col=1&format=plain&rnd=new"
+
+    try:
+        logger.info("Fetching %d random numbers from %s", num, url)
+
+        response = requests.get(url, timeout=5)
+        response.raise_for_status()
+
+        try:
+            random_numbers = [float(line) for line in response.text.split()]
+        except ValueError:
+            raise ValueError("Invalid response from random.org: %s" % response.text.strip())
+        if not random_numbers:
+            raise ValueError("Invalid response from random.org: empty response")
+
+        logger.info("Received %d random numbers", len(random_numbers))
+        return random_numbers
+
+    except requests.exceptions.Timeout:
+        logger.error("Request to random.org timed out.")
+        raise RuntimeError("Request to random.org timed out.")
+
+    except requests.exceptions.RequestException as e:
+        logger.error("Request to random.org failed: %s", e)
+        raise RuntimeError("Request to random.org failed: %s" % e)
+
+
+class RandomBuffer:
+    """
+    A thread-safe buffer of random numbers prefetched from random.org.
+
+    Numbers are fetched `batch_size` at a time. Whenever a read leaves fewer
+    than `low_water` numbers, a background thread refills the buffer up to
+    `high_water`. A read that finds the buffer empty fetches synchronously and
+    is counted as an underrun.
+
+    Attributes:
+        batch_size (int): How many numbers to request per fetch.
+        low_water (int): The buffer level that triggers a background refill.
+        high_water (int): The buffer level a refill stops at.
+    """
+
+    def __init__(self, batch_size: int = RANDOM_BATCH_SIZE, low_water: int = RANDOM_LOW_WATER,
+                 high_water: int = RANDOM_HIGH_WATER, fetch: Optional[Callable[[int], List[float]]] = None):
+        if batch_size < 1 or batch_size > MAX_BATCH_SIZE:
+            raise ValueError(f"Invalid batch size: {batch_size}. Must be between 1 and {MAX_BATCH_SIZE}.")
+        if low_water < 0 or high_water < low_water:
+            raise ValueError("Watermarks must satisfy 0 <= low_water <= high_water.")
+
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.high_water = max(high_water, 1)
+        self._fetch = fetch or get_random_batch
+        self._numbers: deque = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._refills = 0
+        self._refill_failures = 0
+        self._refill_seconds_total = 0.0
+        self._last_refill_seconds = 0.0
+        self._underruns = 0
+        self._served = 0
+
+    def _timed_fetch(self, num: int) -> List[float]:
+        """
+        Fetches `num` numbers and records how long the fetch took.
+        """
+        start = time.perf_counter()
+        numbers = self._fetch(num)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._refills += 1
+            self._refill_seconds_total += elapsed
+            self._last_refill_seconds = elapsed
+        return numbers
+
+    def _refill(self) -> None:
+        """
+        Tops the buffer up to the high-water mark. Runs on the refill thread.
+        """
+        try:
+            while True:
+                with self._lock:
+                    if len(self._numbers) >= self.high_water:
+                        break
+                numbers = self._timed_fetch(self.batch_size)
+                if not numbers:
+                    # Another attempt would likely come back empty too; the next read retries
+                    with self._lock:
+                        self._refill_failures += 1
+                    logger.error("Background refill of random numbers got an empty batch")
+                    break
+                with self._lock:
+                    self._numbers.extend(numbers)
+        except (RuntimeError, ValueError) as e:
+            with self._lock:
+                self._refill_failures += 1
+            logger.error("Background refill of random numbers failed: %s", e)
+        finally:
+            with self._lock:
+                self._refilling = False
+
+    def _maybe_start_refill(self) -> None:
+        """
+        Starts a background refill if the buffer is low and none is running.
+        """
+        with self._lock:
+            if self._refilling or len(self._numbers) >= self.low_water:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill, name="random-buffer-refill", daemon=True).start()
+
+    def get(self) -> float:
+        """
+        Returns one random number from the buffer.
+
+        Raises:
+            RuntimeError: If the buffer is empty and random.org cannot be reached.
+            ValueError: If the response from random.org is not valid.
+        """
+        return self.get_many(1)[0]
+
+    def get_many(self, num: int) -> List[float]:
+        """
+        Returns `num` random numbers, fetching any shortfall in one request.
+
+        Args:
+            num (int): How many numbers to return.
+
+        Raises:
+            RuntimeError: If the buffer runs short and random.org cannot be reached.
+            ValueError: If the response from random.org is not valid.
+        """
+        numbers = []
+        with self._lock:
+            while self._numbers and len(numbers) < num:
+                numbers.append(self._numbers.popleft())
+
+        while len(numbers) < num:
+            with self._lock:
+                self._underruns += 1
+            logger.warning("Random number buffer underrun, fetching synchronously")
+            shortfall = num - len(numbers)
+            fetched = self._timed_fetch(min(max(shortfall, self.batch_size), MAX_BATCH_SIZE))
+            if not fetched:
+                raise ValueError("Invalid response from random.org: empty response")
+            numbers.extend(fetched[:shortfall])
+            with self._lock:
+                self._numbers.extend(fetched[shortfall:])
+
+        with self._lock:
+            self._served += num
+        self._maybe_start_refill()
+        return numbers
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the buffer metrics.
+
+        Returns:
+            dict: The buffer level, numbers served, underruns, and refill
+                counts and latencies in seconds.
+        """
+        with self._lock:
+            return {
+                'buffered': len(self._numbers),
+                'served': self._served,
+                'underruns': self._underruns,
+                'refills': self._refills,
+                'refill_failures': self._refill_failures,
+                'last_refill_seconds': self._last_refill_seconds,
+                'avg_refill_seconds': self._refill_seconds_total / self._refills if self._refills else 0.0,
+            }
+
+
+random_buffer = RandomBuffer()
+
+
+def get_buffered_random() -> float:
+    """
+    Obtain a random number from the shared prefetching buffer.
+
+    Raises:
+        RuntimeError: If the buffer is empty and random.org cannot be reached.
+        ValueError: If the response from random.org is not valid.
+    """
+    return random_buffer.get()
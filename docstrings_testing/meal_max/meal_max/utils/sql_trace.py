@@ -0,0 +1,215 @@
+from collections import deque
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional
+
+from meal_max.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# A child logger, so slow queries can be routed to their own file as well
+slow_query_logger = logging.getLogger(__name__ + ".slow")
+
+
+# tracing settings, tunable from the environment
+SQL_TRACE = os.getenv("SQL_TRACE", "false").lower() == "true"
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "50"))
+SQL_SLOW_QUERY_LOG = os.getenv("SQL_SLOW_QUERY_LOG")
+SQL_TRACE_SAMPLES = int(os.getenv("SQL_TRACE_SAMPLES", "1024"))
+
+if SQL_SLOW_QUERY_LOG:
+    _slow_query_handler = logging.FileHandler(SQL_SLOW_QUERY_LOG)
+    _slow_query_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+    slow_query_logger.addHandler(_slow_query_handler)
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\bIN \(\?(?: ?, ?\?)*\)", re.IGNORECASE)
+_ROW_VALUE_LIST = re.compile(r"\((?:\? ?, ?)*\?\)(?: ?, ?\((?:\? ?, ?)*\?\))+")
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+
+def statement_template(sql: str) -> str:
+    """
+    Normalizes a statement so variants of the same query aggregate together.
+
+    Whitespace is collapsed, and the variable-length placeholder lists built for
+    IN (...) and multi-row VALUES clauses are folded into `(?...)`.
+
+    Args:
+        sql (str): The statement as executed.
+
+    Returns:
+        str: The statement template.
+    """
+    template = _WHITESPACE.sub(" ", sql).strip()
+    template = _ROW_VALUE_LIST.sub("(?...)...", template)
+    return _IN_LIST.sub("IN (?...)", template)
+
+
+class StatementStats:
+    """
+    Running totals for one statement template, with a bounded sample of recent durations.
+
+    Attributes:
+        count (int): How many times the statement ran.
+        total_seconds (float): The summed duration of all runs.
+        max_seconds (float): The slowest run.
+        slow_count (int): How many runs exceeded the slow-query threshold.
+    """
+
+    def __init__(self, samples: int = SQL_TRACE_SAMPLES):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.slow_count = 0
+        self._samples: Deque[float] = deque(maxlen=max(1, samples))
+
+    def record(self, seconds: float, slow: bool) -> None:
+        """
+        Adds one run of the statement.
+        """
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.slow_count += slow
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Returns a percentile of the sampled durations, e.g. 0.99 for p99.
+        """
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+_stats: Dict[str, StatementStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _record(conn: sqlite3.Connection, sql: str, parameters: Any, seconds: float, many: bool = False) -> None:
+    """
+    Aggregates one timed statement and logs it with its query plan if it was slow.
+    """
+    template = statement_template(sql)
+    slow = seconds * 1000 >= SQL_SLOW_QUERY_MS
+    with _stats_lock:
+        stats = _stats.get(template)
+        if stats is None:
+            stats = _stats[template] = StatementStats()
+        stats.record(seconds, slow)
+    if slow:
+        _log_slow_query(conn, sql, template, parameters, seconds, many)
+
+
+def _log_slow_query(conn: sqlite3.Connection, sql: str, template: str, parameters: Any,
+                    seconds: float, many: bool) -> None:
+    """
+    Writes a slow statement to the slow-query log, with EXPLAIN QUERY PLAN output when available.
+    """
+    plan = ""
+    if not many and template.split(" ", 1)[0].upper() in _EXPLAINABLE:
+        try:
+            rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+            plan = "; ".join(str(row[-1]) for row in rows)
+        except sqlite3.Error as e:
+            plan = f"unavailable ({e})"
+    slow_query_logger.warning("Slow query (%.1f ms%s): %s | plan: %s",
+                              seconds * 1000, ", executemany" if many else "", template, plan or "n/a")
+
+
+class TracingCursor(sqlite3.Cursor):
+    """
+    A cursor that times every execute and executemany call.
+
+    The time covers preparing the statement and stepping to the first result row;
+    rows fetched afterwards are not included.
+    """
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record(self.connection, sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record(self.connection, sql, None, time.perf_counter() - start, many=True)
+
+    def executescript(self, sql_script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            _record(self.connection, "<script>", None, time.perf_counter() - start, many=True)
+
+
+class TracingConnection(sqlite3.Connection):
+    """
+    A connection whose cursors, including those behind the execute shortcuts, are TracingCursors.
+    """
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or TracingCursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def connection_factory() -> type:
+    """
+    Returns the connection class to pass to sqlite3.connect: TracingConnection when SQL_TRACE is on.
+    """
+    return TracingConnection if SQL_TRACE else sqlite3.Connection
+
+
+def get_sql_trace_stats(limit: Optional[int] = None) -> List[dict]:
+    """
+    Returns the aggregated statement statistics, slowest total time first.
+
+    Args:
+        limit (int, optional): Return at most this many templates.
+
+    Returns:
+        List[dict]: Per template: count, total, mean, p99 and max milliseconds, and the slow count.
+    """
+    with _stats_lock:
+        snapshot = [
+            {
+                'statement': template,
+                'count': stats.count,
+                'total_ms': stats.total_seconds * 1000,
+                'mean_ms': stats.total_seconds * 1000 / stats.count,
+                'p99_ms': stats.percentile(0.99) * 1000,
+                'max_ms': stats.max_seconds * 1000,
+                'slow_count': stats.slow_count,
+            }
+            for template, stats in _stats.items()
+        ]
+    snapshot.sort(key=lambda entry: entry['total_ms'], reverse=True)
+    return snapshot[:limit] if limit is not None else snapshot
+
+
+def reset_sql_trace_stats() -> None:
+    """
+    Clears the aggregated statement statistics.
+    """
+    with _stats_lock:
+        _stats.clear()
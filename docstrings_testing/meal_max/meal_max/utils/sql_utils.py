@@ -1,9 +1,12 @@
 from contextlib import contextmanager
 import logging
 import os
+import queue
 import sqlite3
+import threading
 
 from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_trace import connection_factory
 
 
 logger = logging.getLogger(__name__)
@@ -13,6 +16,20 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/meal_max.db")
 
+# connection pool sizing, tunable from the environment
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+
+# applied once to every pooled connection when it is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL;",
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA foreign_keys = ON;",
+    "PRAGMA busy_timeout = 5000;",
+    "PRAGMA cache_size = -16000;",
+    "PRAGMA temp_store = MEMORY;",
+)
+
 
 def check_database_connection():
     try:
@@ -37,6 +54,168 @@ def check_table_exists(tablename: str):
         logger.error(error_message)
         raise Exception(error_message) from e
 
+
+class ConnectionPool:
+    """
+    A bounded pool of long-lived SQLite connections.
+
+    Connections are opened lazily up to `max_size`, configured once with
+    CONNECTION_PRAGMAS and handed back to the pool when the caller is done.
+    Callers that find the pool exhausted wait up to `timeout` seconds.
+
+    Attributes:
+        db_path (str): The path of the SQLite database file.
+        max_size (int): The maximum number of open connections.
+        timeout (float): How long to wait for a free connection, in seconds.
+    """
+
+    def __init__(self, db_path: str, max_size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT):
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._created = 0
+        self._in_use = 0
+        self._waits = 0
+        self._acquired = 0
+        self._discarded = 0
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """
+        Opens a new connection and applies the connection pragmas.
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=connection_factory())
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        logger.info("Opened pooled database connection to %s", self.db_path)
+        return conn
+
+    def _check_fork(self) -> None:
+        """
+        Drops connections inherited from a parent process, which must not be shared.
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._idle = queue.LifoQueue()
+                    self._created = self._in_use = 0
+                    self._pid = os.getpid()
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Takes a connection from the pool, opening a new one if the pool is not full.
+
+        Raises:
+            sqlite3.OperationalError: If no connection becomes free within the timeout.
+        """
+        self._check_fork()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                can_open = self._created < self.max_size
+                if can_open:
+                    self._created += 1
+            if can_open:
+                try:
+                    conn = self._open_connection()
+                except sqlite3.Error:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                with self._lock:
+                    self._waits += 1
+                logger.warning("Database connection pool exhausted, waiting for a free connection")
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError("Timed out waiting for a database connection from the pool")
+
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """
+        Resets a connection and returns it to the pool.
+
+        Any transaction left open by the caller is rolled back. Connections
+        that cannot be reset are closed and replaced on a later acquire.
+        """
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            self._in_use -= 1
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error as e:
+            logger.error("Discarding pooled database connection: %s", str(e))
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        """
+        Closes a broken connection and frees its slot in the pool.
+        """
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+            self._discarded += 1
+
+    def close(self) -> None:
+        """
+        Closes every idle connection in the pool.
+        """
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+        logger.info("Database connection pool closed.")
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the pool counters.
+
+        Returns:
+            dict: The pool size, connections created, in use and idle, and how
+                often callers had to wait for a free connection.
+        """
+        with self._lock:
+            return {
+                'max_size': self.max_size,
+                'created': self._created,
+                'in_use': self._in_use,
+                'idle': self._idle.qsize(),
+                'waits': self._waits,
+                'acquired': self._acquired,
+                'discarded': self._discarded,
+            }
+
+
+pool = ConnectionPool(DB_PATH)
+
+
+def get_pool_stats() -> dict:
+    """
+    Returns the counters of the shared connection pool.
+    """
+    return pool.stats()
+
 ###################################################
 #
 # This one yields rather than returns.
@@ -47,12 +226,11 @@ def check_table_exists(tablename: str):
 def get_db_connection():
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = pool.acquire()
         yield conn
     except sqlite3.Error as e:
         logger.error("Database connection error: %s", str(e))
         raise e
     finally:
         if conn:
-            conn.close()
-            logger.info("Database connection closed.")
+            pool.release(conn)
@@ -1,3 +1,4 @@
+DROP TABLE IF EXISTS meal_leaderboard;
 DROP TABLE IF EXISTS meals;
 CREATE TABLE meals (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -8,4 +9,18 @@ CREATE TABLE meals (
     battles INTEGER DEFAULT 0,
     wins INTEGER DEFAULT 0,
     deleted BOOLEAN DEFAULT FALSE
-);
\ No newline at end of file
+);
+
+-- One row per non-deleted meal that has fought at least one battle,
+-- kept up to date by update_meal_stats and delete_meal
+CREATE TABLE meal_leaderboard (
+    meal_id INTEGER PRIMARY KEY REFERENCES meals(id),
+    battles INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    win_pct REAL NOT NULL
+);
+CREATE INDEX idx_meal_leaderboard_wins ON meal_leaderboard (wins DESC, meal_id, battles, win_pct);
+CREATE INDEX idx_meal_leaderboard_win_pct ON meal_leaderboard (win_pct DESC, meal_id, battles, wins);
+
+-- Keep in step with the latest file in sql/migrations
+PRAGMA user_version = 3;
@@ -0,0 +1,12 @@
+-- One row per non-deleted meal that has fought at least one battle,
+-- kept up to date by update_meal_stats and delete_meal
+CREATE TABLE IF NOT EXISTS meal_leaderboard (
+    meal_id INTEGER PRIMARY KEY REFERENCES meals(id),
+    battles INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    win_pct REAL NOT NULL
+);
+
+-- Backfill from the battle records of existing meals
+INSERT OR IGNORE INTO meal_leaderboard (meal_id, battles, wins, win_pct)
+SELECT id, battles, wins, wins * 1.0 / battles FROM meals WHERE deleted = FALSE AND battles > 0;
@@ -0,0 +1,6 @@
+-- Covering indexes for both leaderboard orders, so a page is read from the
+-- index alone before joining the meal details by primary key
+DROP INDEX IF EXISTS idx_meal_leaderboard_wins;
+DROP INDEX IF EXISTS idx_meal_leaderboard_win_pct;
+CREATE INDEX idx_meal_leaderboard_wins ON meal_leaderboard (wins DESC, meal_id, battles, win_pct);
+CREATE INDEX idx_meal_leaderboard_win_pct ON meal_leaderboard (win_pct DESC, meal_id, battles, wins);
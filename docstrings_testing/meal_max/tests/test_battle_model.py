@@ -102,3 +102,35 @@ def test_battle_not_enough_combatants(battle_model):
     with pytest.raises(ValueError, match="Two combatants must be prepped for a battle."):
         battle_model.battle()
     
+
+
+##################################################
+# Battle Batch Unit Test Cases
+##################################################
+
+@pytest.fixture
+def mock_update_meal_stats_batch(mocker):
+    return mocker.patch("meal_max.models.battle_model.update_meal_stats_batch")
+
+def test_get_battle_scores(battle_model, sample_combatants):
+    """Test the batched scores match the single-combatant formula"""
+    expected = [battle_model.get_battle_score(combatant) for combatant in sample_combatants]
+    assert battle_model.get_battle_scores(sample_combatants) == expected
+
+def test_battle_batch(battle_model, sample_meal1, sample_meal2, mock_update_meal_stats_batch, mocker):
+    """Test a batch of battles draws all random numbers at once and writes stats once"""
+    # Delta between the two meals is 0.15, so 0.1 favours the first combatant and 0.9 the second
+    mock_get_many = mocker.patch("meal_max.models.battle_model.random_buffer.get_many", return_value=[0.1, 0.9])
+
+    winners = battle_model.battle_batch([(sample_meal1, sample_meal2), (sample_meal1, sample_meal2)])
+
+    assert winners == ["Meal-1", "Meal-2"], f"Expected ['Meal-1', 'Meal-2'], but got {winners}"
+    mock_get_many.assert_called_once_with(2)
+    mock_update_meal_stats_batch.assert_called_once_with([(1, 'win'), (2, 'loss'), (2, 'win'), (1, 'loss')])
+    assert battle_model.combatants == [], "Expected the combatants list to be untouched"
+
+def test_battle_batch_invalid_matchup(battle_model, sample_meal1, mock_update_meal_stats_batch):
+    "Test battle_batch() raises error when a matchup doesn't have 2 combatants"
+    with pytest.raises(ValueError, match="Every matchup must have exactly two combatants."):
+        battle_model.battle_batch([(sample_meal1,)])
+    mock_update_meal_stats_batch.assert_not_called()
@@ -0,0 +1,69 @@
+from meal_max.utils.cache import LRUCache
+
+
+def test_cache_hit_and_miss():
+    """Test that stored values are returned and misses are counted."""
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+
+    assert cache.get("a") == (True, 1)
+    assert cache.get("b") == (False, None)
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_cache_evicts_least_recently_used():
+    """Test that the least recently used entry is evicted when the cache is full."""
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+    assert cache.stats()['evictions'] == 1
+
+def test_cache_ttl_expires_entries(mocker):
+    """Test that entries older than the TTL are treated as misses."""
+    mock_time = mocker.patch("meal_max.utils.cache.time.monotonic", return_value=100.0)
+    cache = LRUCache(max_size=2, ttl=10)
+    cache.put("a", 1)
+
+    mock_time.return_value = 109.0
+    assert cache.get("a") == (True, 1)
+
+    mock_time.return_value = 111.0
+    assert cache.get("a") == (False, None)
+    assert cache.stats()['expirations'] == 1
+
+def test_cache_invalidate_where():
+    """Test that entries can be dropped by value."""
+    cache = LRUCache(max_size=4)
+    cache.put(("id", 1), "Pizza")
+    cache.put(("name", "Pizza"), "Pizza")
+    cache.put(("id", 2), "Tacos")
+
+    cache.invalidate_where(lambda value: value == "Pizza")
+
+    assert cache.stats()['size'] == 1
+    assert cache.get(("id", 2)) == (True, "Tacos")
+
+def test_cache_disabled():
+    """Test that a zero-sized cache stores nothing."""
+    cache = LRUCache(max_size=0)
+    cache.put("a", 1)
+
+    assert cache.get("a") == (False, None)
+
+def test_cache_put_skipped_after_invalidation():
+    """Test that a value loaded before an invalidation is not stored after it."""
+    cache = LRUCache(max_size=4)
+    generation = cache.generation
+    cache.invalidate("a")
+    cache.put("a", 1, generation)
+
+    assert cache.get("a") == (False, None)
+
+    cache.put("a", 2, cache.generation)
+    assert cache.get("a") == (True, 2)
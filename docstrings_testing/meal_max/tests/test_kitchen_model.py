@@ -1,11 +1,14 @@
 from contextlib import contextmanager
 import re
 import sqlite3
+import threading
 import pytest
 from unittest.mock import patch
 
-from meal_max.models.kitchen_model import Meal, create_meal, clear_meals, delete_meal, get_leaderboard, get_meal_by_id, get_meal_by_name, update_meal_stats
-from meal_max.utils.sql_utils import get_db_connection
+from meal_max.models.kitchen_model import Meal, meal_cache, create_meal, clear_meals, delete_meal, get_leaderboard, get_meal_by_id, get_meal_by_name, get_meals_by_names, import_meals, update_meal_stats, update_meal_stats_batch
+from meal_max.utils.metrics import DB_CALL_SECONDS
+from meal_max.utils.migrations import migrate
+from meal_max.utils.sql_utils import ConnectionPool, get_db_connection
 
 ######################################################
 #
@@ -42,6 +45,13 @@ def mock_cursor(mocker):
 
     return mock_cursor  # Return the mock cursor so we can set expectations per test
 
+@pytest.fixture(autouse=True)
+def clear_meal_cache():
+    """Make sure no cached meals leak between tests."""
+    meal_cache.clear()
+    yield
+    meal_cache.clear()
+
 
 ##################################################
 # Create Meal test cases
@@ -86,6 +96,84 @@ def test_create_meal_invalid_difficulty():
     with pytest.raises(ValueError, match="Invalid difficulty level: EASY. Must be 'LOW', 'MED', or 'HIGH'."):
         create_meal(meal="Pizza", cuisine="Italian", price=5.00, difficulty="EASY")
 
+def test_import_meals(mock_cursor):
+    """Test bulk importing meals with chunked inserts."""
+    mock_cursor.rowcount = 2
+    records = [
+        (1, {"meal": "Pizza", "cuisine": "Italian", "price": "5.00", "difficulty": "MED"}),
+        (2, {"meal": "Tacos", "cuisine": "Mexican", "price": 3, "difficulty": "LOW"}),
+    ]
+
+    summary = import_meals(records)
+
+    assert summary == {'rows': 2, 'inserted': 2, 'updated': 0, 'duplicates': 0, 'invalid': 0,
+                       'issues': [], 'issues_truncated': False}
+
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == "SELECT meal, deleted FROM meals WHERE meal IN (?, ?)"
+    expected_insert = normalize_whitespace("""
+        INSERT INTO meals (meal, cuisine, price, difficulty)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(meal) DO NOTHING
+    """)
+    assert normalize_whitespace(mock_cursor.executemany.call_args[0][0]) == expected_insert
+    assert mock_cursor.executemany.call_args[0][1] == [("Pizza", "Italian", 5.0, "MED"), ("Tacos", "Mexican", 3.0, "LOW")]
+
+def test_import_meals_reports_duplicates_and_invalid(mock_cursor):
+    """Test that duplicate and invalid rows are reported without aborting the import."""
+    mock_cursor.fetchall.return_value = [("Pizza", False), ("Sushi", True)]
+    mock_cursor.rowcount = 1
+    records = [
+        (1, {"meal": "Pizza", "cuisine": "Italian", "price": 5.0, "difficulty": "MED"}),
+        (2, {"meal": "Sushi", "cuisine": "Japanese", "price": 9.0, "difficulty": "HIGH"}),
+        (3, {"meal": "Tacos", "cuisine": "Mexican", "price": -1, "difficulty": "LOW"}),
+        (4, {"meal": "Curry", "cuisine": "Indian", "price": 7.0, "difficulty": "EASY"}),
+        (5, {"meal": "Ramen", "cuisine": "Japanese", "price": 8.0, "difficulty": "MED"}),
+        (6, {"meal": "Ramen", "cuisine": "Japanese", "price": 8.0, "difficulty": "MED"}),
+    ]
+
+    summary = import_meals(records)
+
+    assert summary['inserted'] == 1
+    assert summary['duplicates'] == 3
+    assert summary['invalid'] == 2
+    assert sorted(issue['row'] for issue in summary['issues']) == [1, 2, 3, 4, 6]
+    assert mock_cursor.executemany.call_args[0][1] == [("Ramen", "Japanese", 8.0, "MED")]
+
+def test_import_meals_upsert(mock_cursor, sample_meal):
+    """Test that upsert mode updates existing meals and drops them from the cache."""
+    meal_cache.put(("name", "Pizza"), sample_meal)
+    mock_cursor.fetchall.return_value = [("Pizza", False)]
+    records = [
+        (1, {"meal": "Pizza", "cuisine": "Italian", "price": 6.0, "difficulty": "HIGH"}),
+        (2, {"meal": "Tacos", "cuisine": "Mexican", "price": 3.0, "difficulty": "LOW"}),
+    ]
+
+    summary = import_meals(records, upsert=True)
+
+    assert summary['inserted'] == 1
+    assert summary['updated'] == 1
+    expected_upsert = normalize_whitespace("""
+        INSERT INTO meals (meal, cuisine, price, difficulty)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(meal) DO UPDATE SET
+            cuisine = excluded.cuisine,
+            price = excluded.price,
+            difficulty = excluded.difficulty
+        WHERE deleted = FALSE
+    """)
+    assert normalize_whitespace(mock_cursor.executemany.call_args[0][0]) == expected_upsert
+    assert meal_cache.get(("name", "Pizza")) == (False, None)
+
+def test_import_meals_commits_per_chunk(mock_cursor):
+    """Test that each chunk is written in its own transaction."""
+    mock_cursor.rowcount = 2
+    records = [(n, {"meal": f"Meal {n}", "cuisine": "Any", "price": 1.0, "difficulty": "LOW"}) for n in range(1, 6)]
+
+    import_meals(records, chunk_size=2)
+
+    assert mock_cursor.executemany.call_count == 3
+
+
 ##################################################
 # Clear Meals test case
 ##################################################
@@ -114,27 +202,28 @@ def test_clear_meals(mock_cursor, mocker):
 def test_delete_meal(mock_cursor):
     """Test soft deleting a meal from the catalog."""
 
-    # Simulate that the meal exists (id = 1) and is not deleted
-    mock_cursor.fetchone.return_value = [False] 
+    # Simulate that the conditional update matched the live meal
+    mock_cursor.fetchone.return_value = ("Pizza",)
 
     # Call the delete_meal function
     delete_meal(1)
 
-    expected_select_query = "SELECT deleted FROM meals WHERE id = ?"
-    expected_update_query = "UPDATE meals SET deleted = TRUE WHERE id = ?"
-
-    # Ensure correct SQL queries are executed
-    actual_select_query = mock_cursor.execute.call_args_list[0][0][0]
-    actual_update_query = mock_cursor.execute.call_args_list[1][0][0]
+    # Ensure the meal was marked deleted in a single conditional statement
+    expected_update_query = "UPDATE meals SET deleted = TRUE WHERE id = ? AND deleted = FALSE RETURNING meal"
+    actual_update_query = normalize_whitespace(mock_cursor.execute.call_args_list[0][0][0])
+    assert actual_update_query == expected_update_query
+    assert mock_cursor.execute.call_args_list[0][0][1] == (1,)
 
-    assert actual_select_query.strip() == expected_select_query.strip()
-    assert actual_update_query.strip() == expected_update_query.strip()
+    # Ensure the meal was dropped from the leaderboard summary
+    actual_summary_query = mock_cursor.execute.call_args_list[1][0][0]
+    assert actual_summary_query == "DELETE FROM meal_leaderboard WHERE meal_id = ?"
+    assert mock_cursor.execute.call_count == 2, "A successful delete should not need an existence check."
 
 def test_delete_meal_bad_id(mock_cursor):
     """Test error when trying to delete a non-existent meal."""
 
-    # Simulate that no meal exists with the given ID
-    mock_cursor.fetchone.return_value = None
+    # Simulate that the update matched nothing and no meal exists with the given ID
+    mock_cursor.fetchone.side_effect = [None, None]
 
     # Expect a ValueError when attempting to delete a non-existent meal
     with pytest.raises(ValueError, match="Meal with ID 999 not found"):
@@ -143,13 +232,16 @@ def test_delete_meal_bad_id(mock_cursor):
 def test_delete_meal_already_deleted(mock_cursor):
     """Test error when trying to delete a meal that's already marked as deleted."""
 
-    # Simulate that the meal exists but is already marked as deleted
-    mock_cursor.fetchone.return_value = ([True])
+    # Simulate that the update matched nothing because the meal is already deleted
+    mock_cursor.fetchone.side_effect = [None, (True,)]
 
     # Expect a ValueError when attempting to delete a meal that's already been deleted
     with pytest.raises(ValueError, match="Meal with ID 999 has been deleted"):
         delete_meal(999)
 
+    # Ensure the miss was explained by looking the meal up
+    mock_cursor.execute.assert_called_with("SELECT deleted FROM meals WHERE id = ?", (999,))
+
 
 ##################################################
 # Get Meal test cases
@@ -179,9 +271,9 @@ def test_get_leaderboard(mock_cursor):
 
     # Ensure the SQL query for sorting by wins is executed correctly
     expected_query_by_wins = normalize_whitespace("""
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
-        ORDER BY wins DESC
+        SELECT m.id, m.meal, m.cuisine, m.price, m.difficulty, l.battles, l.wins, l.win_pct
+        FROM meal_leaderboard l JOIN meals m ON m.id = l.meal_id
+        ORDER BY l.wins DESC, l.meal_id LIMIT ? OFFSET ?
     """)
     actual_query_by_wins = normalize_whitespace(mock_cursor.execute.call_args[0][0])
     assert actual_query_by_wins == expected_query_by_wins, "The SQL query for wins did not match the expected structure."
@@ -200,12 +292,33 @@ def test_get_leaderboard(mock_cursor):
 
     # Ensure the SQL query for sorting by win_pct is executed correctly
     expected_query_by_win_pct = normalize_whitespace("""
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
-        ORDER BY win_pct DESC
+        SELECT m.id, m.meal, m.cuisine, m.price, m.difficulty, l.battles, l.wins, l.win_pct
+        FROM meal_leaderboard l JOIN meals m ON m.id = l.meal_id
+        ORDER BY l.win_pct DESC, l.meal_id LIMIT ? OFFSET ?
     """)
     actual_query_by_win_pct = normalize_whitespace(mock_cursor.execute.call_args[0][0])
     assert actual_query_by_win_pct == expected_query_by_win_pct, "The SQL query for win_pct did not match the expected structure."
+    assert mock_cursor.execute.call_args[0][1] == (-1, 0), "Expected the whole leaderboard to be requested"
+
+
+def test_get_leaderboard_page(mock_cursor):
+    """Test retrieving one page of the leaderboard."""
+
+    get_leaderboard(sort_by="wins", limit=10, offset=20)
+
+    assert mock_cursor.execute.call_args[0][1] == (10, 20), "Expected the page bounds to be passed to the query"
+
+def test_get_leaderboard_invalid_page(mock_cursor):
+    """Test error when requesting a leaderboard page with a negative bound."""
+
+    with pytest.raises(ValueError, match="Leaderboard limit and offset must not be negative"):
+        get_leaderboard(sort_by="wins", limit=-1)
+
+def test_get_leaderboard_invalid_sort(mock_cursor):
+    """Test error when sorting the leaderboard by an unknown field."""
+
+    with pytest.raises(ValueError, match="Invalid sort_by parameter: battles"):
+        get_leaderboard(sort_by="battles")
 
 
 def test_get_meal_by_id(mock_cursor):
@@ -247,6 +360,100 @@ def test_get_meal_by_id_bad_id(mock_cursor):
     with pytest.raises(ValueError, match="Meal with ID 999 not found"):
         get_meal_by_id(999)
 
+def test_get_meal_by_id_cached(mock_cursor):
+    """Test that repeated lookups by id or name are served from the cache."""
+    mock_cursor.fetchone.return_value = [1, "Pizza", "Italian", 5.00, "MED", False]
+
+    meal = get_meal_by_id(1)
+
+    assert get_meal_by_id(1) is meal
+    assert get_meal_by_name("Pizza") is meal
+    assert mock_cursor.execute.call_count == 1
+
+def test_get_meal_cache_hits_not_timed_as_db_calls(mock_cursor):
+    """Test that only lookups that reach the database are recorded as database calls."""
+    mock_cursor.fetchone.return_value = [1, "Pizza", "Italian", 5.00, "MED", False]
+    before = DB_CALL_SECONDS.count("_fetch_meal_by_id")
+
+    get_meal_by_id(1)
+    get_meal_by_id(1)
+    get_meal_by_name("Pizza")
+
+    assert DB_CALL_SECONDS.count("_fetch_meal_by_id") == before + 1
+    assert DB_CALL_SECONDS.count("get_meal_by_id") == 0
+
+def test_get_meal_by_name_not_found_not_cached(mock_cursor):
+    """Test that misses are not cached."""
+    with pytest.raises(ValueError, match="Meal with name Pizza not found"):
+        get_meal_by_name("Pizza")
+
+    mock_cursor.fetchone.return_value = [1, "Pizza", "Italian", 5.00, "MED", False]
+
+    assert get_meal_by_name("Pizza").id == 1
+    assert mock_cursor.execute.call_count == 2
+
+def test_delete_meal_invalidates_cache(mock_cursor):
+    """Test that deleting a meal drops it from the cache under both keys."""
+    mock_cursor.fetchone.return_value = [1, "Pizza", "Italian", 5.00, "MED", False]
+    get_meal_by_name("Pizza")
+
+    mock_cursor.fetchone.return_value = ("Pizza",)
+    delete_meal(1)
+
+    mock_cursor.fetchone.return_value = [1, "Pizza", "Italian", 5.00, "MED", True]
+    with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
+        get_meal_by_id(1)
+    with pytest.raises(ValueError, match="Meal with name Pizza has been deleted"):
+        get_meal_by_name("Pizza")
+
+def test_get_meal_by_id_concurrent_delete_not_cached(mock_cursor):
+    """Test that a meal read just before a concurrent delete is returned but not cached."""
+    def read_then_delete():
+        # Another thread deletes the meal after this read passed the deleted check
+        meal_cache.invalidate(("id", 1))
+        return [1, "Pizza", "Italian", 5.00, "MED", False]
+
+    mock_cursor.fetchone.side_effect = read_then_delete
+
+    assert get_meal_by_id(1).meal == "Pizza"
+    assert meal_cache.get(("id", 1)) == (False, None)
+    assert meal_cache.get(("name", "Pizza")) == (False, None)
+
+def test_clear_meals_invalidates_cache(mock_cursor, mocker):
+    """Test that clearing the meals empties the cache."""
+    mock_cursor.fetchone.return_value = [1, "Pizza", "Italian", 5.00, "MED", False]
+    get_meal_by_id(1)
+    mocker.patch.dict('os.environ', {'SQL_CREATE_TABLE_PATH': 'sql/create_meal_table.sql'})
+    mocker.patch("builtins.open", mocker.mock_open(read_data="script"))
+
+    clear_meals()
+
+    assert meal_cache.stats()['size'] == 0
+
+def test_get_meals_by_names(mock_cursor):
+    """Test retrieving several meals by name in one query."""
+
+    mock_cursor.fetchall.return_value = [
+        (1, "Pizza", "Italian", 5.00, "MED", False),
+        (2, "Sushi", "Japanese", 12.00, "HIGH", False),
+    ]
+
+    meals = get_meals_by_names(["Pizza", "Sushi", "Pizza"])
+
+    assert meals["Pizza"] == Meal(1, "Pizza", "Italian", 5.00, "MED")
+    assert meals["Sushi"] == Meal(2, "Sushi", "Japanese", 12.00, "HIGH")
+
+    expected_query = "SELECT id, meal, cuisine, price, difficulty, deleted FROM meals WHERE meal IN (?, ?)"
+    assert mock_cursor.execute.call_args[0] == (expected_query, ["Pizza", "Sushi"])
+
+def test_get_meals_by_names_missing(mock_cursor):
+    """Test error when one of the requested meals does not exist."""
+
+    mock_cursor.fetchall.return_value = [(1, "Pizza", "Italian", 5.00, "MED", False)]
+
+    with pytest.raises(ValueError, match="Meal with name Sushi not found"):
+        get_meals_by_names(["Pizza", "Sushi"])
+
 ##################################################
 # Update Meal Stats test cases
 ##################################################
@@ -254,8 +461,8 @@ def test_get_meal_by_id_bad_id(mock_cursor):
 def test_update_meal_stats_win(mock_cursor):
     """Test updating the battle stats when result is 'win'"""
 
-    # Simulate that the meal exists and is not deleted (id = 1)
-    mock_cursor.fetchone.return_value = [False]
+    # Simulate that the conditional update matched the live meal (id = 1)
+    mock_cursor.fetchone.return_value = (5, 3)
 
     # Call the update_meal_stats function with a sample meal ID and result
     meal_id = 1
@@ -264,62 +471,162 @@ def test_update_meal_stats_win(mock_cursor):
 
     # Normalize the expected SQL query
     expected_query = normalize_whitespace("""
-        UPDATE meals SET battles = battles + 1, wins = wins + 1 WHERE id = ?
+        UPDATE meals SET battles = battles + 1, wins = wins + ?
+        WHERE id = ? AND deleted = FALSE
+        RETURNING battles, wins
     """)
 
      # Ensure the SQL query was executed correctly
-    actual_query = normalize_whitespace(mock_cursor.execute.call_args_list[1][0][0])
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args_list[0][0][0])
 
     # Assert that the SQL query was correct
     assert actual_query == expected_query, "The SQL query did not match the expected structure."
 
     # Extract the arguments used in the SQL call
-    actual_arguments = mock_cursor.execute.call_args_list[1][0][1]
+    actual_arguments = mock_cursor.execute.call_args_list[0][0][1]
 
-    # Assert that the SQL query was executed with the correct arguments (meal ID, reasult)
-    expected_arguments = (meal_id,)
+    # Assert that the SQL query was executed with the correct arguments (win increment, meal ID)
+    expected_arguments = (1, meal_id)
     assert actual_arguments == expected_arguments, f"The SQL query arguments did not match. Expected {expected_arguments}, got {actual_arguments}."
 
+    # Ensure the leaderboard summary row was refreshed from the returned stats
+    expected_summary_query = normalize_whitespace("""
+        INSERT INTO meal_leaderboard (meal_id, battles, wins, win_pct)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(meal_id) DO UPDATE SET
+            battles = excluded.battles, wins = excluded.wins, win_pct = excluded.win_pct
+    """)
+    actual_summary_query = normalize_whitespace(mock_cursor.execute.call_args_list[1][0][0])
+    assert actual_summary_query == expected_summary_query, "The leaderboard summary query did not match the expected structure."
+    assert mock_cursor.execute.call_args_list[1][0][1] == (meal_id, 5, 3, 0.6)
+
 
 def test_update_meal_stats_loss(mock_cursor):
     """Test updating the battle stats when result is 'loss'"""
 
-    # Simulate that the meal exists and is not deleted (id = 1)
-    mock_cursor.fetchone.return_value = [False]
+    # Simulate that the conditional update matched the live meal (id = 1)
+    mock_cursor.fetchone.return_value = (5, 3)
 
     # Call the update_meal_stats function with a sample meal ID and result
     meal_id = 1
     result = "loss"
     update_meal_stats(meal_id, result)
 
-    # Normalize the expected SQL query
-    expected_query = normalize_whitespace("""
-        UPDATE meals SET battles = battles + 1 WHERE id = ?
-    """)
-
-     # Ensure the SQL query was executed correctly
-    actual_query = normalize_whitespace(mock_cursor.execute.call_args_list[1][0][0])
-
-    # Assert that the SQL query was correct
-    assert actual_query == expected_query, "The SQL query did not match the expected structure."
-
     # Extract the arguments used in the SQL call
-    actual_arguments = mock_cursor.execute.call_args_list[1][0][1]
+    actual_arguments = mock_cursor.execute.call_args_list[0][0][1]
 
-    # Assert that the SQL query was executed with the correct arguments (meal ID, reasult)
-    expected_arguments = (meal_id,)
+    # Assert that no win was added
+    expected_arguments = (0, meal_id)
     assert actual_arguments == expected_arguments, f"The SQL query arguments did not match. Expected {expected_arguments}, got {actual_arguments}."
 
 ### Test for Updating a Deleted Meal:
 def test_update_meal_stats_deleted_meal(mock_cursor):
     """Test error when trying to update stats for a deleted meal."""
 
-    # Simulate that the meal exists but is marked as deleted (id = 1)
-    mock_cursor.fetchone.return_value = [True]
+    # Simulate that the update matched nothing because the meal is deleted (id = 1)
+    mock_cursor.fetchone.side_effect = [None, (True,)]
 
     # Expect a ValueError when attempting to update a deleted meal
     with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
         update_meal_stats(1, "win")
 
-    # Ensure that no SQL query for updating meal count was executed
-    mock_cursor.execute.assert_called_once_with("SELECT deleted FROM meals WHERE id = ?", (1,))
\ No newline at end of file
+    # Ensure the leaderboard summary was not touched
+    assert mock_cursor.execute.call_count == 2
+    mock_cursor.execute.assert_called_with("SELECT deleted FROM meals WHERE id = ?", (1,))
+
+def test_update_meal_stats_missing_meal(mock_cursor):
+    """Test error when trying to update stats for a meal that does not exist."""
+
+    mock_cursor.fetchone.side_effect = [None, None]
+
+    with pytest.raises(ValueError, match="Meal with ID 1 not found"):
+        update_meal_stats(1, "loss")
+
+def test_update_meal_stats_invalid_result(mock_cursor):
+    """Test that an invalid result is rejected before touching the database."""
+
+    with pytest.raises(ValueError, match="Invalid result: draw"):
+        update_meal_stats(1, "draw")
+
+    mock_cursor.execute.assert_not_called()
+
+
+def test_update_meal_stats_batch(mock_cursor):
+    """Test updating the stats of several meals in one transaction."""
+
+    mock_cursor.fetchall.return_value = [(1, False), (2, False)]
+
+    update_meal_stats_batch([(1, 'win'), (2, 'loss'), (2, 'win'), (1, 'loss'), (1, 'win')])
+
+    assert mock_cursor.execute.call_args_list[0][0][0] == "BEGIN IMMEDIATE", "Expected the check to run under the write lock"
+    expected_query = "UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ? AND deleted = FALSE"
+    update_call = mock_cursor.executemany.call_args_list[0][0]
+    assert update_call[0] == expected_query, "The UPDATE query did not match the expected structure."
+    assert update_call[1] == [(3, 2, 1), (2, 1, 2)], f"Expected aggregated deltas, got {update_call[1]}"
+
+    summary_call = mock_cursor.executemany.call_args_list[1][0]
+    assert "INSERT INTO meal_leaderboard" in summary_call[0]
+    assert summary_call[1] == [(1,), (2,)]
+
+def test_update_meal_stats_batch_deleted_meal(mock_cursor):
+    """Test that a deleted meal aborts the whole batch before any update."""
+
+    mock_cursor.fetchall.return_value = [(1, False), (2, True)]
+
+    with pytest.raises(ValueError, match="Meal with ID 2 has been deleted"):
+        update_meal_stats_batch([(1, 'win'), (2, 'loss')])
+
+    mock_cursor.executemany.assert_not_called()
+
+def test_update_meal_stats_batch_concurrent_delete(tmp_path, mocker):
+    """Test that a meal deleted while a batch is being checked stays off the leaderboard."""
+    db_path = str(tmp_path / "meal_max.db")
+    migrate(db_path)
+    pool = ConnectionPool(db_path, max_size=2)
+    mocker.patch("meal_max.utils.sql_utils.pool", pool)
+    create_meal("Pizza", "Italian", 5.00, "MED")
+    create_meal("Tacos", "Mexican", 3.00, "LOW")
+
+    deleter = threading.Thread(target=delete_meal, args=(1,))
+
+    def delete_after_check(statement):
+        # Another worker deletes meal 1 once the batch has checked it and starts writing
+        if statement.startswith("UPDATE meals SET battles") and deleter.ident is None:
+            deleter.start()
+            deleter.join(0.2)
+
+    conn = pool.acquire()
+    conn.set_trace_callback(delete_after_check)
+    pool.release(conn)  # The batch gets this connection back; the deleter opens another
+
+    update_meal_stats_batch([(1, 'win'), (2, 'loss')])
+    deleter.join()
+    conn.set_trace_callback(None)
+
+    assert [row['id'] for row in get_leaderboard()] == [2]
+    with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
+        get_meal_by_id(1)
+    pool.close()
+
+def test_update_meal_stats_batch_invalid_result(mock_cursor):
+    """Test error when a batch contains an unknown result."""
+
+    with pytest.raises(ValueError, match="Invalid result: draw"):
+        update_meal_stats_batch([(1, 'draw')])
+
+##################################################
+# Meal record test cases
+##################################################
+
+def test_meal_from_row(sample_meal):
+    """Test that a trusted row builds an equal meal, and that meals carry no per-instance dict."""
+    meal = Meal.from_row((1, "Pizza", "Italian", 5.00, "MED"))
+
+    assert meal == sample_meal
+    assert not hasattr(meal, "__dict__")
+    with pytest.raises(AttributeError):
+        meal.rating = 5
+
+def test_meal_to_dict(sample_meal):
+    """Test serializing a meal to a dictionary."""
+    assert sample_meal.to_dict() == {'id': 1, 'meal': "Pizza", 'cuisine': "Italian", 'price': 5.00, 'difficulty': "MED"}
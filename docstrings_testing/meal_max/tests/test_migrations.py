@@ -0,0 +1,161 @@
+import os
+import sqlite3
+
+import pytest
+
+from meal_max.utils.migrations import MIGRATIONS_DIR, get_schema_version, load_migrations, migrate
+
+CREATE_TABLE_PATH = os.path.join(os.path.dirname(MIGRATIONS_DIR), "create_meal_table.sql")
+
+# The schema create_meal_table.sql produced before migrations existed
+LEGACY_SCHEMA = """
+    CREATE TABLE meals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        meal TEXT NOT NULL UNIQUE,
+        cuisine TEXT NOT NULL,
+        price REAL NOT NULL,
+        difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
+        battles INTEGER DEFAULT 0,
+        wins INTEGER DEFAULT 0,
+        deleted BOOLEAN DEFAULT FALSE
+    );
+"""
+
+LEADERBOARD_QUERY = """
+    SELECT m.id, m.meal, m.cuisine, m.price, m.difficulty, l.battles, l.wins, l.win_pct
+    FROM meal_leaderboard l JOIN meals m ON m.id = l.meal_id
+    ORDER BY l.{} DESC, l.meal_id LIMIT ? OFFSET ?
+"""
+
+######################################################
+#
+#    Helpers
+#
+######################################################
+
+def schema_of(db_path: str) -> set:
+    """Returns the tables and indexes of a database, with their normalized SQL."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'").fetchall()
+    finally:
+        conn.close()
+    return {(kind, name, " ".join(sql.replace("IF NOT EXISTS ", "").split())) for kind, name, sql in rows}
+
+def write_migration(directory, file_name: str, sql: str) -> None:
+    (directory / file_name).write_text(sql)
+
+######################################################
+#
+#    Upgrades
+#
+######################################################
+
+def test_migrate_fresh_database(tmp_path):
+    """Test that migrating an empty file produces the same schema as the create script."""
+    migrated = str(tmp_path / "migrated.db")
+    created = str(tmp_path / "created.db")
+
+    version = migrate(migrated)
+
+    conn = sqlite3.connect(created)
+    with open(CREATE_TABLE_PATH) as fh:
+        conn.executescript(fh.read())
+    created_version = get_schema_version(conn)
+    conn.close()
+
+    assert version == load_migrations()[-1].version
+    assert created_version == version, "create_meal_table.sql must set the latest schema version."
+    assert schema_of(migrated) == schema_of(created)
+
+def test_migrate_legacy_database_keeps_data(tmp_path):
+    """Test that a database created by the old script is upgraded in place and the leaderboard backfilled."""
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany(
+        "INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins, deleted) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [("Pizza", "Italian", 10.0, "LOW", 4, 3, False),
+         ("Tacos", "Mexican", 8.0, "MED", 0, 0, False),
+         ("Sushi", "Japanese", 20.0, "HIGH", 2, 1, True)]
+    )
+    conn.commit()
+    conn.close()
+
+    migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    meals = conn.execute("SELECT meal FROM meals ORDER BY id").fetchall()
+    leaderboard = conn.execute("SELECT meal_id, battles, wins, win_pct FROM meal_leaderboard").fetchall()
+    conn.close()
+
+    assert meals == [("Pizza",), ("Tacos",), ("Sushi",)]
+    assert leaderboard == [(1, 4, 3, 0.75)], "Only live meals with battles belong on the leaderboard."
+
+def test_migrate_is_idempotent(tmp_path):
+    """Test that a second run finds nothing to apply."""
+    db_path = str(tmp_path / "meal_max.db")
+    first = migrate(db_path)
+    before = schema_of(db_path)
+
+    assert migrate(db_path) == first
+    assert schema_of(db_path) == before
+
+def test_migrate_failure_rolls_back(tmp_path):
+    """Test that a failing migration leaves the schema and version untouched."""
+    migrations_dir = tmp_path / "migrations"
+    migrations_dir.mkdir()
+    write_migration(migrations_dir, "0001_create.sql", "CREATE TABLE t (id INTEGER PRIMARY KEY);")
+    db_path = str(tmp_path / "meal_max.db")
+    migrate(db_path, str(migrations_dir))
+
+    write_migration(migrations_dir, "0002_index.sql", "CREATE INDEX idx_t ON t (id);")
+    write_migration(migrations_dir, "0003_broken.sql", "CREATE INDEX idx_missing ON missing (id);")
+
+    with pytest.raises(sqlite3.OperationalError, match="no such table: main.missing"):
+        migrate(db_path, str(migrations_dir))
+
+    conn = sqlite3.connect(db_path)
+    assert get_schema_version(conn) == 1
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'idx_t'").fetchone() is None
+    conn.close()
+
+def test_migrate_rejects_newer_database(tmp_path):
+    """Test that a database from a newer release is not touched."""
+    db_path = str(tmp_path / "meal_max.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA user_version = 99")
+    conn.close()
+
+    with pytest.raises(ValueError, match="newer than the latest migration"):
+        migrate(db_path)
+
+def test_load_migrations_rejects_gaps(tmp_path):
+    """Test that misnumbered migration files are refused."""
+    write_migration(tmp_path, "0001_create.sql", "SELECT 1;")
+    write_migration(tmp_path, "0003_skipped.sql", "SELECT 1;")
+
+    with pytest.raises(ValueError, match="expected 2, got 3"):
+        load_migrations(str(tmp_path))
+
+######################################################
+#
+#    Query plans
+#
+######################################################
+
+@pytest.mark.parametrize("sort_by, index", [
+    ("wins", "idx_meal_leaderboard_wins"),
+    ("win_pct", "idx_meal_leaderboard_win_pct"),
+])
+def test_leaderboard_reads_covering_index(tmp_path, sort_by, index):
+    """Test that leaderboard pages are read from a covering index without a sort."""
+    db_path = str(tmp_path / "meal_max.db")
+    migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + LEADERBOARD_QUERY.format(sort_by), (10, 0))]
+    conn.close()
+
+    assert f"SCAN l USING COVERING INDEX {index}" in plan
+    assert not any("TEMP B-TREE" in step for step in plan)
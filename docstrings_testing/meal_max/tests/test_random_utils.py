@@ -1,8 +1,10 @@
+import time
+
 import pytest
 from meal_max.models.battle_model import BattleModel
 from meal_max.models.kitchen_model import Meal
 from unittest.mock import patch, MagicMock
-from meal_max.utils.random_utils import get_random
+from meal_max.utils.random_utils import RandomBuffer, get_random, get_random_batch
 import requests
 
 def test_get_random_success(mocker):
@@ -37,4 +39,91 @@ def test_get_random_request_exception(mocker):
     mocker.patch("requests.get", side_effect=requests.exceptions.RequestException("Network error"))
     
     with pytest.raises(RuntimeError, match="Request to random.org failed: Network error"):
-        get_random()
\ No newline at end of file
+        get_random()
+
+def test_get_random_batch_success(mocker):
+    """Test get_random_batch() parses one number per line"""
+    mock_response = MagicMock()
+    mock_response.text = "0.12\n0.34\n0.56\n"
+
+    mocker.patch("requests.get", return_value=mock_response)
+
+    result = get_random_batch(3)
+    assert result == [0.12, 0.34, 0.56], f"Expected [0.12, 0.34, 0.56] but got {result}"
+    requests.get.assert_called_once_with("https://www.random.org/decimal-fractions/?num=3&dec=2&col=1&format=plain&rnd=new", timeout=5)
+
+def test_get_random_batch_invalid_size():
+    """Test get_random_batch() rejects sizes random.org does not accept"""
+    with pytest.raises(ValueError, match="Invalid batch size: 0"):
+        get_random_batch(0)
+
+
+##################################################
+# Random Buffer Test Cases
+##################################################
+
+def test_random_buffer_serves_from_memory():
+    """Test the buffer only fetches once for several reads"""
+    fetch = MagicMock(return_value=[0.1, 0.2, 0.3, 0.4])
+    buffer = RandomBuffer(batch_size=4, low_water=0, high_water=4, fetch=fetch)
+
+    assert buffer.get() == 0.1
+    assert buffer.get() == 0.2
+    assert buffer.get_many(2) == [0.3, 0.4]
+    fetch.assert_called_once_with(4)
+
+    stats = buffer.stats()
+    assert stats['served'] == 4
+    assert stats['underruns'] == 1, "Expected the first read on an empty buffer to count as an underrun"
+
+def test_random_buffer_refills_in_background():
+    """Test the buffer refills up to the high-water mark once it drops below the low-water mark"""
+    fetch = MagicMock(return_value=[0.5, 0.5])
+    buffer = RandomBuffer(batch_size=2, low_water=2, high_water=4, fetch=fetch)
+
+    buffer.get()
+    # Wait for the background refill to settle
+    for _ in range(100):
+        if not buffer._refilling:
+            break
+        time.sleep(0.01)
+
+    stats = buffer.stats()
+    assert stats['buffered'] >= 4, f"Expected the buffer to be refilled, got {stats['buffered']}"
+    assert stats['underruns'] == 1
+
+def test_random_buffer_underrun_propagates_failure():
+    """Test a read on an empty buffer surfaces random.org failures"""
+    fetch = MagicMock(side_effect=RuntimeError("Request to random.org timed out."))
+    buffer = RandomBuffer(batch_size=2, low_water=0, high_water=2, fetch=fetch)
+
+    with pytest.raises(RuntimeError, match="Request to random.org timed out."):
+        buffer.get()
+
+def test_random_buffer_refill_stops_on_empty_batch():
+    """Test a background refill that gets an empty batch gives up instead of spinning"""
+    fetch = MagicMock(return_value=[])
+    buffer = RandomBuffer(batch_size=2, low_water=2, high_water=4, fetch=fetch)
+
+    buffer._refilling = True
+    buffer._refill()
+
+    fetch.assert_called_once_with(2)
+    stats = buffer.stats()
+    assert stats['refill_failures'] == 1
+    assert stats['buffered'] == 0
+    assert not buffer._refilling
+
+def test_random_buffer_underrun_empty_batch():
+    """Test a read on an empty buffer rejects an empty batch instead of spinning"""
+    fetch = MagicMock(return_value=[])
+    buffer = RandomBuffer(batch_size=2, low_water=0, high_water=2, fetch=fetch)
+
+    with pytest.raises(ValueError, match="empty response"):
+        buffer.get()
+    fetch.assert_called_once_with(2)
+
+def test_random_buffer_invalid_watermarks():
+    """Test the buffer rejects a low-water mark above the high-water mark"""
+    with pytest.raises(ValueError, match="Watermarks must satisfy"):
+        RandomBuffer(batch_size=2, low_water=5, high_water=2)
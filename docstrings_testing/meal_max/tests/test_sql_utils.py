@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+from meal_max.utils.sql_utils import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Fixture providing a small connection pool backed by a temporary database."""
+    pool = ConnectionPool(str(tmp_path / "meal_max.db"), max_size=2, timeout=0.05)
+    yield pool
+    pool.close()
+
+
+##################################################
+# Connection Pool Test Cases
+##################################################
+
+def test_acquire_reuses_released_connection(pool):
+    """Test that a released connection is handed out again instead of opening a new one."""
+    conn = pool.acquire()
+    pool.release(conn)
+
+    assert pool.acquire() is conn
+    assert pool.stats()['created'] == 1, "Expected a single connection to be opened"
+
+def test_connection_pragmas_applied(pool):
+    """Test that pooled connections are opened in WAL mode."""
+    conn = pool.acquire()
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal_mode == "wal", f"Expected WAL journal mode, got {journal_mode}"
+    pool.release(conn)
+
+def test_release_rolls_back_open_transaction(pool):
+    """Test that returning a connection discards uncommitted work."""
+    conn = pool.acquire()
+    conn.execute("CREATE TABLE meals (id INTEGER PRIMARY KEY)")
+    conn.commit()
+    conn.execute("INSERT INTO meals (id) VALUES (1)")
+    pool.release(conn)
+
+    conn = pool.acquire()
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM meals").fetchone()[0] == 0
+
+def test_acquire_times_out_when_exhausted(pool):
+    """Test that waiting on an exhausted pool is bounded and counted."""
+    pool.acquire()
+    pool.acquire()
+
+    with pytest.raises(sqlite3.OperationalError, match="Timed out waiting for a database connection"):
+        pool.acquire()
+
+    stats = pool.stats()
+    assert stats['in_use'] == 2
+    assert stats['waits'] == 1
@@ -0,0 +1,33 @@
+import io
+
+from meal_max.utils.stream_parsers import iter_csv_records, iter_ndjson_records
+
+
+def test_iter_csv_records():
+    """Test that CSV rows are keyed by the header and numbered from 1."""
+    body = io.StringIO("meal,cuisine,price,difficulty\nPizza,Italian,5.0,MED\nTacos,Mexican,3.0,LOW,extra\n")
+
+    records = list(iter_csv_records(body))
+
+    assert records[0] == (1, {"meal": "Pizza", "cuisine": "Italian", "price": "5.0", "difficulty": "MED"})
+    assert records[1][0] == 2
+    assert isinstance(records[1][1], ValueError)
+
+def test_iter_ndjson_records():
+    """Test that NDJSON lines are decoded one at a time and bad lines become errors."""
+    body = io.BytesIO(b'{"meal": "Pizza"}\n\nnot json\n[1, 2]\n')
+
+    records = list(iter_ndjson_records(body))
+
+    assert records[0] == (1, {"meal": "Pizza"})
+    assert [row for row, _ in records] == [1, 2, 3]
+    assert isinstance(records[1][1], ValueError)
+    assert str(records[2][1]) == "Expected a JSON object"
+
+def test_iter_ndjson_records_is_lazy():
+    """Test that records are yielded before the rest of the body is read."""
+    def lines():
+        yield '{"meal": "Pizza"}\n'
+        raise AssertionError("read too far")
+
+    assert next(iter_ndjson_records(lines())) == (1, {"meal": "Pizza"})
@@ -1,8 +1,20 @@
+import atexit
+import io
+import json
+import signal
+import sys
+
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, Response, request
+from flask import Flask, jsonify, make_response, Response, request, stream_with_context
 
 from music_collection.models import song_model
+from music_collection.models.persistent_playlist import PLAYLIST_BACKEND, PersistentPlaylistModel
+from music_collection.models.play_count_buffer import PLAY_COUNT_WRITE_BEHIND, PlayCountBuffer
 from music_collection.models.playlist_model import PlaylistModel
+from music_collection.utils.metrics import CONTENT_TYPE, instrument_app, render_metrics
+from music_collection.utils.random_utils import get_random_source_stats
+from music_collection.utils.stream_parsers import iter_csv_records, iter_ndjson_records
+from music_collection.utils.sql_trace import get_sql_trace_stats
 from music_collection.utils.sql_utils import check_database_connection, check_table_exists
 
 
@@ -11,7 +23,24 @@ load_dotenv()
 
 app = Flask(__name__)
 
-playlist_model = PlaylistModel()
+# Record request counts and latency for every route
+instrument_app(app)
+
+# Optionally collect play counts in memory and write them behind in batches
+play_count_buffer = None
+if PLAY_COUNT_WRITE_BEHIND:
+    play_count_buffer = PlayCountBuffer()
+    play_count_buffer.start()
+    # Flush pending plays on a graceful shutdown
+    atexit.register(play_count_buffer.stop)
+
+# The sqlite backend shares the playlist between worker processes and keeps it across restarts
+if PLAYLIST_BACKEND == "sqlite":
+    playlist_model = PersistentPlaylistModel(play_count_buffer=play_count_buffer)
+elif PLAYLIST_BACKEND == "memory":
+    playlist_model = PlaylistModel(play_count_buffer=play_count_buffer)
+else:
+    raise ValueError(f"Unknown PLAYLIST_BACKEND: {PLAYLIST_BACKEND} (expected 'memory' or 'sqlite')")
 
 
 ####################################################
@@ -53,6 +82,57 @@ def db_check() -> Response:
     except Exception as e:
         return make_response(jsonify({'error': str(e)}), 404)
 
+@app.route('/metrics', methods=['GET'])
+def metrics() -> Response:
+    """
+    Route to expose request, database and random.org metrics to Prometheus.
+
+    Returns:
+        The metrics in the Prometheus text exposition format.
+    """
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+@app.route('/api/sql-trace-stats', methods=['GET'])
+def sql_trace_stats() -> Response:
+    """
+    Route to get per-statement timings collected when SQL_TRACE is enabled.
+
+    Query Parameter:
+        - limit (int, optional): Return only this many statements, slowest total time first.
+
+    Returns:
+        JSON response with the count, total, mean, p99 and max time of each statement template.
+    """
+    app.logger.info('Retrieving SQL trace stats')
+    try:
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError:
+        return make_response(jsonify({'error': 'limit must be an integer'}), 400)
+    return make_response(jsonify({'status': 'success', 'statements': get_sql_trace_stats(limit)}), 200)
+
+@app.route('/api/catalog-cache-stats', methods=['GET'])
+def catalog_cache_stats() -> Response:
+    """
+    Route to get the counters of the catalog cache.
+
+    Returns:
+        JSON response with the cache counters, or null when the cache is disabled.
+    """
+    app.logger.info('Retrieving catalog cache stats')
+    stats = song_model.catalog_cache.stats() if song_model.catalog_cache is not None else None
+    return make_response(jsonify({'status': 'success', 'catalog_cache': stats}), 200)
+
+@app.route('/api/random-source-stats', methods=['GET'])
+def random_source_stats() -> Response:
+    """
+    Route to get the state of the random.org circuit breaker.
+
+    Returns:
+        JSON response with the breaker state and its failure and rejection counters.
+    """
+    app.logger.info('Retrieving random source stats')
+    return make_response(jsonify({'status': 'success', 'random_org': get_random_source_stats()}), 200)
+
 
 ##########################################################
 #
@@ -101,6 +181,42 @@ def add_song() -> Response:
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+@app.route('/api/import-songs', methods=['POST'])
+def import_songs() -> Response:
+    """
+    Route to bulk import songs from a CSV or NDJSON request body.
+
+    The body is parsed as it is read, so uploads of any size use constant memory.
+    CSV bodies need a header row naming the artist, title, year, genre and duration columns;
+    NDJSON bodies hold one JSON object with those keys per line.
+
+    Query Parameter:
+        - format (str, optional): 'csv' or 'ndjson'. Defaults to the request content type.
+
+    Returns:
+        JSON response with the import counts and the row numbers of rejected rows.
+    Raises:
+        400 error if the format is not supported.
+        500 error if there is an issue writing to the database.
+    """
+    app.logger.info('Bulk importing songs into the catalog')
+    try:
+        body_format = request.args.get('format') or request.mimetype.split('/')[-1]
+        if body_format == 'csv':
+            records = iter_csv_records(io.TextIOWrapper(request.stream, encoding='utf-8', newline=''))
+        elif body_format in ('ndjson', 'x-ndjson', 'jsonl'):
+            records = iter_ndjson_records(request.stream)
+        else:
+            return make_response(jsonify({'error': 'Unsupported format, use csv or ndjson'}), 400)
+
+        summary = song_model.import_songs(records)
+        app.logger.info("Imported %d songs", summary['inserted'])
+        return make_response(jsonify({'status': 'success', **summary}), 200)
+    except Exception as e:
+        app.logger.error("Failed to import songs: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+
 @app.route('/api/delete-song/<int:song_id>', methods=['DELETE'])
 def delete_song(song_id: int) -> Response:
     """
@@ -126,24 +242,77 @@ def get_all_songs() -> Response:
     """
     Route to retrieve all songs in the catalog (non-deleted), with an option to sort by play count.
 
+    Without paging parameters the whole catalog is returned in one response.
+
     Query Parameter:
         - sort_by_play_count (bool, optional): If true, sort songs by play count.
+        - limit (int, optional): Return one page of at most this many songs.
+        - after_id (int, optional): Start the page after the song with this id.
+        - after_play_count (int, optional): Start the page after this play count (sorted mode, with after_id).
+        - stream (bool, optional): If true, stream the whole catalog as it is read from the database.
 
     Returns:
-        JSON response with the list of songs or error message.
+        JSON response with the list of songs or error message. Paged responses include
+        a 'next' object with the keyset for the following page, or null on the last page.
     """
     try:
         # Extract query parameter for sorting by play count
         sort_by_play_count = request.args.get('sort_by_play_count', 'false').lower() == 'true'
+        stream = request.args.get('stream', 'false').lower() == 'true'
+
+        try:
+            paging = {
+                name: int(request.args[name])
+                for name in ('limit', 'after_id', 'after_play_count')
+                if name in request.args
+            }
+        except ValueError:
+            return make_response(jsonify({'error': 'limit, after_id and after_play_count must be integers'}), 400)
+
+        if stream:
+            app.logger.info("Streaming all songs from the catalog, sort_by_play_count=%s", sort_by_play_count)
+            songs = song_model.iter_all_songs(sort_by_play_count=sort_by_play_count)
+            # Run the query before the response starts so errors still map to a 500
+            first = next(songs, None)
+            return Response(stream_with_context(_stream_songs(first, songs)), mimetype='application/json')
+
+        if paging:
+            limit = paging.pop('limit', song_model.CATALOG_PAGE_SIZE)
+            app.logger.info("Retrieving a page of songs from the catalog, limit=%d, keyset=%s", limit, paging)
+            songs = song_model.get_songs_page(limit=limit, sort_by_play_count=sort_by_play_count, **paging)
+            next_page = None
+            if len(songs) == limit:
+                next_page = {'after_id': songs[-1]['id']}
+                if sort_by_play_count:
+                    next_page['after_play_count'] = songs[-1]['play_count']
+            return make_response(jsonify({'status': 'success', 'songs': songs, 'next': next_page}), 200)
 
         app.logger.info("Retrieving all songs from the catalog, sort_by_play_count=%s", sort_by_play_count)
         songs = song_model.get_all_songs(sort_by_play_count=sort_by_play_count)
 
         return make_response(jsonify({'status': 'success', 'songs': songs}), 200)
+    except ValueError as e:
+        app.logger.error(f"Invalid catalog page request: {e}")
+        return make_response(jsonify({'error': str(e)}), 400)
     except Exception as e:
         app.logger.error(f"Error retrieving songs: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+def _stream_songs(first, songs):
+    """
+    Yields the catalog response body one song at a time.
+
+    Args:
+        first (dict or None): The first song, already read from the database.
+        songs (Iterator[dict]): The remaining songs.
+    """
+    yield '{"status": "success", "songs": ['
+    if first is not None:
+        yield json.dumps(first)
+        for song in songs:
+            yield ', ' + json.dumps(song)
+    yield ']}'
+
 
 @app.route('/api/get-song-from-catalog-by-id/<int:song_id>', methods=['GET'])
 def get_song_by_id(song_id: int) -> Response:
@@ -159,7 +328,7 @@ def get_song_by_id(song_id: int) -> Response:
     try:
         app.logger.info(f"Retrieving song by ID: {song_id}")
         song = song_model.get_song_by_id(song_id)
-        return make_response(jsonify({'status': 'success', 'song': song}), 200)
+        return make_response(jsonify({'status': 'success', 'song': song.to_dict()}), 200)
     except Exception as e:
         app.logger.error(f"Error retrieving song by ID: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
@@ -194,7 +363,7 @@ def get_song_by_compound_key() -> Response:
 
         app.logger.info(f"Retrieving song by compound key: {artist}, {title}, {year}")
         song = song_model.get_song_by_compound_key(artist, title, year)
-        return make_response(jsonify({'status': 'success', 'song': song}), 200)
+        return make_response(jsonify({'status': 'success', 'song': song.to_dict()}), 200)
 
     except Exception as e:
         app.logger.error(f"Error retrieving song by compound key: {e}")
@@ -211,7 +380,7 @@ def get_random_song() -> Response:
     try:
         app.logger.info("Retrieving a random song from the catalog")
         song = song_model.get_random_song()
-        return make_response(jsonify({'status': 'success', 'song': song}), 200)
+        return make_response(jsonify({'status': 'success', 'song': song.to_dict()}), 200)
     except Exception as e:
         app.logger.error(f"Error retrieving a random song: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
@@ -384,14 +553,14 @@ def play_entire_playlist() -> Response:
     Route to play all songs in the playlist.
 
     Returns:
-        JSON response indicating success of the operation.
+        JSON response indicating success of the operation and any songs whose play count could not be updated.
     Raises:
         500 error if there is an issue playing the playlist.
     """
     try:
         app.logger.info('Playing entire playlist')
-        playlist_model.play_entire_playlist()
-        return make_response(jsonify({'status': 'success'}), 200)
+        failures = playlist_model.play_entire_playlist()
+        return make_response(jsonify({'status': 'success', 'failures': failures}), 200)
     except Exception as e:
         app.logger.error(f"Error playing playlist: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
@@ -402,14 +571,14 @@ def play_rest_of_playlist() -> Response:
     Route to play the rest of the playlist from the current track.
 
     Returns:
-        JSON response indicating success of the operation.
+        JSON response indicating success of the operation and any songs whose play count could not be updated.
     Raises:
         500 error if there is an issue playing the rest of the playlist.
     """
     try:
         app.logger.info('Playing rest of the playlist')
-        playlist_model.play_rest_of_playlist()
-        return make_response(jsonify({'status': 'success'}), 200)
+        failures = playlist_model.play_rest_of_playlist()
+        return make_response(jsonify({'status': 'success', 'failures': failures}), 200)
     except Exception as e:
         app.logger.error(f"Error playing rest of the playlist: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
@@ -446,7 +615,7 @@ def get_all_songs_from_playlist() -> Response:
         # Get all songs from the playlist
         songs = playlist_model.get_all_songs()
 
-        return make_response(jsonify({'status': 'success', 'songs': songs}), 200)
+        return make_response(jsonify({'status': 'success', 'songs': [song.to_dict() for song in songs]}), 200)
 
     except Exception as e:
         app.logger.error(f"Error retrieving songs from playlist: {e}")
@@ -469,7 +638,7 @@ def get_song_by_track_number(track_number: int) -> Response:
         # Get the song by track number
         song = playlist_model.get_song_by_track_number(track_number)
 
-        return make_response(jsonify({'status': 'success', 'song': song}), 200)
+        return make_response(jsonify({'status': 'success', 'song': song.to_dict()}), 200)
 
     except ValueError as e:
         app.logger.error(f"Error retrieving song by track number: {e}")
@@ -492,7 +661,7 @@ def get_current_song() -> Response:
         # Get the current song
         current_song = playlist_model.get_current_song()
 
-        return make_response(jsonify({'status': 'success', 'current_song': current_song}), 200)
+        return make_response(jsonify({'status': 'success', 'current_song': current_song.to_dict()}), 200)
 
     except Exception as e:
         app.logger.error(f"Error retrieving current song: {e}")
@@ -523,6 +692,23 @@ def get_playlist_length_and_duration() -> Response:
         app.logger.error(f"Error retrieving playlist length and duration: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/get-playlist-stats', methods=['GET'])
+def get_playlist_stats() -> Response:
+    """
+    Route to retrieve the playlist's aggregates: length, total duration, songs per genre
+    and per decade, and the time elapsed before and remaining from the current track.
+
+    Returns:
+        JSON response with the playlist stats or error message.
+    """
+    try:
+        app.logger.info("Retrieving playlist stats")
+        return make_response(jsonify({'status': 'success', 'stats': playlist_model.get_playlist_stats()}), 200)
+
+    except Exception as e:
+        app.logger.error(f"Error retrieving playlist stats: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/go-to-track-number/<int:track_number>', methods=['POST'])
 def go_to_track_number(track_number: int) -> Response:
     """
@@ -704,11 +890,38 @@ def get_song_leaderboard() -> Response:
     try:
         app.logger.info("Generating song leaderboard sorted")
         leaderboard_data = song_model.get_all_songs(sort_by_play_count=True)
+        if play_count_buffer is not None:
+            # Include plays that have not been written to the database yet
+            leaderboard_data = play_count_buffer.merge_pending(leaderboard_data, sort_by_play_count=True)
         return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
     except Exception as e:
         app.logger.error(f"Error generating leaderboard: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+def _flush_plays_on_sigterm() -> None:
+    """
+    Makes SIGTERM flush pending plays before the process exits, then defers to the handler it replaces.
+
+    Only the development server installs this. A server such as gunicorn owns
+    its workers' signals and ends them with a normal exit, which runs atexit.
+    """
+    previous = signal.getsignal(signal.SIGTERM)
+    if previous == signal.SIG_IGN:
+        return
+
+    def handle_sigterm(signum, frame) -> None:
+        if callable(previous):
+            play_count_buffer.stop()
+            previous(signum, frame)
+        else:
+            # The default action would skip atexit; exit normally so it runs
+            sys.exit(0)
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+
 if __name__ == '__main__':
+    if play_count_buffer is not None:
+        _flush_plays_on_sigterm()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,238 @@
+"""
+Benchmarks for the playlist model and endpoint hot paths.
+
+Each size runs against a fresh temporary SQLite database seeded with that many
+songs, with random.org replaced by a local random source. Results are written
+as JSON so they can be compared between releases.
+
+The playlist model benchmarks run once per storage engine (see
+PLAYLIST_STORAGE), so the list and blocked engines can be compared; use a
+playlist as long as the catalog to see the difference on positional changes.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 1000000 --repeat 5 --output results.json
+    python benchmarks/run_benchmarks.py --sizes 1000000 --playlist-length 1000000 --storages list blocked
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+# The modules read their settings at import time, so point them at the
+# benchmark database and silence per-call logging before importing them.
+WORK_DIR = tempfile.mkdtemp(prefix="playlist_bench_")
+DB_PATH = os.path.join(WORK_DIR, "song_catalog.db")
+CREATE_TABLE_PATH = os.path.join(APP_DIR, "sql", "create_song_table.sql")
+os.environ["DB_PATH"] = DB_PATH
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import app as playlist_app  # noqa: E402
+from music_collection.models import song_model  # noqa: E402
+from music_collection.models.playlist_model import PlaylistModel  # noqa: E402
+from music_collection.models.playlist_storage import make_song_list  # noqa: E402
+
+GENRES = ["Rock", "Pop", "Jazz", "Hip-Hop", "Classical", "Country"]
+
+
+def stub_random_source(seed: int = 411) -> None:
+    """
+    Replaces random.org with a seeded local generator.
+    """
+    rng = random.Random(seed)
+    song_model.get_random = lambda num_songs: rng.randint(1, num_songs)
+
+
+def seed_database(size: int, seed: int = 411) -> None:
+    """
+    Recreates the schema and inserts `size` songs with random play counts.
+    """
+    rng = random.Random(seed)
+    with open(CREATE_TABLE_PATH) as fh:
+        script = fh.read()
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.executescript(script)
+
+        def songs():
+            for song_id in range(1, size + 1):
+                yield (f"Artist {song_id % 997}", f"Song {song_id}", rng.randint(1950, 2024),
+                       rng.choice(GENRES), rng.randint(60, 600), rng.randint(0, 10000))
+
+        conn.executemany(
+            "INSERT INTO songs (artist, title, year, genre, duration, play_count) VALUES (?, ?, ?, ?, ?, ?)",
+            songs()
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    song_model.invalidate_live_song_ids()
+
+
+def load_playlist(model: PlaylistModel, length: int) -> None:
+    """
+    Fills a playlist with the first `length` songs of the catalog.
+    """
+    model.clear_playlist()
+    after_id = None
+    while len(model.playlist) < length:
+        page = song_model.get_songs_page(limit=min(length - len(model.playlist), song_model.CATALOG_MAX_PAGE_SIZE),
+                                         after_id=after_id)
+        if not page:
+            break
+        model.playlist.extend(
+            song_model.Song(id=song["id"], artist=song["artist"], title=song["title"],
+                            year=song["year"], genre=song["genre"], duration=song["duration"])
+            for song in page
+        )
+        after_id = page[-1]["id"]
+    model.current_track_number = 1
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> dict:
+    """
+    Times `fn` `repeat` times after one warm-up call and returns summary statistics in seconds.
+    """
+    if setup:
+        setup()
+    fn()
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "max": max(timings),
+    }
+
+
+def playlist_benchmarks(model: PlaylistModel, storage: str, rng: random.Random, playlist_length: int) -> dict:
+    """
+    Returns the playlist model benchmarks for one storage engine, labelled with it.
+    """
+    def random_track_id() -> int:
+        return model.playlist[rng.randrange(len(model.playlist))].id
+
+    def swap_random_tracks() -> None:
+        if len(model.playlist) > 1:
+            first, second = rng.sample(range(len(model.playlist)), 2)
+            model.swap_songs_in_playlist(model.playlist[first].id, model.playlist[second].id)
+
+    def remove_and_reinsert_track() -> None:
+        track_number = rng.randint(1, len(model.playlist))
+        song = model.get_song_by_track_number(track_number)
+        model.remove_song_by_track_number(track_number)
+        model.playlist.insert(rng.randrange(len(model.playlist) + 1), song)
+
+    benchmarks = {
+        f"model.play_entire_playlist[{playlist_length}]": model.play_entire_playlist,
+        "model.get_song_by_track_number": lambda: model.get_song_by_track_number(rng.randint(1, len(model.playlist))),
+        "model.get_song_by_song_id": lambda: model.get_song_by_song_id(random_track_id()),
+        "model.move_song_to_beginning": lambda: model.move_song_to_beginning(random_track_id()),
+        "model.move_song_to_end": lambda: model.move_song_to_end(random_track_id()),
+        "model.move_song_to_track_number": lambda: model.move_song_to_track_number(
+            random_track_id(), rng.randint(1, len(model.playlist))),
+        "model.swap_songs_in_playlist": swap_random_tracks,
+        "model.remove_and_reinsert_track": remove_and_reinsert_track,
+    }
+    return {f"{name}[{storage}]": (fn, None) for name, fn in benchmarks.items()}
+
+
+def run_size(size: int, repeat: int, playlist_length: int, storages: List[str]) -> List[dict]:
+    """
+    Seeds a database with `size` songs and runs every benchmark against it.
+    """
+    seed_database(size)
+    stub_random_source()
+    rng = random.Random(size)
+    client = playlist_app.app.test_client()
+    playlist_length = min(playlist_length, size)
+
+    load_playlist(playlist_app.playlist_model, playlist_length)
+
+    def expect_ok(response) -> None:
+        if response.status_code >= 400:
+            raise RuntimeError(f"Benchmark request failed with {response.status_code}: {response.get_data(as_text=True)}")
+
+    benchmarks = {
+        "model.get_all_songs": (lambda: song_model.get_all_songs(), None),
+        "model.get_all_songs[sort_by_play_count]": (lambda: song_model.get_all_songs(sort_by_play_count=True), None),
+        "model.get_songs_page[limit=100]": (lambda: song_model.get_songs_page(limit=100, after_id=rng.randint(0, size)), None),
+        "model.iter_all_songs": (lambda: sum(1 for _ in song_model.iter_all_songs()), None),
+        "model.get_random_song": (song_model.get_random_song, None),
+        "http.get_all_songs[page=100]": (lambda: expect_ok(client.get("/api/get-all-songs-from-catalog?limit=100")), None),
+        "http.get_all_songs[stream]": (lambda: expect_ok(client.get("/api/get-all-songs-from-catalog?stream=true")), None),
+        "http.song_leaderboard": (lambda: expect_ok(client.get("/api/song-leaderboard")), None),
+        "http.get_random_song": (lambda: expect_ok(client.get("/api/get-random-song")), None),
+        f"http.play_entire_playlist[{playlist_length}]": (lambda: expect_ok(client.post("/api/play-entire-playlist")), None),
+    }
+    for storage in storages:
+        model = PlaylistModel(storage=storage)
+        load_playlist(model, playlist_length)
+        benchmarks.update(playlist_benchmarks(model, storage, rng, playlist_length))
+
+    results = []
+    for name, (fn, setup) in benchmarks.items():
+        stats = measure(fn, repeat, setup)
+        results.append({"benchmark": name, "size": size, **stats})
+        print(f"{name:<55} size={size:<8} median={stats['median'] * 1000:9.3f} ms", file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the playlist hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="Numbers of songs to seed (e.g. 1000 100000 1000000).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark.")
+    parser.add_argument("--playlist-length", type=int, default=1000, help="Tracks in the benchmarked playlist.")
+    parser.add_argument("--storages", nargs="+", default=["list", "blocked"],
+                        help="Playlist storage engines to benchmark the model with.")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    args = parser.parse_args()
+    for storage in args.storages:
+        make_song_list(storage)
+
+    results = []
+    try:
+        for size in args.sizes:
+            results.extend(run_size(size, args.repeat, args.playlist_length, args.storages))
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    report = {
+        "app": "playlist",
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "playlist_length": args.playlist_length,
+        "storages": args.storages,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
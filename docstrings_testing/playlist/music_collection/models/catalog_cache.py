@@ -0,0 +1,140 @@
+from collections import OrderedDict
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+from music_collection.utils.logger import configure_logger
+from music_collection.utils.sql_utils import DB_PATH
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# catalog cache settings, tunable from the environment
+CATALOG_CACHE = os.getenv("CATALOG_CACHE", "false").lower() == "true"
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "10000"))
+
+
+class CatalogCache:
+    """
+    An in-memory cache of catalog reads that stays correct across processes.
+
+    SQLite bumps `PRAGMA data_version` on a connection whenever any other
+    connection, in this process or another one, commits a change to the
+    database. The cache keeps one long-lived connection that does nothing
+    but read that counter. Before each lookup it compares the counter with
+    the version the entries were loaded under, and drops everything on a
+    mismatch. Entries are then reloaded lazily on the next miss.
+
+    Attributes:
+        db_path (str): The path of the SQLite database to watch.
+        max_size (int): The maximum number of cached entries.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, max_size: int = CATALOG_CACHE_SIZE):
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._watch_conn: Optional[sqlite3.Connection] = None
+        self._watch_pid: Optional[int] = None
+        self._version: Optional[int] = None
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def _read_version(self) -> int:
+        """
+        Reads the data version on the watcher connection. Must be called with the lock held.
+
+        The watcher is reopened after a fork, since SQLite connections must not be shared across processes.
+        """
+        if self._watch_conn is None or self._watch_pid != os.getpid():
+            self._watch_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._watch_pid = os.getpid()
+            self._version = None
+        return self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _validate(self) -> int:
+        """
+        Drops all entries if the database changed since they were loaded. Must be called with the lock held.
+
+        Returns:
+            int: The current data version.
+        """
+        version = self._read_version()
+        if version != self._version:
+            if self._entries:
+                logger.info("Catalog changed (data_version %s -> %s), dropping %d cached entries",
+                            self._version, version, len(self._entries))
+                self._invalidations += 1
+                self._entries.clear()
+            self._version = version
+        return version
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for a key, loading and caching it on a miss.
+
+        Exceptions raised by `load` propagate and nothing is cached.
+
+        Args:
+            key (Hashable): The cache key.
+            load (Callable[[], Any]): Reads the value from the database.
+
+        Returns:
+            Any: The cached or freshly loaded value.
+        """
+        with self._lock:
+            version = self._validate()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+
+        value = load()
+
+        with self._lock:
+            # A write may have landed while loading; only keep the value if it was
+            # loaded under the version the rest of the entries belong to.
+            if self._version == version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """
+        Drops all cached entries.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        """
+        Drops all cached entries and closes the watcher connection.
+        """
+        with self._lock:
+            self._entries.clear()
+            if self._watch_conn is not None and self._watch_pid == os.getpid():
+                self._watch_conn.close()
+            self._watch_conn = None
+            self._version = None
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the cache counters.
+        """
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'data_version': self._version,
+                'hits': self._hits,
+                'misses': self._misses,
+                'invalidations': self._invalidations,
+            }
@@ -0,0 +1,506 @@
+from contextlib import contextmanager
+import functools
+import logging
+import os
+import sqlite3
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from music_collection.models.play_count_buffer import PlayCountBuffer
+from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.playlist_storage import IndexedSongList
+from music_collection.models.song_model import Song
+from music_collection.utils.logger import configure_logger
+from music_collection.utils.order_keys import key_between, keys_between
+from music_collection.utils.sql_utils import DB_PATH
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# playlist backend settings, tunable from the environment
+PLAYLIST_BACKEND = os.getenv("PLAYLIST_BACKEND", "memory").lower()
+PLAYLIST_DB_PATH = os.getenv("PLAYLIST_DB_PATH", os.path.join(os.path.dirname(DB_PATH), "playlist.db"))
+
+# Order keys longer than this are spread out again by re-keying their neighbourhood
+MAX_ORDER_KEY_LENGTH = 24
+
+# The playlist lives in its own database file, so its frequent writes
+# neither contend with catalog writes nor invalidate the catalog cache.
+# Tracks are ordered by fractional order keys (see utils.order_keys), so
+# inserting, moving or removing a track writes only that track's row.
+PLAYLIST_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS playlist_tracks (
+        song_id INTEGER PRIMARY KEY,
+        order_key TEXT NOT NULL,
+        artist TEXT NOT NULL,
+        title TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        genre TEXT NOT NULL,
+        duration INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_playlist_tracks_order_key ON playlist_tracks (order_key)",
+    # A single row: the shared cursor, and a counter bumped whenever the tracks change
+    """
+    CREATE TABLE IF NOT EXISTS playlist_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        current_track_number INTEGER NOT NULL DEFAULT 1,
+        tracks_version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "INSERT OR IGNORE INTO playlist_state (id) VALUES (1)",
+)
+
+_INSERT_TRACK = """
+    INSERT INTO playlist_tracks (song_id, order_key, artist, title, year, genre, duration)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPDATE_ORDER_KEY = "UPDATE playlist_tracks SET order_key = ? WHERE song_id = ?"
+
+
+def _track_row(song: Song, order_key: str) -> tuple:
+    """
+    Returns the playlist_tracks row for a song with its order key.
+    """
+    return (song.id, order_key, song.artist, song.title, song.year, song.genre, song.duration)
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    """
+    Creates the playlist tables and indexes that do not exist yet.
+    """
+    for statement in PLAYLIST_SCHEMA:
+        conn.execute(statement)
+
+
+class SqlitePlaylistStore:
+    """
+    Keeps a playlist and its cursor in SQLite, mirrored in memory for cheap reads.
+
+    Every operation runs in a transaction: reads in a snapshot, writes under
+    the database write lock. On entry the store compares `PRAGMA data_version`
+    with the version the mirror was loaded under; it only changes when another
+    connection, usually another worker process, has committed. The cursor is
+    then re-read from its single row, and the tracks are reloaded only if their
+    version counter moved, so playing songs in one worker does not make the
+    others reload the whole playlist.
+
+    Attributes:
+        db_path (str): The path of the SQLite database file.
+        tracks (SqliteSongList): The in-memory mirror of the tracks, which writes through to the database.
+    """
+
+    def __init__(self, db_path: str = PLAYLIST_DB_PATH):
+        self.db_path = db_path
+        self.tracks = SqliteSongList(self)
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._mode: Optional[str] = None
+        self._tracks_dirty = False
+        self._data_version: Optional[int] = None
+        self._tracks_version: Optional[int] = None
+        self._current_track_number = 1
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns the store's connection, opening it and creating the schema on first use.
+
+        The connection is reopened after a fork, since SQLite connections must not
+        be shared across processes.
+        """
+        if self._conn is None or self._pid != os.getpid():
+            # Autocommit mode, so transactions are exactly the ones begun here
+            self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            self._pid = os.getpid()
+            self._conn.execute("PRAGMA journal_mode = WAL;")
+            self._conn.execute("PRAGMA synchronous = NORMAL;")
+            self._conn.execute("PRAGMA busy_timeout = 5000;")
+            _create_schema(self._conn)
+            # data_version is per connection, so the cursor must be re-read
+            self._data_version = None
+            logger.info("Opened playlist database at %s", self.db_path)
+        return self._conn
+
+    def _sync(self, conn: sqlite3.Connection) -> None:
+        """
+        Brings the mirror up to date with changes committed by other connections.
+        Must be called inside a transaction.
+        """
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+
+        current_track_number, tracks_version = conn.execute(
+            "SELECT current_track_number, tracks_version FROM playlist_state"
+        ).fetchone()
+        self._current_track_number = current_track_number
+        if tracks_version != self._tracks_version:
+            rows = conn.execute(
+                "SELECT order_key, song_id, artist, title, year, genre, duration FROM playlist_tracks ORDER BY order_key"
+            ).fetchall()
+            self.tracks._load((Song.from_row(row[1:]), row[0]) for row in rows)
+            self._tracks_version = tracks_version
+            logger.info("Reloaded %d playlist tracks at version %d", len(rows), tracks_version)
+        self._data_version = data_version
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """
+        Runs a block against an up-to-date, consistent view of the playlist.
+
+        Nested inside another read or write, the block joins the outer transaction.
+        """
+        with self._lock:
+            if self._mode is not None:
+                yield self._conn
+                return
+
+            conn = self._connection()
+            conn.execute("BEGIN")
+            self._mode = "read"
+            try:
+                self._sync(conn)
+                yield conn
+            finally:
+                self._mode = None
+                conn.rollback()
+
+    @contextmanager
+    def write(self, tracks_changed: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        Runs a block in a write transaction on an up-to-date mirror.
+
+        The changes of the whole block are committed together. If it raises,
+        they are rolled back, and the mirror is reloaded on next use if anything
+        had been written.
+
+        Args:
+            tracks_changed (bool): Whether the block changes the tracks, which bumps their version.
+
+        Raises:
+            RuntimeError: If called inside a read.
+        """
+        with self._lock:
+            if self._mode == "read":
+                raise RuntimeError("Cannot change the playlist inside a read")
+            if self._mode == "write":
+                self._tracks_dirty = self._tracks_dirty or tracks_changed
+                yield self._conn
+                return
+
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            self._mode = "write"
+            self._tracks_dirty = tracks_changed
+            changes_before = conn.total_changes
+            try:
+                self._sync(conn)
+                yield conn
+                if self._tracks_dirty:
+                    conn.execute("UPDATE playlist_state SET tracks_version = tracks_version + 1")
+                    self._tracks_version += 1
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                if conn.total_changes != changes_before:
+                    # The mirror may already hold the rolled back changes
+                    self._data_version = None
+                    self._tracks_version = None
+                raise
+            finally:
+                self._mode = None
+
+    @property
+    def current_track_number(self) -> int:
+        """
+        The shared current track number.
+        """
+        with self.read():
+            return self._current_track_number
+
+    def set_current_track_number(self, track_number: int) -> None:
+        """
+        Stores a new current track number.
+
+        Args:
+            track_number (int): The new current track number.
+        """
+        with self.write() as conn:
+            if track_number != self._current_track_number:
+                conn.execute("UPDATE playlist_state SET current_track_number = ?", (track_number,))
+                self._current_track_number = track_number
+
+    def close(self) -> None:
+        """
+        Closes the store's connection.
+        """
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+class SqliteSongList(IndexedSongList):
+    """
+    An IndexedSongList whose mutations are written through to the playlist_tracks table.
+
+    Each mutation joins the current write transaction of its store, or runs in
+    one of its own. The in-memory list is a mirror; read it through the store
+    (or a PersistentPlaylistModel method) so it is up to date.
+
+    Every track has an order key, kept in a list parallel to the songs. A track
+    placed between two others gets a key between theirs, so inserts, moves and
+    removals write one row however long the playlist is. When repeated inserts
+    at the same spot make a key too long, the keys around it are spread out again.
+
+    Attributes:
+        _keys (List[str]): The order key of the song at each position.
+    """
+
+    def __init__(self, store: SqlitePlaylistStore):
+        super().__init__()
+        self._store = store
+        self._keys: List[str] = []
+
+    def _load(self, tracks: Iterable[Tuple[Song, str]]) -> None:
+        """
+        Replaces the mirrored songs and their order keys without writing to the database.
+        """
+        tracks = list(tracks)
+        IndexedSongList.clear(self)
+        IndexedSongList.extend(self, [song for song, _ in tracks])
+        self._keys = [key for _, key in tracks]
+
+    def _rewrite(self, conn: sqlite3.Connection) -> None:
+        """
+        Writes the whole mirror back to the database with fresh keys, for bulk reorders.
+        """
+        self._keys = keys_between(None, None, len(self))
+        conn.execute("DELETE FROM playlist_tracks")
+        conn.executemany(_INSERT_TRACK, [_track_row(song, key) for song, key in zip(self, self._keys)])
+
+    def _position(self, index: int) -> int:
+        """
+        Converts a possibly negative index into a position, raising IndexError if it is out of range.
+        """
+        position = index + len(self) if index < 0 else index
+        if not 0 <= position < len(self):
+            raise IndexError("playlist index out of range")
+        return position
+
+    def _key_at(self, position: int) -> str:
+        """
+        Returns a key for a song about to be placed at `position` of `_keys`, between its neighbours.
+        """
+        before = self._keys[position - 1] if position > 0 else None
+        after = self._keys[position] if position < len(self._keys) else None
+        return key_between(before, after)
+
+    def _rebalance(self, conn: sqlite3.Connection, position: int) -> None:
+        """
+        Re-keys the songs around `position` if its key has grown past MAX_ORDER_KEY_LENGTH.
+
+        The window starts at a few songs either side and doubles until the keys
+        spread over it are short again; at worst the whole playlist is re-keyed.
+        """
+        if len(self._keys[position]) <= MAX_ORDER_KEY_LENGTH:
+            return
+        radius = 8
+        while True:
+            start = max(0, position - radius)
+            stop = min(len(self), position + radius + 1)
+            before = self._keys[start - 1] if start > 0 else None
+            after = self._keys[stop] if stop < len(self) else None
+            keys = keys_between(before, after, stop - start)
+            if (start == 0 and stop == len(self)) or max(map(len, keys)) <= MAX_ORDER_KEY_LENGTH // 2:
+                break
+            radius *= 2
+        self._keys[start:stop] = keys
+        conn.executemany(_UPDATE_ORDER_KEY, [(key, list.__getitem__(self, index).id)
+                                             for index, key in zip(range(start, stop), keys)])
+        logger.info("Re-keyed playlist tracks %d to %d", start + 1, stop)
+
+    ##################################################
+    # Reordering
+    ##################################################
+
+    def move(self, from_index: int, to_index: int) -> None:
+        if from_index == to_index:
+            return
+        song = list.__getitem__(self, from_index)
+        # The neighbours the song ends up between, counted without the song itself
+        if from_index < to_index:
+            before, after = to_index, to_index + 1
+        else:
+            before, after = to_index - 1, to_index
+        with self._store.write(tracks_changed=True) as conn:
+            key = key_between(self._keys[before] if before >= 0 else None,
+                              self._keys[after] if after < len(self) else None)
+            conn.execute(_UPDATE_ORDER_KEY, (key, song.id))
+            del self._keys[from_index]
+            self._keys.insert(to_index, key)
+            super().move(from_index, to_index)
+            self._rebalance(conn, to_index)
+
+    def swap(self, index1: int, index2: int) -> None:
+        song1 = list.__getitem__(self, index1)
+        song2 = list.__getitem__(self, index2)
+        with self._store.write(tracks_changed=True) as conn:
+            # The positions keep their keys; the songs trade them
+            conn.executemany(_UPDATE_ORDER_KEY, [(self._keys[index2], song1.id), (self._keys[index1], song2.id)])
+            super().swap(index1, index2)
+
+    ##################################################
+    # List Mutations
+    ##################################################
+
+    def append(self, song: Song) -> None:
+        self.insert(len(self), song)
+
+    def extend(self, songs: Iterable[Song]) -> None:
+        songs = list(songs)
+        with self._store.write(tracks_changed=True) as conn:
+            keys = keys_between(self._keys[-1] if self._keys else None, None, len(songs))
+            conn.executemany(_INSERT_TRACK, [_track_row(song, key) for song, key in zip(songs, keys)])
+            super().extend(songs)
+            self._keys.extend(keys)
+
+    def insert(self, index: int, song: Song) -> None:
+        index = self._normalize_index(index)
+        with self._store.write(tracks_changed=True) as conn:
+            key = self._key_at(index)
+            conn.execute(_INSERT_TRACK, _track_row(song, key))
+            super().insert(index, song)
+            self._keys.insert(index, key)
+            self._rebalance(conn, index)
+
+    def pop(self, index: int = -1) -> Song:
+        index = self._position(index)
+        song = list.__getitem__(self, index)
+        with self._store.write(tracks_changed=True) as conn:
+            conn.execute("DELETE FROM playlist_tracks WHERE song_id = ?", (song.id,))
+            del self._keys[index]
+            return super().pop(index)
+
+    def clear(self) -> None:
+        with self._store.write(tracks_changed=True) as conn:
+            conn.execute("DELETE FROM playlist_tracks")
+            super().clear()
+            self._keys.clear()
+
+    def __setitem__(self, index, value) -> None:
+        with self._store.write(tracks_changed=True) as conn:
+            if isinstance(index, slice):
+                super().__setitem__(index, value)
+                self._rewrite(conn)
+                return
+            index = self._position(index)
+            conn.execute("DELETE FROM playlist_tracks WHERE song_id = ?", (list.__getitem__(self, index).id,))
+            conn.execute(_INSERT_TRACK, _track_row(value, self._keys[index]))
+            super().__setitem__(index, value)
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            with self._store.write(tracks_changed=True) as conn:
+                super().__delitem__(index)
+                self._rewrite(conn)
+            return
+        self.pop(index)
+
+    def sort(self, *args, **kwargs) -> None:
+        with self._store.write(tracks_changed=True) as conn:
+            super().sort(*args, **kwargs)
+            self._rewrite(conn)
+
+    def reverse(self) -> None:
+        with self._store.write(tracks_changed=True) as conn:
+            super().reverse()
+            self._rewrite(conn)
+
+
+def _reads(method: Callable) -> Callable:
+    """
+    Runs a PlaylistModel method against an up-to-date view of the stored playlist.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.store.read():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _writes(method: Callable) -> Callable:
+    """
+    Runs a PlaylistModel method in a single write transaction on the stored playlist.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.store.write():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class PersistentPlaylistModel(PlaylistModel):
+    """
+    A PlaylistModel whose tracks and current track number are kept in SQLite.
+
+    Several worker processes can serve the same playlist, and it survives
+    restarts. Each method runs as one transaction, so a validation and the
+    change it guards cannot interleave with another worker's change.
+
+    Attributes:
+        store (SqlitePlaylistStore): The store holding the playlist.
+    """
+
+    def __init__(self, db_path: str = PLAYLIST_DB_PATH, play_count_buffer: Optional[PlayCountBuffer] = None):
+        """
+        Opens the stored playlist. Unlike PlaylistModel, the current track number is not reset.
+
+        Args:
+            db_path (str): The path of the playlist database file.
+            play_count_buffer (PlayCountBuffer, optional): The write-behind buffer for play counts.
+                Defaults to None, which updates play counts synchronously.
+        """
+        self.store = SqlitePlaylistStore(db_path)
+        self.playlist = self.store.tracks
+        self.play_count_buffer = play_count_buffer
+
+    @property
+    def current_track_number(self) -> int:
+        return self.store.current_track_number
+
+    @current_track_number.setter
+    def current_track_number(self, track_number: int) -> None:
+        self.store.set_current_track_number(track_number)
+
+    add_song_to_playlist = _writes(PlaylistModel.add_song_to_playlist)
+    remove_song_by_song_id = _writes(PlaylistModel.remove_song_by_song_id)
+    remove_song_by_track_number = _writes(PlaylistModel.remove_song_by_track_number)
+    clear_playlist = _writes(PlaylistModel.clear_playlist)
+
+    get_all_songs = _reads(PlaylistModel.get_all_songs)
+    get_song_by_song_id = _reads(PlaylistModel.get_song_by_song_id)
+    get_song_by_track_number = _reads(PlaylistModel.get_song_by_track_number)
+    get_current_song = _reads(PlaylistModel.get_current_song)
+    get_playlist_length = _reads(PlaylistModel.get_playlist_length)
+    get_playlist_duration = _reads(PlaylistModel.get_playlist_duration)
+    get_playlist_stats = _reads(PlaylistModel.get_playlist_stats)
+
+    go_to_track_number = _writes(PlaylistModel.go_to_track_number)
+    move_song_to_beginning = _writes(PlaylistModel.move_song_to_beginning)
+    move_song_to_end = _writes(PlaylistModel.move_song_to_end)
+    move_song_to_track_number = _writes(PlaylistModel.move_song_to_track_number)
+    swap_songs_in_playlist = _writes(PlaylistModel.swap_songs_in_playlist)
+
+    play_current_song = _writes(PlaylistModel.play_current_song)
+    play_entire_playlist = _writes(PlaylistModel.play_entire_playlist)
+    play_rest_of_playlist = _writes(PlaylistModel.play_rest_of_playlist)
+    rewind_playlist = _writes(PlaylistModel.rewind_playlist)
+
+    check_if_empty = _reads(PlaylistModel.check_if_empty)
+    validate_song_id = _reads(PlaylistModel.validate_song_id)
+    validate_track_number = _reads(PlaylistModel.validate_track_number)
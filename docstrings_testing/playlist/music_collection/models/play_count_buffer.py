@@ -0,0 +1,221 @@
+from collections import Counter
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+
+from music_collection.models.song_model import update_play_counts
+from music_collection.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# write-behind settings, tunable from the environment
+PLAY_COUNT_WRITE_BEHIND = os.getenv("PLAY_COUNT_WRITE_BEHIND", "false").lower() == "true"
+PLAY_COUNT_FLUSH_INTERVAL = float(os.getenv("PLAY_COUNT_FLUSH_INTERVAL", "5"))
+PLAY_COUNT_FLUSH_THRESHOLD = int(os.getenv("PLAY_COUNT_FLUSH_THRESHOLD", "1000"))
+
+
+class PlayCountBuffer:
+    """
+    Collects play count increments in memory and writes them behind in batches.
+
+    Pending increments are flushed through update_play_counts, one transaction
+    per flush, every `flush_interval` seconds or as soon as `flush_threshold`
+    plays are pending. stop() flushes whatever is still pending.
+
+    Attributes:
+        flush_interval (float): Seconds between background flushes.
+        flush_threshold (int): The number of pending plays that triggers an early flush.
+    """
+
+    def __init__(self, flush_interval: float = PLAY_COUNT_FLUSH_INTERVAL,
+                 flush_threshold: int = PLAY_COUNT_FLUSH_THRESHOLD,
+                 flush: Optional[Callable[[Mapping[int, int]], Dict[int, str]]] = None):
+        self.flush_interval = flush_interval
+        self.flush_threshold = max(1, flush_threshold)
+        self._flush = flush or update_play_counts
+        self._pending: Counter = Counter()
+        self._pending_plays = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flushes = 0
+        self._flushed_plays = 0
+        self._failed_songs = 0
+        self._last_flush_seconds = 0.0
+
+    ##################################################
+    # Lifecycle
+    ##################################################
+
+    def start(self) -> None:
+        """
+        Starts the background flush thread.
+        """
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="play-count-flush", daemon=True)
+        self._thread.start()
+        logger.info("Started write-behind play counter (interval %.1fs, threshold %d)",
+                    self.flush_interval, self.flush_threshold)
+
+    def stop(self) -> Dict[int, str]:
+        """
+        Stops the background flush thread and flushes any pending increments.
+
+        Returns:
+            Dict[int, str]: The error message for each song ID that could not be updated.
+        """
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        logger.info("Stopping write-behind play counter, flushing pending plays")
+        return self.flush()
+
+    def _run(self) -> None:
+        """
+        Flushes on every interval or threshold wake-up until stopped.
+        """
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Background flush of play counts failed: %s", str(e))
+
+    ##################################################
+    # Recording Plays
+    ##################################################
+
+    def add(self, song_id: int, count: int = 1) -> None:
+        """
+        Records plays of a song without touching the database.
+
+        Args:
+            song_id (int): The ID of the song that was played.
+            count (int): How many plays to record. Defaults to 1.
+        """
+        with self._lock:
+            self._pending[song_id] += count
+            self._pending_plays += count
+            threshold_reached = self._pending_plays >= self.flush_threshold
+        if threshold_reached:
+            self._flush_soon()
+
+    def add_many(self, song_ids: Iterable[int]) -> None:
+        """
+        Records one play for each song ID.
+
+        Args:
+            song_ids (Iterable[int]): The IDs of the songs that were played, one entry per play.
+        """
+        plays = Counter(song_ids)
+        with self._lock:
+            self._pending.update(plays)
+            self._pending_plays += sum(plays.values())
+            threshold_reached = self._pending_plays >= self.flush_threshold
+        if threshold_reached:
+            self._flush_soon()
+
+    def _flush_soon(self) -> None:
+        """
+        Wakes the flush thread, or flushes inline if it is not running.
+        """
+        if self._thread is not None:
+            self._wake.set()
+        else:
+            self.flush()
+
+    def flush(self) -> Dict[int, str]:
+        """
+        Writes all pending increments in a single transaction.
+
+        Increments are put back if the write fails, so they are retried on the next flush.
+
+        Returns:
+            Dict[int, str]: The error message for each song ID that could not be updated.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, Counter()
+                plays, self._pending_plays = self._pending_plays, 0
+            if not pending:
+                return {}
+
+            start = time.perf_counter()
+            try:
+                failures = self._flush(pending)
+            except Exception:
+                with self._lock:
+                    self._pending.update(pending)
+                    self._pending_plays += plays
+                raise
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._flushes += 1
+                self._flushed_plays += plays
+                self._failed_songs += len(failures)
+                self._last_flush_seconds = elapsed
+            for song_id, error in failures.items():
+                logger.error("Dropped pending plays for song with ID %d: %s", song_id, error)
+            logger.info("Flushed %d plays for %d songs in %.3fs", plays, len(pending), elapsed)
+            return failures
+
+    ##################################################
+    # Reads
+    ##################################################
+
+    def pending(self) -> Dict[int, int]:
+        """
+        Returns a snapshot of the increments that have not been written yet.
+        """
+        with self._lock:
+            return dict(self._pending)
+
+    def merge_pending(self, songs: List[dict], sort_by_play_count: bool = False) -> List[dict]:
+        """
+        Adds pending increments to song rows read from the database.
+
+        Args:
+            songs (List[dict]): Song rows with 'id' and 'play_count' keys.
+            sort_by_play_count (bool): If True, re-sort the rows by play count in descending order.
+
+        Returns:
+            List[dict]: The rows with pending plays included in 'play_count'.
+        """
+        pending = self.pending()
+        if not pending:
+            return songs
+        merged = [
+            dict(song, play_count=song['play_count'] + pending[song['id']]) if song['id'] in pending else song
+            for song in songs
+        ]
+        if sort_by_play_count:
+            merged.sort(key=lambda song: song['play_count'], reverse=True)
+        return merged
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the write-behind counters.
+        """
+        with self._lock:
+            return {
+                'pending_plays': self._pending_plays,
+                'pending_songs': len(self._pending),
+                'flushes': self._flushes,
+                'flushed_plays': self._flushed_plays,
+                'failed_songs': self._failed_songs,
+                'last_flush_seconds': self._last_flush_seconds,
+            }
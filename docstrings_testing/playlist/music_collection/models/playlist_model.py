@@ -1,6 +1,8 @@
 import logging
-from typing import List
-from music_collection.models.song_model import Song, update_play_count
+from typing import Any, Dict, List, Optional, Tuple
+from music_collection.models.play_count_buffer import PlayCountBuffer
+from music_collection.models.playlist_storage import PLAYLIST_STORAGE, SongList, make_song_list
+from music_collection.models.song_model import Song, update_play_count, update_play_counts
 from music_collection.utils.logger import configure_logger
 
 logger = logging.getLogger(__name__)
@@ -13,16 +15,39 @@ class PlaylistModel:
 
     Attributes:
         current_track_number (int): The current track number being played.
-        playlist (List[Song]): The list of songs in the playlist.
+        playlist (SongList): The songs in the playlist, indexed by song ID.
+        play_count_buffer (Optional[PlayCountBuffer]): If set, plays are recorded here and
+            written behind instead of updating the database on every play.
+
+    Besides the totals the song list keeps (see PlaylistStats), the model keeps
+    the duration of the tracks before the current one. Each change of the songs
+    or the cursor adjusts it by the few tracks involved. It is recomputed only
+    when the list or cursor were changed some other way, such as by another
+    worker sharing a persistent playlist.
 
     """
 
-    def __init__(self):
+    # The duration of the tracks before the current one, and the (current track
+    # number, stats version) it was computed for
+    _elapsed_duration = 0
+    _elapsed_key: Optional[Tuple[int, int]] = None
+
+    def __init__(self, play_count_buffer: Optional[PlayCountBuffer] = None, storage: str = PLAYLIST_STORAGE):
         """
         Initializes the PlaylistModel with an empty playlist and the current track set to 1.
+
+        Args:
+            play_count_buffer (PlayCountBuffer, optional): The write-behind buffer for play counts.
+                Defaults to None, which updates play counts synchronously.
+            storage (str): The storage engine for the songs, "list" or "blocked" (see make_song_list).
+                Defaults to the PLAYLIST_STORAGE setting.
+
+        Raises:
+            ValueError: If the storage engine is unknown.
         """
         self.current_track_number = 1
-        self.playlist: List[Song] = []
+        self.playlist: SongList = make_song_list(storage)
+        self.play_count_buffer = play_count_buffer
 
     ##################################################
     # Song Management Functions
@@ -45,11 +70,16 @@ class PlaylistModel:
             raise TypeError("Song is not a valid song")
 
         song_id = self.validate_song_id(song.id, check_in_playlist=False)
-        if song_id in [song_in_playlist.id for song_in_playlist in self.playlist]:
+        if self.playlist.has_song_id(song_id):
             logger.error("Song with ID %d already exists in the playlist", song.id)
             raise ValueError(f"Song with ID {song.id} already exists in the playlist")
 
+        # The new track lands before the current one only when the cursor is past the end
+        elapsed = self._get_elapsed_duration()
+        if len(self.playlist) < self.current_track_number - 1:
+            elapsed += song.duration
         self.playlist.append(song)
+        self._set_elapsed_duration(elapsed)
 
     def remove_song_by_song_id(self, song_id: int) -> None:
         """
@@ -64,7 +94,7 @@ class PlaylistModel:
         logger.info("Removing song with id %d from playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        self.playlist = [song_in_playlist for song_in_playlist in self.playlist if song_in_playlist.id != song_id]
+        self._remove_track(self.playlist.position_of(song_id))
         logger.info("Song with id %d has been removed", song_id)
 
     def remove_song_by_track_number(self, track_number: int) -> None:
@@ -82,7 +112,7 @@ class PlaylistModel:
         track_number = self.validate_track_number(track_number)
         playlist_index = track_number - 1
         logger.info("Removing song: %s", self.playlist[playlist_index].title)
-        del self.playlist[playlist_index]
+        self._remove_track(playlist_index)
 
     def clear_playlist(self) -> None:
         """
@@ -92,6 +122,7 @@ class PlaylistModel:
         if self.get_playlist_length() == 0:
             logger.warning("Clearing an empty playlist")
         self.playlist.clear()
+        self._set_elapsed_duration(0)
 
     ##################################################
     # Playlist Retrieval Functions
@@ -103,7 +134,7 @@ class PlaylistModel:
         """
         self.check_if_empty()
         logger.info("Getting all songs in the playlist")
-        return self.playlist
+        return list(self.playlist)
 
     def get_song_by_song_id(self, song_id: int) -> Song:
         """
@@ -118,7 +149,7 @@ class PlaylistModel:
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
         logger.info("Getting song with id %d from playlist", song_id)
-        return next((song for song in self.playlist if song.id == song_id), None)
+        return self.playlist[self.playlist.position_of(song_id)]
 
     def get_song_by_track_number(self, track_number: int) -> Song:
         """
@@ -153,7 +184,28 @@ class PlaylistModel:
         """
         Returns the total duration of the playlist in seconds.
         """
-        return sum(song.duration for song in self.playlist)
+        return self.playlist.stats.duration
+
+    def get_playlist_stats(self) -> Dict[str, Any]:
+        """
+        Returns the playlist's aggregates, all kept up to date as the playlist changes.
+
+        Returns:
+            Dict[str, Any]: The number of songs, total duration, songs per genre and
+                per decade, the current track number, and the seconds before the
+                current track (elapsed) and from it to the end (remaining).
+        """
+        stats = self.playlist.stats
+        elapsed = self._get_elapsed_duration()
+        return {
+            'length': stats.count,
+            'duration': stats.duration,
+            'genres': dict(stats.genres),
+            'decades': dict(sorted(stats.decades.items())),
+            'current_track_number': self.current_track_number,
+            'elapsed_duration': elapsed,
+            'remaining_duration': stats.duration - elapsed,
+        }
 
     ##################################################
     # Playlist Movement Functions
@@ -169,7 +221,15 @@ class PlaylistModel:
         self.check_if_empty()
         track_number = self.validate_track_number(track_number)
         logger.info("Setting current track number to %d", track_number)
+        elapsed = self._get_elapsed_duration()
+        previous_index, index = self.current_track_number - 1, track_number - 1
+        # Only the tracks between the old and new positions change sides
+        if index > previous_index:
+            elapsed += sum(song.duration for song in self.playlist[previous_index:index])
+        else:
+            elapsed -= sum(song.duration for song in self.playlist[index:previous_index])
         self.current_track_number = track_number
+        self._set_elapsed_duration(elapsed)
 
     def move_song_to_beginning(self, song_id: int) -> None:
         """
@@ -181,9 +241,7 @@ class PlaylistModel:
         logger.info("Moving song with ID %d to the beginning of the playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
-        self.playlist.insert(0, song)
+        self._move_track(self.playlist.position_of(song_id), 0)
         logger.info("Song with ID %d has been moved to the beginning", song_id)
 
     def move_song_to_end(self, song_id: int) -> None:
@@ -196,9 +254,7 @@ class PlaylistModel:
         logger.info("Moving song with ID %d to the end of the playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
-        self.playlist.append(song)
+        self._move_track(self.playlist.position_of(song_id), self.get_playlist_length() - 1)
         logger.info("Song with ID %d has been moved to the end", song_id)
 
     def move_song_to_track_number(self, song_id: int, track_number: int) -> None:
@@ -214,9 +270,7 @@ class PlaylistModel:
         song_id = self.validate_song_id(song_id)
         track_number = self.validate_track_number(track_number)
         playlist_index = track_number - 1
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
-        self.playlist.insert(playlist_index, song)
+        self._move_track(self.playlist.position_of(song_id), playlist_index)
         logger.info("Song with ID %d has been moved to track number %d", song_id, track_number)
 
     def swap_songs_in_playlist(self, song1_id: int, song2_id: int) -> None:
@@ -239,11 +293,7 @@ class PlaylistModel:
             logger.error("Cannot swap a song with itself, both song IDs are the same: %d", song1_id)
             raise ValueError(f"Cannot swap a song with itself, both song IDs are the same: {song1_id}")
 
-        song1 = self.get_song_by_song_id(song1_id)
-        song2 = self.get_song_by_song_id(song2_id)
-        index1 = self.playlist.index(song1)
-        index2 = self.playlist.index(song2)
-        self.playlist[index1], self.playlist[index2] = self.playlist[index2], self.playlist[index1]
+        self._swap_tracks(self.playlist.position_of(song1_id), self.playlist.position_of(song2_id))
         logger.info("Swapped songs with IDs %d and %d", song1_id, song2_id)
 
     ##################################################
@@ -261,43 +311,81 @@ class PlaylistModel:
         self.check_if_empty()
         current_song = self.get_song_by_track_number(self.current_track_number)
         logger.info("Playing song: %s (ID: %d) at track number: %d", current_song.title, current_song.id, self.current_track_number)
-        update_play_count(current_song.id)
+        if self.play_count_buffer is not None:
+            self.play_count_buffer.add(current_song.id)
+        else:
+            update_play_count(current_song.id)
         logger.info("Updated play count for song: %s (ID: %d)", current_song.title, current_song.id)
         previous_track_number = self.current_track_number
+        elapsed = self._get_elapsed_duration() + current_song.duration
         self.current_track_number = (self.current_track_number % self.get_playlist_length()) + 1
+        self._set_elapsed_duration(elapsed if self.current_track_number > 1 else 0)
         logger.info("Track number updated from %d to %d", previous_track_number, self.current_track_number)
 
-    def play_entire_playlist(self) -> None:
+    def play_entire_playlist(self) -> Dict[int, str]:
         """
         Plays the entire playlist.
 
         Side-effects:
             Resets the current track number to 1.
-            Updates the play count for each song.
+            Updates the play count for each song in a single batch.
+
+        Returns:
+            Dict[int, str]: The error message for each song whose play count could not be updated.
         """
         self.check_if_empty()
         logger.info("Starting to play the entire playlist.")
         self.current_track_number = 1
+        self._set_elapsed_duration(0)
         logger.info("Reset current track number to 1.")
-        for _ in range(self.get_playlist_length()):
-            logger.info("Playing track number: %d", self.current_track_number)
-            self.play_current_song()
+        failures = self._play_tracks(1)
         logger.info("Finished playing the entire playlist. Current track number reset to 1.")
+        return failures
 
-    def play_rest_of_playlist(self) -> None:
+    def play_rest_of_playlist(self) -> Dict[int, str]:
         """
         Plays the rest of the playlist from the current track.
 
         Side-effects:
             Updates the current track number back to 1.
-            Updates the play count for each song in the rest of the playlist.
+            Updates the play count for each song in the rest of the playlist in a single batch.
+
+        Returns:
+            Dict[int, str]: The error message for each song whose play count could not be updated.
         """
         self.check_if_empty()
         logger.info("Starting to play the rest of the playlist from track number: %d", self.current_track_number)
-        for _ in range(self.get_playlist_length() - self.current_track_number + 1):
-            logger.info("Playing track number: %d", self.current_track_number)
-            self.play_current_song()
+        failures = self._play_tracks(self.current_track_number)
         logger.info("Finished playing the rest of the playlist. Current track number reset to 1.")
+        return failures
+
+    def _play_tracks(self, start_track_number: int) -> Dict[int, str]:
+        """
+        Plays every track from `start_track_number` to the end of the playlist.
+
+        Args:
+            start_track_number (int): The track number to start playing from (1-indexed).
+
+        Side-effects:
+            Updates the current track number back to 1.
+            Updates the play counts for the played songs in a single batch.
+
+        Returns:
+            Dict[int, str]: The error message for each song whose play count could not be updated.
+        """
+        song_ids = [song.id for song in self.playlist[start_track_number - 1:]]
+        logger.info("Playing track numbers %d to %d", start_track_number, self.get_playlist_length())
+        if self.play_count_buffer is not None:
+            # Missing or deleted songs are reported when the buffer is flushed
+            self.play_count_buffer.add_many(song_ids)
+            failures = {}
+        else:
+            failures = update_play_counts(song_ids)
+        for song_id, error in failures.items():
+            logger.error("Failed to update play count for song with ID %d: %s", song_id, error)
+        self.current_track_number = 1
+        self._set_elapsed_duration(0)
+        return failures
 
     def rewind_playlist(self) -> None:
         """
@@ -306,6 +394,74 @@ class PlaylistModel:
         self.check_if_empty()
         logger.info("Rewinding playlist to the beginning.")
         self.current_track_number = 1
+        self._set_elapsed_duration(0)
+
+    ##################################################
+    # Positional Changes
+    ##################################################
+
+    def _remove_track(self, index: int) -> None:
+        """
+        Removes the track at a 0-based index, adjusting the elapsed duration.
+        """
+        if self.current_track_number > len(self.playlist):
+            # The cursor is past the end; the next read recounts
+            del self.playlist[index]
+            return
+        elapsed = self._get_elapsed_duration()
+        boundary = self.current_track_number - 1
+        if index < boundary:
+            # The removed track leaves the elapsed part, and the current track joins it
+            elapsed -= self.playlist[index].duration
+            if boundary < len(self.playlist):
+                elapsed += self.playlist[boundary].duration
+        del self.playlist[index]
+        self._set_elapsed_duration(elapsed)
+
+    def _move_track(self, from_index: int, to_index: int) -> None:
+        """
+        Moves a track between 0-based indexes, adjusting the elapsed duration.
+        """
+        elapsed = self._get_elapsed_duration()
+        boundary = self.current_track_number - 1
+        duration = self.playlist[from_index].duration
+        if from_index < boundary <= to_index:
+            # The track leaves the elapsed part, and the current track shifts into it
+            elapsed += self.playlist[boundary].duration - duration
+        elif to_index < boundary <= from_index:
+            # The track joins the elapsed part, and its last track shifts out
+            elapsed += duration - self.playlist[boundary - 1].duration
+        self.playlist.move(from_index, to_index)
+        self._set_elapsed_duration(elapsed)
+
+    def _swap_tracks(self, index1: int, index2: int) -> None:
+        """
+        Swaps the tracks at two 0-based indexes, adjusting the elapsed duration.
+        """
+        elapsed = self._get_elapsed_duration()
+        boundary = self.current_track_number - 1
+        if (index1 < boundary) != (index2 < boundary):
+            before, after = sorted((index1, index2))
+            elapsed += self.playlist[after].duration - self.playlist[before].duration
+        self.playlist.swap(index1, index2)
+        self._set_elapsed_duration(elapsed)
+
+    def _get_elapsed_duration(self) -> int:
+        """
+        Returns the duration of the tracks before the current one, recomputing it if it is stale.
+        """
+        key = (self.current_track_number, self.playlist.stats.version)
+        if key != self._elapsed_key:
+            self._elapsed_duration = sum(song.duration for song in self.playlist[:self.current_track_number - 1])
+            self._elapsed_key = key
+        return self._elapsed_duration
+
+    def _set_elapsed_duration(self, elapsed: int) -> None:
+        """
+        Records the duration of the tracks before the current one, after a change of the playlist or cursor.
+        """
+        self._elapsed_duration = elapsed
+        self._elapsed_key = (self.current_track_number, self.playlist.stats.version)
 
     ##################################################
     # Utility Functions
@@ -333,7 +489,7 @@ class PlaylistModel:
             raise ValueError(f"Invalid song id: {song_id}")
 
         if check_in_playlist:
-            if song_id not in [song_in_playlist.id for song_in_playlist in self.playlist]:
+            if not self.playlist.has_song_id(song_id):
                 logger.error("Song with id %d not found in playlist", song_id)
                 raise ValueError(f"Song with id {song_id} not found in playlist")
 
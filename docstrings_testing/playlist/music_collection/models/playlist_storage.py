@@ -0,0 +1,653 @@
+from collections import Counter
+from collections.abc import MutableSequence
+from itertools import islice
+import logging
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from music_collection.models.song_model import Song
+from music_collection.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# playlist storage engine, tunable from the environment: "list" or "blocked"
+PLAYLIST_STORAGE = os.getenv("PLAYLIST_STORAGE", "list").lower()
+
+# Target number of songs per block of a BlockedSongList
+BLOCK_LOAD = 1000
+
+
+class PlaylistStats:
+    """
+    Running totals over the songs of a playlist, updated in O(1) as songs are added and removed.
+
+    Attributes:
+        count (int): The number of songs.
+        duration (int): The total duration in seconds.
+        genres (Counter): The number of songs per genre.
+        decades (Counter): The number of songs per decade, keyed by its first year (e.g. 1990).
+        version (int): Bumped on every change to the songs or their order, so values
+            derived from positions (like the time before the current track) can tell
+            when they are stale.
+    """
+
+    __slots__ = ("count", "duration", "genres", "decades", "version")
+
+    def __init__(self, songs: Iterable[Song] = ()):
+        self.version = 0
+        self.reset(songs)
+
+    def reset(self, songs: Iterable[Song] = ()) -> None:
+        """
+        Recomputes the totals from scratch, for bulk replacements.
+        """
+        self.count = 0
+        self.duration = 0
+        self.genres: Counter = Counter()
+        self.decades: Counter = Counter()
+        for song in songs:
+            self.add(song)
+        self.version += 1
+
+    def add(self, song: Song) -> None:
+        """
+        Counts a song that joined the playlist.
+        """
+        self.count += 1
+        self.duration += song.duration
+        self.genres[song.genre] += 1
+        self.decades[song.year // 10 * 10] += 1
+        self.version += 1
+
+    def remove(self, song: Song) -> None:
+        """
+        Uncounts a song that left the playlist.
+        """
+        self.count -= 1
+        self.duration -= song.duration
+        for counter, key in ((self.genres, song.genre), (self.decades, song.year // 10 * 10)):
+            counter[key] -= 1
+            if not counter[key]:
+                del counter[key]
+        self.version += 1
+
+    def reordered(self) -> None:
+        """
+        Records a change of order, which leaves the totals as they are.
+        """
+        self.version += 1
+
+
+class IndexedSongList(list):
+    """
+    A list of songs that keeps an index from song ID to position.
+
+    Every mutating list operation keeps the index in sync, so membership
+    checks and ID lookups are O(1) and reorders only touch the positions
+    of the songs that actually moved.
+
+    Attributes:
+        stats (PlaylistStats): The running totals over the songs.
+        _positions (Dict[int, int]): The 0-based position of each song ID.
+    """
+
+    def __init__(self, songs: Iterable[Song] = ()):
+        super().__init__(songs)
+        self.stats = PlaylistStats(self)
+        self._positions: Dict[int, int] = {}
+        self._reindex()
+
+    def _reindex(self, start: int = 0, stop: Optional[int] = None) -> None:
+        """
+        Recomputes the positions of the songs in [start, stop).
+
+        Args:
+            start (int): The first position to recompute.
+            stop (int, optional): One past the last position to recompute. Defaults to the end of the list.
+        """
+        if stop is None:
+            stop = len(self)
+        positions = self._positions
+        for index in range(start, stop):
+            positions[list.__getitem__(self, index).id] = index
+
+    def _normalize_index(self, index: int) -> int:
+        """
+        Converts a possibly negative insert index into a position in the list.
+        """
+        if index < 0:
+            index += len(self)
+        return min(max(index, 0), len(self))
+
+    ##################################################
+    # Index Lookups
+    ##################################################
+
+    def has_song_id(self, song_id: int) -> bool:
+        """
+        Checks whether a song with the given ID is in the list.
+
+        Args:
+            song_id (int): The song ID to look for.
+        """
+        return song_id in self._positions
+
+    def position_of(self, song_id: int) -> Optional[int]:
+        """
+        Returns the 0-based position of a song, or None if it is not in the list.
+
+        Args:
+            song_id (int): The song ID to look for.
+        """
+        return self._positions.get(song_id)
+
+    ##################################################
+    # Reordering
+    ##################################################
+
+    def move(self, from_index: int, to_index: int) -> None:
+        """
+        Moves the song at `from_index` so that it ends up at `to_index`.
+
+        Args:
+            from_index (int): The current 0-based position of the song.
+            to_index (int): The 0-based position the song should end up at.
+        """
+        if from_index == to_index:
+            return
+        song = list.pop(self, from_index)
+        list.insert(self, to_index, song)
+        self._reindex(min(from_index, to_index), max(from_index, to_index) + 1)
+        self.stats.reordered()
+
+    def swap(self, index1: int, index2: int) -> None:
+        """
+        Swaps the songs at two positions.
+
+        Args:
+            index1 (int): The 0-based position of the first song.
+            index2 (int): The 0-based position of the second song.
+        """
+        song1 = list.__getitem__(self, index1)
+        song2 = list.__getitem__(self, index2)
+        list.__setitem__(self, index1, song2)
+        list.__setitem__(self, index2, song1)
+        self._positions[song1.id] = index2
+        self._positions[song2.id] = index1
+        self.stats.reordered()
+
+    ##################################################
+    # List Mutations
+    ##################################################
+
+    def append(self, song: Song) -> None:
+        super().append(song)
+        self._positions[song.id] = len(self) - 1
+        self.stats.add(song)
+
+    def extend(self, songs: Iterable[Song]) -> None:
+        start = len(self)
+        super().extend(songs)
+        self._reindex(start)
+        for index in range(start, len(self)):
+            self.stats.add(list.__getitem__(self, index))
+
+    def __iadd__(self, songs: Iterable[Song]) -> "IndexedSongList":
+        self.extend(songs)
+        return self
+
+    def insert(self, index: int, song: Song) -> None:
+        index = self._normalize_index(index)
+        super().insert(index, song)
+        self._reindex(index)
+        self.stats.add(song)
+
+    def remove(self, song: Song) -> None:
+        index = self._positions.get(song.id)
+        if index is None or list.__getitem__(self, index) != song:
+            index = self.index(song)
+        del self[index]
+
+    def pop(self, index: int = -1) -> Song:
+        if index < 0:
+            index += len(self)
+        song = super().pop(index)
+        self._positions.pop(song.id, None)
+        self._reindex(index)
+        self.stats.remove(song)
+        return song
+
+    def clear(self) -> None:
+        super().clear()
+        self._positions.clear()
+        self.stats.reset()
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            super().__setitem__(index, value)
+            self._positions.clear()
+            self._reindex()
+            self.stats.reset(self)
+            return
+        old_song = list.__getitem__(self, index)
+        super().__setitem__(index, value)
+        if self._positions.get(old_song.id) == index % len(self):
+            del self._positions[old_song.id]
+        self._positions[value.id] = index % len(self)
+        self.stats.remove(old_song)
+        self.stats.add(value)
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            super().__delitem__(index)
+            self._positions.clear()
+            self._reindex()
+            self.stats.reset(self)
+            return
+        if index < 0:
+            index += len(self)
+        song = list.__getitem__(self, index)
+        super().__delitem__(index)
+        if self._positions.get(song.id) == index:
+            del self._positions[song.id]
+        self._reindex(index)
+        self.stats.remove(song)
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._reindex()
+        self.stats.reordered()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._reindex()
+        self.stats.reordered()
+
+
+class _Block:
+    """
+    A run of consecutive songs in a BlockedSongList, with their IDs alongside for fast scans.
+    """
+
+    __slots__ = ("songs", "ids", "number")
+
+    def __init__(self, songs: Iterable[Song] = (), number: int = 0):
+        self.songs: List[Song] = list(songs)
+        self.ids: List[int] = [song.id for song in self.songs]
+        self.number = number
+
+
+class BlockedSongList(MutableSequence):
+    """
+    A sequence of songs split into blocks of about `load` songs (sqrt decomposition), for very long playlists.
+
+    A Fenwick tree over the block lengths finds the block holding a position in
+    O(log n), and a map from song ID to its block finds a song's position the
+    same way plus a scan of one block's IDs. Inserting or deleting only shifts
+    songs within one block, so positional get, insert, delete and move cost
+    O(log n + load) instead of O(n). Blocks are split when they grow past twice
+    the load and merged with a neighbour when they shrink below a quarter of it.
+
+    It offers the same index lookups and reorders as IndexedSongList.
+
+    Attributes:
+        load (int): The target number of songs per block.
+        stats (PlaylistStats): The running totals over the songs.
+        _blocks (List[_Block]): The blocks, in order.
+        _block_of (Dict[int, _Block]): The block holding each song ID.
+        _tree (List[int]): The Fenwick tree over the block lengths, 1-based.
+    """
+
+    def __init__(self, songs: Iterable[Song] = (), load: int = BLOCK_LOAD):
+        if load < 4:
+            raise ValueError(f"Block load must be at least 4, got {load}")
+        self.load = load
+        self.stats = PlaylistStats()
+        self._blocks: List[_Block] = []
+        self._block_of: Dict[int, _Block] = {}
+        self._tree: List[int] = [0]
+        self._len = 0
+        self.extend(songs)
+
+    def _rebuild(self) -> None:
+        """
+        Renumbers the blocks and rebuilds the Fenwick tree after blocks were added, split or merged.
+        """
+        tree = [0] * (len(self._blocks) + 1)
+        for number, block in enumerate(self._blocks):
+            block.number = number
+            tree[number + 1] = len(block.songs)
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self._tree = tree
+
+    def _add_length(self, number: int, delta: int) -> None:
+        """
+        Adds `delta` to the recorded length of block `number`.
+        """
+        tree = self._tree
+        index = number + 1
+        while index < len(tree):
+            tree[index] += delta
+            index += index & -index
+
+    def _songs_before(self, number: int) -> int:
+        """
+        Returns the number of songs in the blocks before block `number`.
+        """
+        tree = self._tree
+        total = 0
+        while number > 0:
+            total += tree[number]
+            number -= number & -number
+        return total
+
+    def _locate(self, index: int) -> Tuple[_Block, int]:
+        """
+        Returns the block holding position `index` and the position within it.
+
+        Raises:
+            IndexError: If the index is out of range.
+        """
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("playlist index out of range")
+        tree = self._tree
+        number = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            following = number + step
+            if following < len(tree) and tree[following] <= index:
+                number = following
+                index -= tree[following]
+            step >>= 1
+        return self._blocks[number], index
+
+    def _reset(self, songs: Iterable[Song]) -> None:
+        """
+        Replaces the contents with `songs`, in freshly built blocks.
+        """
+        songs = list(songs)
+        self._blocks = [_Block(songs[start:start + self.load]) for start in range(0, len(songs), self.load)]
+        self._block_of = {song.id: block for block in self._blocks for song in block.songs}
+        self._len = len(songs)
+        self._rebuild()
+        self.stats.reset(songs)
+
+    def _split(self, block: _Block) -> None:
+        """
+        Splits an oversized block in two.
+        """
+        middle = len(block.songs) // 2
+        tail = _Block(block.songs[middle:])
+        del block.songs[middle:]
+        del block.ids[middle:]
+        for song in tail.songs:
+            self._block_of[song.id] = tail
+        self._blocks.insert(block.number + 1, tail)
+        self._rebuild()
+
+    def _merge(self, block: _Block) -> None:
+        """
+        Folds an undersized block into a neighbour, splitting the result again if it is too large.
+        """
+        if len(self._blocks) == 1:
+            if not block.songs:
+                self._blocks = []
+                self._rebuild()
+            return
+        if block.number + 1 < len(self._blocks):
+            first, second = block, self._blocks[block.number + 1]
+        else:
+            first, second = self._blocks[block.number - 1], block
+        first.songs.extend(second.songs)
+        first.ids.extend(second.ids)
+        for song in second.songs:
+            self._block_of[song.id] = first
+        del self._blocks[second.number]
+        self._rebuild()
+        if len(first.songs) > 2 * self.load:
+            self._split(first)
+
+    ##################################################
+    # Index Lookups
+    ##################################################
+
+    def has_song_id(self, song_id: int) -> bool:
+        """
+        Checks whether a song with the given ID is in the list.
+
+        Args:
+            song_id (int): The song ID to look for.
+        """
+        return song_id in self._block_of
+
+    def position_of(self, song_id: int) -> Optional[int]:
+        """
+        Returns the 0-based position of a song, or None if it is not in the list.
+
+        Args:
+            song_id (int): The song ID to look for.
+        """
+        block = self._block_of.get(song_id)
+        if block is None:
+            return None
+        return self._songs_before(block.number) + block.ids.index(song_id)
+
+    ##################################################
+    # Reordering
+    ##################################################
+
+    def move(self, from_index: int, to_index: int) -> None:
+        """
+        Moves the song at `from_index` so that it ends up at `to_index`.
+
+        Args:
+            from_index (int): The current 0-based position of the song.
+            to_index (int): The 0-based position the song should end up at.
+        """
+        if from_index == to_index:
+            return
+        song = self[from_index]
+        del self[from_index]
+        self.insert(to_index, song)
+
+    def swap(self, index1: int, index2: int) -> None:
+        """
+        Swaps the songs at two positions.
+
+        Args:
+            index1 (int): The 0-based position of the first song.
+            index2 (int): The 0-based position of the second song.
+        """
+        block1, offset1 = self._locate(index1)
+        block2, offset2 = self._locate(index2)
+        song1, song2 = block1.songs[offset1], block2.songs[offset2]
+        block1.songs[offset1], block1.ids[offset1] = song2, song2.id
+        block2.songs[offset2], block2.ids[offset2] = song1, song1.id
+        self._block_of[song1.id] = block2
+        self._block_of[song2.id] = block1
+        self.stats.reordered()
+
+    ##################################################
+    # Sequence Protocol
+    ##################################################
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Song]:
+        for block in self._blocks:
+            yield from block.songs
+
+    def _iter_from(self, start: int) -> Iterator[Song]:
+        """
+        Yields the songs from position `start` on, without walking the blocks before it.
+        """
+        if start >= self._len:
+            return
+        block, offset = self._locate(start)
+        yield from islice(block.songs, offset, None)
+        for following in self._blocks[block.number + 1:]:
+            yield from following.songs
+
+    def __contains__(self, song) -> bool:
+        block = self._block_of.get(getattr(song, "id", None))
+        return block is not None and song in block.songs
+
+    def __getitem__(self, index) -> Union[Song, List[Song]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                return list(self)[index]
+            return list(islice(self._iter_from(start), max(0, stop - start)))
+        block, offset = self._locate(index)
+        return block.songs[offset]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, BlockedSongList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BlockedSongList({list(self)!r})"
+
+    ##################################################
+    # List Mutations
+    ##################################################
+
+    def append(self, song: Song) -> None:
+        self.insert(self._len, song)
+
+    def extend(self, songs: Iterable[Song]) -> None:
+        songs = list(songs)
+        if not songs:
+            return
+        for song in songs:
+            self.stats.add(song)
+        if self._blocks:
+            # Top up the last block, then add whole blocks
+            last = self._blocks[-1]
+            room = min(len(songs), max(0, self.load - len(last.songs)))
+            last.songs.extend(songs[:room])
+            last.ids.extend(song.id for song in songs[:room])
+            for song in songs[:room]:
+                self._block_of[song.id] = last
+            songs = songs[room:]
+            self._len += room
+        for start in range(0, len(songs), self.load):
+            block = _Block(songs[start:start + self.load])
+            self._blocks.append(block)
+            for song in block.songs:
+                self._block_of[song.id] = block
+        self._len += len(songs)
+        self._rebuild()
+
+    def insert(self, index: int, song: Song) -> None:
+        if index < 0:
+            index += self._len
+        index = min(max(index, 0), self._len)
+        if not self._blocks:
+            self._blocks.append(_Block())
+            self._rebuild()
+        if index == self._len:
+            block = self._blocks[-1]
+            offset = len(block.songs)
+        else:
+            block, offset = self._locate(index)
+        block.songs.insert(offset, song)
+        block.ids.insert(offset, song.id)
+        self._block_of[song.id] = block
+        self._len += 1
+        self._add_length(block.number, 1)
+        self.stats.add(song)
+        if len(block.songs) > 2 * self.load:
+            self._split(block)
+
+    def remove(self, song: Song) -> None:
+        position = self.position_of(song.id)
+        if position is None or self[position] != song:
+            raise ValueError("song is not in the playlist")
+        del self[position]
+
+    def clear(self) -> None:
+        self._blocks = []
+        self._block_of = {}
+        self._len = 0
+        self._rebuild()
+        self.stats.reset()
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            songs = list(self)
+            songs[index] = value
+            self._reset(songs)
+            return
+        block, offset = self._locate(index)
+        old_song = block.songs[offset]
+        if self._block_of.get(old_song.id) is block:
+            del self._block_of[old_song.id]
+        block.songs[offset], block.ids[offset] = value, value.id
+        self._block_of[value.id] = block
+        self.stats.remove(old_song)
+        self.stats.add(value)
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            songs = list(self)
+            del songs[index]
+            self._reset(songs)
+            return
+        block, offset = self._locate(index)
+        song = block.songs.pop(offset)
+        del block.ids[offset]
+        if self._block_of.get(song.id) is block:
+            del self._block_of[song.id]
+        self._len -= 1
+        self._add_length(block.number, -1)
+        self.stats.remove(song)
+        if len(block.songs) < self.load // 4:
+            self._merge(block)
+
+    def __iadd__(self, songs: Iterable[Song]) -> "BlockedSongList":
+        self.extend(songs)
+        return self
+
+    def sort(self, *args, **kwargs) -> None:
+        songs = list(self)
+        songs.sort(*args, **kwargs)
+        self._reset(songs)
+
+    def reverse(self) -> None:
+        self._reset(reversed(list(self)))
+
+
+SongList = Union[IndexedSongList, BlockedSongList]
+
+
+def make_song_list(storage: str = PLAYLIST_STORAGE) -> SongList:
+    """
+    Creates an empty song list for a playlist storage engine.
+
+    Args:
+        storage (str): "list" for an IndexedSongList, whose positional inserts and
+            deletes shift the list, or "blocked" for a BlockedSongList, whose
+            positional operations stay fast on playlists of millions of tracks.
+
+    Returns:
+        SongList: The empty song list.
+
+    Raises:
+        ValueError: If the storage engine is unknown.
+    """
+    if storage == "list":
+        return IndexedSongList()
+    if storage == "blocked":
+        return BlockedSongList()
+    logger.error("Unknown playlist storage engine: %s", storage)
+    raise ValueError(f"Unknown PLAYLIST_STORAGE: {storage} (expected 'list' or 'blocked')")
@@ -1,9 +1,16 @@
+from bisect import bisect_left
+from collections import Counter
 from dataclasses import dataclass
 import logging
+import os
 import sqlite3
-from typing import Any
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NoReturn, Optional, Tuple, Union
 
+from music_collection.models.catalog_cache import CATALOG_CACHE, CatalogCache
 from music_collection.utils.logger import configure_logger
+from music_collection.utils.metrics import timed_db
 from music_collection.utils.random_utils import get_random
 from music_collection.utils.sql_utils import get_db_connection
 
@@ -12,8 +19,34 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# How long the cached list of live song ids may be served before it is reloaded
+LIVE_SONG_IDS_TTL = float(os.getenv("LIVE_SONG_IDS_TTL", "60"))
+
+_live_song_ids: Optional[List[int]] = None
+_live_song_ids_loaded_at = 0.0
+_live_song_ids_lock = threading.Lock()
+
+# Optional cross-process cache for catalog reads, see CatalogCache
+catalog_cache: Optional[CatalogCache] = CatalogCache() if CATALOG_CACHE else None
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+SQL_PARAMETER_CHUNK_SIZE = 500
+
+# Catalog paging: rows per page by default and at most, and rows per fetch when streaming
+CATALOG_PAGE_SIZE = int(os.getenv("CATALOG_PAGE_SIZE", "100"))
+CATALOG_MAX_PAGE_SIZE = int(os.getenv("CATALOG_MAX_PAGE_SIZE", "1000"))
+CATALOG_STREAM_CHUNK_SIZE = int(os.getenv("CATALOG_STREAM_CHUNK_SIZE", "500"))
+
+# Bulk import: rows per transaction, and how many row problems are reported individually
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "300"))
+IMPORT_MAX_REPORTED_ISSUES = int(os.getenv("IMPORT_MAX_REPORTED_ISSUES", "1000"))
+
+
 @dataclass
 class Song:
+    # Slots instead of a per-instance __dict__: playlists and catalog reads hold many songs
+    __slots__ = ("id", "artist", "title", "year", "genre", "duration")
+
     id: int
     artist: str
     title: str
@@ -27,7 +60,27 @@ class Song:
         if self.year <= 1900:
             raise ValueError(f"Year must be greater than 1900, got {self.year}")
 
+    @classmethod
+    def from_row(cls, row: Tuple[int, str, str, int, str, int]) -> "Song":
+        """
+        Builds a song from a trusted (id, artist, title, year, genre, duration) row without validating it.
+
+        Only use this for rows read back from our own tables, whose values were
+        validated when they were written.
+        """
+        song = object.__new__(cls)
+        song.id, song.artist, song.title, song.year, song.genre, song.duration = row
+        return song
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the song's fields as a dictionary, for JSON responses.
+        """
+        return {"id": self.id, "artist": self.artist, "title": self.title,
+                "year": self.year, "genre": self.genre, "duration": self.duration}
 
+
+@timed_db
 def create_song(artist: str, title: str, year: int, genre: str, duration: int) -> None:
     """
     Creates a new song in the songs table.
@@ -61,6 +114,7 @@ def create_song(artist: str, title: str, year: int, genre: str, duration: int) -
             conn.commit()
 
             logger.info("Song created successfully: %s - %s (%d)", artist, title, year)
+            invalidate_live_song_ids()
 
     except sqlite3.IntegrityError as e:
         logger.error("Song with artist '%s', title '%s', and year %d already exists.", artist, title, year)
@@ -70,6 +124,159 @@ def create_song(artist: str, title: str, year: int, genre: str, duration: int) -
         raise sqlite3.Error(f"Database error: {str(e)}")
 
 
+def _song_row_from_record(record: Mapping[str, Any]) -> Tuple[str, str, int, str, int]:
+    """
+    Validates an imported record with the same rules as Song and returns it as an insert row.
+
+    Args:
+        record (Mapping[str, Any]): The fields of the song, as parsed from CSV or JSON.
+
+    Returns:
+        Tuple[str, str, int, str, int]: (artist, title, year, genre, duration).
+
+    Raises:
+        ValueError: If a field is missing or invalid.
+    """
+    values = {}
+    for field in ("artist", "title", "genre"):
+        value = record.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"Missing or invalid {field}")
+        values[field] = value
+    for field in ("year", "duration"):
+        value = record.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+            value = int(value) if value.lstrip("-").isdigit() else None
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(f"Missing or invalid {field}")
+        values[field] = value
+
+    song = Song(id=0, **values)
+    return song.artist, song.title, song.year, song.genre, song.duration
+
+@timed_db
+def import_songs(records: Iterable[Tuple[int, Any]], chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """
+    Bulk inserts songs from a stream of parsed records.
+
+    Records are validated with the Song rules and inserted in chunks, one transaction
+    per chunk. Invalid rows and rows that duplicate an existing song (or an earlier
+    row) on (artist, title, year) are skipped and reported without aborting the
+    import. Only one chunk is held in memory at a time.
+
+    Args:
+        records (Iterable[Tuple[int, Any]]): (row number, record) pairs, where the record is
+            a mapping of song fields or the ValueError raised while parsing its line.
+        chunk_size (int): The number of rows inserted per transaction.
+
+    Returns:
+        dict: The counts of rows read, inserted, duplicate and invalid, plus up to
+            IMPORT_MAX_REPORTED_ISSUES issues of the form {'row', 'error'}.
+
+    Raises:
+        sqlite3.Error: If any database error occurs. Chunks committed before the error are kept.
+    """
+    summary = {'rows': 0, 'inserted': 0, 'duplicates': 0, 'invalid': 0, 'issues': [], 'issues_truncated': False}
+
+    def report(row_number: int, error: str) -> None:
+        if len(summary['issues']) < IMPORT_MAX_REPORTED_ISSUES:
+            summary['issues'].append({'row': row_number, 'error': error})
+        else:
+            summary['issues_truncated'] = True
+
+    chunk: List[Tuple[int, Tuple[str, str, int, str, int]]] = []
+
+    def flush(cursor: sqlite3.Cursor, conn: sqlite3.Connection) -> None:
+        keys = list(dict.fromkeys(row[:3] for _, row in chunk))
+        seen = set()
+        # Three parameters per key
+        step = SQL_PARAMETER_CHUNK_SIZE // 3
+        for start in range(0, len(keys), step):
+            key_chunk = keys[start:start + step]
+            placeholders = ", ".join("(?, ?, ?)" for _ in key_chunk)
+            cursor.execute(
+                f"SELECT artist, title, year FROM songs WHERE (artist, title, year) IN (VALUES {placeholders})",
+                [value for key in key_chunk for value in key]
+            )
+            seen.update(cursor.fetchall())
+
+        rows = []
+        for row_number, row in chunk:
+            if row[:3] in seen:
+                summary['duplicates'] += 1
+                report(row_number, f"Song with artist '{row[0]}', title '{row[1]}', and year {row[2]} already exists.")
+            else:
+                seen.add(row[:3])
+                rows.append(row)
+
+        if rows:
+            # DO NOTHING covers rows inserted by another writer since the check above
+            cursor.executemany("""
+                INSERT INTO songs (artist, title, year, genre, duration)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(artist, title, year) DO NOTHING
+            """, rows)
+            inserted = cursor.rowcount
+            summary['inserted'] += inserted
+            summary['duplicates'] += len(rows) - inserted
+        conn.commit()
+        chunk.clear()
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Starting bulk song import in chunks of %d", chunk_size)
+
+            for row_number, record in records:
+                summary['rows'] += 1
+                try:
+                    if isinstance(record, ValueError):
+                        raise record
+                    chunk.append((row_number, _song_row_from_record(record)))
+                except ValueError as e:
+                    summary['invalid'] += 1
+                    report(row_number, str(e))
+                    continue
+                if len(chunk) >= chunk_size:
+                    flush(cursor, conn)
+            if chunk:
+                flush(cursor, conn)
+
+    except sqlite3.Error as e:
+        logger.error("Database error during bulk song import: %s", str(e))
+        raise e
+    finally:
+        if summary['inserted']:
+            invalidate_live_song_ids()
+
+    logger.info("Imported %d of %d songs (%d duplicates, %d invalid)",
+                summary['inserted'], summary['rows'], summary['duplicates'], summary['invalid'])
+    return summary
+
+def _raise_unavailable_song(cursor: sqlite3.Cursor, song_id: int, deleted_message: str) -> NoReturn:
+    """
+    Explains why a conditional write matched no live song.
+
+    Only called after an UPDATE ... WHERE deleted = FALSE touched no row, so
+    the common path needs no separate existence check.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor of the failed write.
+        song_id (int): The ID of the song.
+        deleted_message (str): How to describe a deleted song, e.g. "has been deleted".
+
+    Raises:
+        ValueError: If the song has been deleted or does not exist.
+    """
+    cursor.execute("SELECT deleted FROM songs WHERE id = ?", (song_id,))
+    if cursor.fetchone() is None:
+        logger.info("Song with ID %s not found", song_id)
+        raise ValueError(f"Song with ID {song_id} not found")
+    logger.info("Song with ID %s %s", song_id, deleted_message)
+    raise ValueError(f"Song with ID {song_id} {deleted_message}")
+
+@timed_db
 def delete_song(song_id: int) -> None:
     """
     Soft deletes a song from the catalog by marking it as deleted.
@@ -85,22 +292,14 @@ def delete_song(song_id: int) -> None:
         with get_db_connection() as conn:
             cursor = conn.cursor()
 
-            # Check if the song exists and if it's already deleted
-            cursor.execute("SELECT deleted FROM songs WHERE id = ?", (song_id,))
-            try:
-                deleted = cursor.fetchone()[0]
-                if deleted:
-                    logger.info("Song with ID %s has already been deleted", song_id)
-                    raise ValueError(f"Song with ID {song_id} has already been deleted")
-            except TypeError:
-                logger.info("Song with ID %s not found", song_id)
-                raise ValueError(f"Song with ID {song_id} not found")
-
-            # Perform the soft delete by setting 'deleted' to TRUE
-            cursor.execute("UPDATE songs SET deleted = TRUE WHERE id = ?", (song_id,))
+            # Perform the soft delete by setting 'deleted' to TRUE, if the song is still live
+            cursor.execute("UPDATE songs SET deleted = TRUE WHERE id = ? AND deleted = FALSE RETURNING id", (song_id,))
+            if cursor.fetchone() is None:
+                _raise_unavailable_song(cursor, song_id, "has already been deleted")
             conn.commit()
 
             logger.info("Song with ID %s marked as deleted.", song_id)
+            _discard_live_song_id(song_id)
 
     except sqlite3.Error as e:
         logger.error("Database error while deleting song: %s", str(e))
@@ -119,6 +318,15 @@ def get_song_by_id(song_id: int) -> Song:
     Raises:
         ValueError: If the song is not found or is marked as deleted.
     """
+    if catalog_cache is not None:
+        return catalog_cache.get_or_load(("id", song_id), lambda: _fetch_song_by_id(song_id))
+    return _fetch_song_by_id(song_id)
+
+@timed_db
+def _fetch_song_by_id(song_id: int) -> Song:
+    """
+    Reads a song by ID from the database; see get_song_by_id.
+    """
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -135,7 +343,7 @@ def get_song_by_id(song_id: int) -> Song:
                     logger.info("Song with ID %s has been deleted", song_id)
                     raise ValueError(f"Song with ID {song_id} has been deleted")
                 logger.info("Song with ID %s found", song_id)
-                return Song(id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5])
+                return Song.from_row(row[:6])
             else:
                 logger.info("Song with ID %s not found", song_id)
                 raise ValueError(f"Song with ID {song_id} not found")
@@ -159,6 +367,15 @@ def get_song_by_compound_key(artist: str, title: str, year: int) -> Song:
     Raises:
         ValueError: If the song is not found or is marked as deleted.
     """
+    if catalog_cache is not None:
+        return catalog_cache.get_or_load(("key", artist, title, year), lambda: _fetch_song_by_compound_key(artist, title, year))
+    return _fetch_song_by_compound_key(artist, title, year)
+
+@timed_db
+def _fetch_song_by_compound_key(artist: str, title: str, year: int) -> Song:
+    """
+    Reads a song by compound key from the database; see get_song_by_compound_key.
+    """
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -175,7 +392,7 @@ def get_song_by_compound_key(artist: str, title: str, year: int) -> Song:
                     logger.info("Song with artist '%s', title '%s', and year %d has been deleted", artist, title, year)
                     raise ValueError(f"Song with artist '{artist}', title '{title}', and year {year} has been deleted")
                 logger.info("Song with artist '%s', title '%s', and year %d found", artist, title, year)
-                return Song(id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5])
+                return Song.from_row(row[:6])
             else:
                 logger.info("Song with artist '%s', title '%s', and year %d not found", artist, title, year)
                 raise ValueError(f"Song with artist '{artist}', title '{title}', and year {year} not found")
@@ -197,6 +414,16 @@ def get_all_songs(sort_by_play_count: bool = False) -> list[dict]:
     Logs:
         Warning: If the catalog is empty.
     """
+    if catalog_cache is not None:
+        # Copy so callers cannot reorder the cached list
+        return list(catalog_cache.get_or_load(("all", sort_by_play_count), lambda: _fetch_all_songs(sort_by_play_count)))
+    return _fetch_all_songs(sort_by_play_count)
+
+@timed_db
+def _fetch_all_songs(sort_by_play_count: bool) -> list[dict]:
+    """
+    Reads all non-deleted songs from the database; see get_all_songs.
+    """
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -218,18 +445,7 @@ def get_all_songs(sort_by_play_count: bool = False) -> list[dict]:
                 logger.warning("The song catalog is empty.")
                 return []
 
-            songs = [
-                {
-                    "id": row[0],
-                    "artist": row[1],
-                    "title": row[2],
-                    "year": row[3],
-                    "genre": row[4],
-                    "duration": row[5],
-                    "play_count": row[6],
-                }
-                for row in rows
-            ]
+            songs = [_catalog_row_to_dict(row) for row in rows]
             logger.info("Retrieved %d songs from the catalog", len(songs))
             return songs
 
@@ -237,10 +453,187 @@ def get_all_songs(sort_by_play_count: bool = False) -> list[dict]:
         logger.error("Database error while retrieving all songs: %s", str(e))
         raise e
 
+def _catalog_row_to_dict(row: tuple) -> dict:
+    """
+    Converts a catalog row (id, artist, title, year, genre, duration, play_count) to a dictionary.
+    """
+    return {
+        "id": row[0],
+        "artist": row[1],
+        "title": row[2],
+        "year": row[3],
+        "genre": row[4],
+        "duration": row[5],
+        "play_count": row[6],
+    }
+
+@timed_db
+def get_songs_page(limit: int = CATALOG_PAGE_SIZE, after_id: Optional[int] = None,
+                   after_play_count: Optional[int] = None, sort_by_play_count: bool = False) -> list[dict]:
+    """
+    Retrieves one page of non-deleted songs using keyset pagination.
+
+    Pages are ordered by id, or by play count (descending) then id when sorting by
+    play count. The next page starts after the last song of this one: pass its id
+    as `after_id`, plus its play count as `after_play_count` in the sorted mode.
+
+    Args:
+        limit (int): The maximum number of songs to return.
+        after_id (int, optional): The id of the last song of the previous page.
+        after_play_count (int, optional): The play count of the last song of the previous page.
+        sort_by_play_count (bool): If True, sort the songs by play count in descending order.
+
+    Returns:
+        list[dict]: Up to `limit` songs with play_count.
+
+    Raises:
+        ValueError: If the limit is out of range or the keyset is incomplete.
+        sqlite3.Error: If any database error occurs.
+    """
+    if not 1 <= limit <= CATALOG_MAX_PAGE_SIZE:
+        raise ValueError(f"Page limit must be between 1 and {CATALOG_MAX_PAGE_SIZE}, got {limit}")
+    if after_play_count is not None and not sort_by_play_count:
+        raise ValueError("after_play_count is only valid when sorting by play count")
+    if sort_by_play_count and (after_id is None) != (after_play_count is None):
+        raise ValueError("after_id and after_play_count must be given together when sorting by play count")
+
+    query = """
+        SELECT id, artist, title, year, genre, duration, play_count
+        FROM songs
+        WHERE deleted = FALSE
+    """
+    params: List[Any] = []
+    if sort_by_play_count:
+        if after_id is not None:
+            # The leading range lets the play count index seek to the page start
+            query += " AND play_count <= ? AND (play_count < ? OR id > ?)"
+            params += [after_play_count, after_play_count, after_id]
+        query += " ORDER BY play_count DESC, id LIMIT ?"
+    else:
+        if after_id is not None:
+            query += " AND id > ?"
+            params.append(after_id)
+        query += " ORDER BY id LIMIT ?"
+    params.append(limit)
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Retrieving a page of up to %d songs after id %s", limit, after_id)
+            cursor.execute(query, params)
+            return [_catalog_row_to_dict(row) for row in cursor.fetchall()]
+
+    except sqlite3.Error as e:
+        logger.error("Database error while retrieving a page of songs: %s", str(e))
+        raise e
+
+def iter_all_songs(sort_by_play_count: bool = False, chunk_size: int = CATALOG_STREAM_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yields every non-deleted song, fetching rows from the cursor in chunks.
+
+    Only one chunk is held in memory at a time, so this suits streaming large catalogs.
+
+    Args:
+        sort_by_play_count (bool): If True, yield the songs by play count in descending order.
+        chunk_size (int): The number of rows to fetch at a time.
+
+    Yields:
+        dict: One song with play_count.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    query = """
+        SELECT id, artist, title, year, genre, duration, play_count
+        FROM songs
+        WHERE deleted = FALSE
+    """
+    query += " ORDER BY play_count DESC, id" if sort_by_play_count else " ORDER BY id"
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Streaming all non-deleted songs from the catalog")
+            cursor.execute(query)
+            count = 0
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _catalog_row_to_dict(row)
+                count += len(rows)
+            logger.info("Streamed %d songs from the catalog", count)
+
+    except sqlite3.Error as e:
+        logger.error("Database error while streaming songs: %s", str(e))
+        raise e
+
+def invalidate_live_song_ids() -> None:
+    """
+    Drops the cached list of live song ids so the next random pick reloads it.
+    """
+    global _live_song_ids
+    with _live_song_ids_lock:
+        _live_song_ids = None
+
+def _discard_live_song_id(song_id: int) -> None:
+    """
+    Removes a single id from the cached list of live song ids, if it is loaded.
+
+    The cached list is replaced rather than changed in place, so a list
+    already returned by _get_live_song_ids() stays valid for its caller.
+
+    Args:
+        song_id (int): The ID of the song that is no longer live.
+    """
+    global _live_song_ids
+    with _live_song_ids_lock:
+        if _live_song_ids is None:
+            return
+        index = bisect_left(_live_song_ids, song_id)
+        if index < len(_live_song_ids) and _live_song_ids[index] == song_id:
+            _live_song_ids = _live_song_ids[:index] + _live_song_ids[index + 1:]
+
+def _get_live_song_ids() -> List[int]:
+    """
+    Returns the ids of all non-deleted songs in ascending order.
+
+    The list is loaded with a single id-only query and cached for
+    LIVE_SONG_IDS_TTL seconds, so random picks do not read the whole catalog.
+    The returned list is never modified afterwards and must not be modified by the caller.
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    global _live_song_ids, _live_song_ids_loaded_at
+    with _live_song_ids_lock:
+        if _live_song_ids is not None and time.monotonic() - _live_song_ids_loaded_at < LIVE_SONG_IDS_TTL:
+            return _live_song_ids
+
+        _live_song_ids = _load_live_song_ids()
+        _live_song_ids_loaded_at = time.monotonic()
+        return _live_song_ids
+
+@timed_db
+def _load_live_song_ids() -> List[int]:
+    """
+    Reads the ids of all non-deleted songs from the database; see _get_live_song_ids.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        logger.info("Loading the ids of all non-deleted songs")
+        cursor.execute("SELECT id FROM songs WHERE deleted = FALSE ORDER BY id")
+        return [row[0] for row in cursor.fetchall()]
+
 def get_random_song() -> Song:
     """
     Retrieves a random song from the catalog.
 
+    The random index is drawn from random.org, or locally while random.org is
+    failing, over the non-deleted songs ordered by id, and only the chosen row
+    is read from the database.
+
     Returns:
         Song: A randomly selected Song object.
 
@@ -248,31 +641,33 @@ def get_random_song() -> Song:
         ValueError: If the catalog is empty.
     """
     try:
-        all_songs = get_all_songs()
-
-        if not all_songs:
-            logger.info("Cannot retrieve random song because the song catalog is empty.")
-            raise ValueError("The song catalog is empty.")
-
-        # Get a random index using the random.org API
-        random_index = get_random(len(all_songs))
-        logger.info("Random index selected: %d (total songs: %d)", random_index, len(all_songs))
-
-        # Return the song at the random index, adjust for 0-based indexing
-        song_data = all_songs[random_index - 1]
-        return Song(
-            id=song_data["id"],
-            artist=song_data["artist"],
-            title=song_data["title"],
-            year=song_data["year"],
-            genre=song_data["genre"],
-            duration=song_data["duration"]
-        )
+        # One retry covers an id list made stale by a delete in another process
+        for attempt in range(2):
+            song_ids = _get_live_song_ids()
+
+            if not song_ids:
+                logger.info("Cannot retrieve random song because the song catalog is empty.")
+                raise ValueError("The song catalog is empty.")
+
+            # Get a random index, from random.org unless its circuit breaker is open
+            random_index = get_random(len(song_ids))
+            logger.info("Random index selected: %d (total songs: %d)", random_index, len(song_ids))
+
+            # Look up the song at the random index, adjust for 0-based indexing
+            song_id = song_ids[random_index - 1]
+            try:
+                return get_song_by_id(song_id)
+            except ValueError:
+                if attempt:
+                    raise
+                logger.warning("Song with ID %d is no longer available, reloading song ids", song_id)
+                invalidate_live_song_ids()
 
     except Exception as e:
         logger.error("Error while retrieving random song: %s", str(e))
         raise e
 
+@timed_db
 def update_play_count(song_id: int) -> None:
     """
     Increments the play count of a song by song ID.
@@ -289,19 +684,10 @@ def update_play_count(song_id: int) -> None:
             cursor = conn.cursor()
             logger.info("Attempting to update play count for song with ID %d", song_id)
 
-            # Check if the song exists and if it's deleted
-            cursor.execute("SELECT deleted FROM songs WHERE id = ?", (song_id,))
-            try:
-                deleted = cursor.fetchone()[0]
-                if deleted:
-                    logger.info("Song with ID %d has been deleted", song_id)
-                    raise ValueError(f"Song with ID {song_id} has been deleted")
-            except TypeError:
-                logger.info("Song with ID %d not found", song_id)
-                raise ValueError(f"Song with ID {song_id} not found")
-
-            # Increment the play count
-            cursor.execute("UPDATE songs SET play_count = play_count + 1 WHERE id = ?", (song_id,))
+            # Increment the play count, if the song is still live
+            cursor.execute("UPDATE songs SET play_count = play_count + 1 WHERE id = ? AND deleted = FALSE RETURNING id", (song_id,))
+            if cursor.fetchone() is None:
+                _raise_unavailable_song(cursor, song_id, "has been deleted")
             conn.commit()
 
             logger.info("Play count incremented for song with ID: %d", song_id)
@@ -309,3 +695,66 @@ def update_play_count(song_id: int) -> None:
     except sqlite3.Error as e:
         logger.error("Database error while updating play count for song with ID %d: %s", song_id, str(e))
         raise e
+
+@timed_db
+def update_play_counts(song_ids: Union[Iterable[int], Mapping[int, int]]) -> Dict[int, str]:
+    """
+    Increments the play counts of many songs in a single transaction.
+
+    Songs that appear more than once are incremented once per appearance.
+    Missing and deleted songs are skipped and reported instead of aborting
+    the batch.
+
+    Args:
+        song_ids (Iterable[int] | Mapping[int, int]): The IDs of the songs that were played,
+            one entry per play, or a mapping of song ID to number of plays.
+
+    Returns:
+        Dict[int, str]: The error message for each song ID that could not be updated.
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    play_counts = Counter(song_ids)
+    if not play_counts:
+        return {}
+
+    unique_ids = list(play_counts)
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Attempting to update play counts for %d songs", len(unique_ids))
+
+            # Take the write lock before the check, so no song can be deleted between it and the writes
+            cursor.execute("BEGIN IMMEDIATE")
+
+            # Check which songs exist and which are deleted with set-based queries
+            deleted_by_id = {}
+            for start in range(0, len(unique_ids), SQL_PARAMETER_CHUNK_SIZE):
+                chunk = unique_ids[start:start + SQL_PARAMETER_CHUNK_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor.execute(f"SELECT id, deleted FROM songs WHERE id IN ({placeholders})", chunk)
+                deleted_by_id.update(cursor.fetchall())
+
+            failures = {}
+            updates = []
+            for song_id in unique_ids:
+                if song_id not in deleted_by_id:
+                    logger.info("Song with ID %d not found", song_id)
+                    failures[song_id] = f"Song with ID {song_id} not found"
+                elif deleted_by_id[song_id]:
+                    logger.info("Song with ID %d has been deleted", song_id)
+                    failures[song_id] = f"Song with ID {song_id} has been deleted"
+                else:
+                    updates.append((play_counts[song_id], song_id))
+
+            # Apply every increment and commit once
+            cursor.executemany("UPDATE songs SET play_count = play_count + ? WHERE id = ? AND deleted = FALSE", updates)
+            conn.commit()
+
+            logger.info("Play counts incremented for %d songs (%d failed)", len(updates), len(failures))
+            return failures
+
+    except sqlite3.Error as e:
+        logger.error("Database error while updating play counts: %s", str(e))
+        raise e
@@ -1,26 +1,115 @@
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import os
+import queue
 import sys
+import threading
+import time
 
-from flask import current_app, has_request_context
 
+# Log level and repeat limits, tunable from the environment
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", "20"))
+LOG_RATE_WINDOW = float(os.getenv("LOG_RATE_WINDOW", "1.0"))
 
-def configure_logger(logger):
-    logger.setLevel(logging.DEBUG)  # Set the desired logging level here
+_queue_handler = None
+_queue_listener = None
+_setup_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops repeats of the same log call beyond `limit` records per `window` seconds.
+
+    Records are grouped by logger, level and unformatted message, so a loop
+    logging "Playing track number: %d" counts as one source. Errors are
+    never dropped. The first record after a window with drops notes how
+    many were suppressed.
+    """
+
+    MAX_TRACKED = 10000
+
+    def __init__(self, limit: int = LOG_RATE_LIMIT, window: float = LOG_RATE_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno >= logging.ERROR:
+            return True
+
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                if len(self._windows) >= self.MAX_TRACKED:
+                    self._windows.clear()
+                self._windows[key] = [now, 1, 0]
+            elif state[1] < self.limit:
+                state[1] += 1
+                return True
+            else:
+                state[2] += 1
+                return False
+
+        if suppressed and isinstance(record.args, tuple):
+            record.msg = f"{record.msg} (%d similar messages suppressed)"
+            record.args = record.args + (suppressed,)
+        return True
 
-    # Create a console handler that logs to stderr
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setLevel(logging.DEBUG)
 
-    # Create a formatter with a timestamp
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+def _get_level() -> int:
+    """
+    Returns the numeric log level named by LOG_LEVEL, falling back to INFO.
+    """
+    level = logging.getLevelName(LOG_LEVEL)
+    return level if isinstance(level, int) else logging.INFO
+
+
+def _get_queue_handler() -> QueueHandler:
+    """
+    Returns the process-wide queue handler, starting its writer thread on first use.
+
+    Records are handed to an in-memory queue on the calling thread, and one
+    background listener formats them and writes them to stderr.
+    """
+    global _queue_handler, _queue_listener
+    with _setup_lock:
+        if _queue_handler is None:
+            log_queue = queue.SimpleQueue()
+
+            # Create a console handler that logs to stderr
+            stream_handler = logging.StreamHandler(sys.stderr)
+            # Create a formatter with a timestamp
+            stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+            _queue_handler = QueueHandler(log_queue)
+            _queue_handler.addFilter(RateLimitFilter())
+            _queue_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+            _queue_listener.start()
+            # Drain the queue before the interpreter exits
+            atexit.register(_queue_listener.stop)
+        return _queue_handler
+
+
+def configure_logger(logger):
+    """
+    Configures a logger to write through the shared non-blocking queue handler.
 
-    # Add the formatter to the handler
-    handler.setFormatter(formatter)
+    Safe to call repeatedly: the handler is attached at most once. Flask's own
+    handlers are not attached, since records already reach stderr through the queue.
 
-    # Add the handler to the logger
-    logger.addHandler(handler)
+    Args:
+        logger (logging.Logger): The logger to configure.
+    """
+    logger.setLevel(_get_level())
 
-    if has_request_context():
-        app_logger = current_app.logger
-        for handler in app_logger.handlers:
-            logger.addHandler(handler)
\ No newline at end of file
+    # Add the shared queue handler to the logger
+    handler = _get_queue_handler()
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
@@ -0,0 +1,191 @@
+"""
+Fractional order keys: strings that sort in list order and leave room between any two.
+
+A key is an integer part followed by an optional fraction, both in base 62.
+The first character of the integer part encodes its length ('a' = 1 digit,
+'b' = 2, ... and 'Z', 'Y', ... for the negative side), so appending or
+prepending only grows keys logarithmically, while inserting between two
+neighbours extends the fraction. Keys compare correctly as plain strings,
+including with SQLite's default BINARY collation.
+
+Adapted from the fractional-indexing algorithm by David Greenspan
+(https://observablehq.com/@dgreensp/implementing-fractional-indexing).
+"""
+from typing import List, Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+_SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """
+    Returns a fraction strictly between fractions `a` and `b` (None meaning 1).
+    """
+    if b is not None:
+        # Skip the common prefix; the midpoint shares it
+        n = 0
+        while (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    # The first digits are consecutive
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid order key head: {head!r}")
+
+
+def _split(key: str) -> tuple:
+    """
+    Splits a key into its integer part and its fraction.
+
+    Raises:
+        ValueError: If the key is malformed.
+    """
+    if not key:
+        raise ValueError("Invalid order key: ''")
+    length = _integer_length(key[0])
+    if length > len(key) or any(char not in DIGITS for char in key[1:]):
+        raise ValueError(f"Invalid order key: {key!r}")
+    integer, fraction = key[:length], key[length:]
+    if key == _SMALLEST_INTEGER or fraction.endswith(DIGITS[0]):
+        raise ValueError(f"Invalid order key: {key!r}")
+    return integer, fraction
+
+
+def _increment_integer(integer: str) -> Optional[str]:
+    """
+    Returns the next integer part, or None past the largest one.
+    """
+    head, digits = integer[0], list(integer[1:])
+    for index in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[index]) + 1
+        if digit < BASE:
+            digits[index] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[index] = DIGITS[0]
+    # Carried out of the last digit: move to the next length
+    if head == "Z":
+        return "a" + DIGITS[0]
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(integer: str) -> Optional[str]:
+    """
+    Returns the previous integer part, or None before the smallest one.
+    """
+    head, digits = integer[0], list(integer[1:])
+    for index in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[index]) - 1
+        if digit >= 0:
+            digits[index] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[index] = DIGITS[-1]
+    # Borrowed past the first digit: move to the previous length
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """
+    Returns a key that sorts strictly between two keys.
+
+    Args:
+        a (str, optional): The key before, or None for the start of the list.
+        b (str, optional): The key after, or None for the end of the list.
+
+    Returns:
+        str: The new key.
+
+    Raises:
+        ValueError: If a key is malformed or `a` does not sort before `b`.
+    """
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Order key {a!r} must sort before {b!r}")
+
+    if a is None:
+        if b is None:
+            return "a" + DIGITS[0]
+        integer_b, fraction_b = _split(b)
+        if integer_b == _SMALLEST_INTEGER:
+            return integer_b + _midpoint("", fraction_b)
+        if fraction_b:
+            return integer_b
+        previous = _decrement_integer(integer_b)
+        if previous is None:
+            raise ValueError("Cannot create an order key before the smallest key")
+        return previous
+
+    integer_a, fraction_a = _split(a)
+    if b is None:
+        following = _increment_integer(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if following is None else following
+
+    integer_b, fraction_b = _split(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, fraction_b)
+    following = _increment_integer(integer_a)
+    if following is not None and following < b:
+        return following
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def keys_between(a: Optional[str], b: Optional[str], count: int) -> List[str]:
+    """
+    Returns `count` ascending keys strictly between two keys, spread evenly so they stay short.
+
+    Args:
+        a (str, optional): The key before, or None for the start of the list.
+        b (str, optional): The key after, or None for the end of the list.
+        count (int): How many keys to generate.
+
+    Returns:
+        List[str]: The new keys, in order.
+    """
+    if count <= 0:
+        return []
+    if count == 1:
+        return [key_between(a, b)]
+    if b is None:
+        keys = [key_between(a, None)]
+        for _ in range(count - 1):
+            keys.append(key_between(keys[-1], None))
+        return keys
+    if a is None:
+        keys = [key_between(None, b)]
+        for _ in range(count - 1):
+            keys.append(key_between(None, keys[-1]))
+        keys.reverse()
+        return keys
+    middle = count // 2
+    key = key_between(a, b)
+    return keys_between(a, key, middle) + [key] + keys_between(key, b, count - middle - 1)
@@ -1,13 +1,156 @@
 import logging
+import os
+import secrets
+import threading
+import time
+from typing import Optional
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from music_collection.utils.logger import configure_logger
+from music_collection.utils.metrics import RANDOM_ORG_FALLBACKS, timed_random_org
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
-def get_random(num_songs: int) -> int:
+# random.org client settings, tunable from the environment
+RANDOM_ORG_TIMEOUT = float(os.getenv("RANDOM_ORG_TIMEOUT", "5"))
+RANDOM_ORG_POOL_SIZE = int(os.getenv("RANDOM_ORG_POOL_SIZE", "10"))
+
+# circuit breaker settings: how many failed or slow calls in a row open it, what
+# counts as slow, and how long it stays open before one trial call is let through
+RANDOM_ORG_FAILURE_THRESHOLD = int(os.getenv("RANDOM_ORG_FAILURE_THRESHOLD", "3"))
+RANDOM_ORG_SLOW_SECONDS = float(os.getenv("RANDOM_ORG_SLOW_SECONDS", "1"))
+RANDOM_ORG_RESET_SECONDS = float(os.getenv("RANDOM_ORG_RESET_SECONDS", "30"))
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """
+    Returns the keep-alive session for random.org, creating it on first use.
+
+    The session is recreated after a fork, so worker processes do not share pooled sockets.
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=RANDOM_ORG_POOL_SIZE))
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency after repeated failures, and probes it again later.
+
+    The breaker is closed while calls succeed. After `failure_threshold`
+    consecutive failures it opens, and `allow()` refuses calls for
+    `reset_seconds`. It is then half-open: one trial call is allowed, which
+    closes the breaker if it succeeds and reopens it if it fails. Calls slower
+    than `slow_seconds` count as failures, since a dependency that answers
+    slowly stalls callers as much as one that does not answer.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the breaker.
+        slow_seconds (float): The duration above which a successful call counts as a failure.
+        reset_seconds (float): How long the breaker stays open before a trial call.
+    """
+
+    def __init__(self, failure_threshold: int = RANDOM_ORG_FAILURE_THRESHOLD,
+                 slow_seconds: float = RANDOM_ORG_SLOW_SECONDS, reset_seconds: float = RANDOM_ORG_RESET_SECONDS):
+        if failure_threshold < 1:
+            raise ValueError(f"Failure threshold must be at least 1, got {failure_threshold}")
+        self.failure_threshold = failure_threshold
+        self.slow_seconds = slow_seconds
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        """
+        The breaker state: "closed", "open" or "half-open".
+        """
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_seconds:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        """
+        Returns whether a call may go ahead. Every allowed call must be followed by record_success or record_failure.
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self, seconds: float) -> None:
+        """
+        Records a completed call and how long it took; a slow call counts as a failure.
+        """
+        if seconds > self.slow_seconds:
+            logger.warning("Call took %.3f s, over the %.3f s limit", seconds, self.slow_seconds)
+            self.record_failure()
+            return
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Circuit breaker closed after a successful trial call")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        """
+        Records a failed call, opening the breaker if the threshold is reached or a trial call failed.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or (self._opened_at is None and self._failures >= self.failure_threshold):
+                if self._opened_at is None:
+                    self._times_opened += 1
+                logger.error("Circuit breaker open after %d consecutive failures", self._failures)
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the breaker state and counters.
+        """
+        with self._lock:
+            return {
+                'state': self._state(),
+                'consecutive_failures': self._failures,
+                'times_opened': self._times_opened,
+                'rejected_calls': self._rejected,
+            }
+
+
+random_org_breaker = CircuitBreaker()
+
+
+@timed_random_org
+def fetch_random_org(num_songs: int) -> int:
     """
     Fetches a random int between 1 and the number of songs in the catalog from random.org.
 
@@ -24,7 +167,7 @@ def get_random(num_songs: int) -> int:
         # Log the request to random.org
         logger.info("Fetching random number from %s", url)
 
-        response = requests.get(url, timeout=5)
+        response = _get_session().get(url, timeout=RANDOM_ORG_TIMEOUT)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -46,3 +189,49 @@ def get_random(num_songs: int) -> int:
     except requests.exceptions.RequestException as e:
         logger.error("Request to random.org failed: %s", e)
         raise RuntimeError("Request to random.org failed: %s" % e)
+
+
+def get_random(num_songs: int) -> int:
+    """
+    Returns a random int between 1 and the number of songs in the catalog.
+
+    The number comes from random.org unless it is failing or slow: a failed
+    call, or any call while the circuit breaker is open, is answered from the
+    operating system's CSPRNG instead, so callers never wait on an outage
+    longer than one request timeout.
+
+    Args:
+        num_songs (int): The number of songs to choose from.
+
+    Returns:
+        int: The random number.
+    """
+    if random_org_breaker.allow():
+        start = time.perf_counter()
+        try:
+            random_number = fetch_random_org(num_songs)
+        except (RuntimeError, ValueError) as e:
+            random_org_breaker.record_failure()
+            logger.warning("Falling back to a local random number: %s", e)
+            RANDOM_ORG_FALLBACKS.inc("error")
+        except BaseException:
+            # Every allowed call must be recorded, or a half-open breaker would wait on this trial forever
+            random_org_breaker.record_failure()
+            raise
+        else:
+            random_org_breaker.record_success(time.perf_counter() - start)
+            # Out-of-range answers would index past the catalog
+            if 1 <= random_number <= num_songs:
+                return random_number
+            logger.warning("random.org returned %d, outside 1..%d; using a local random number", random_number, num_songs)
+            RANDOM_ORG_FALLBACKS.inc("error")
+    else:
+        RANDOM_ORG_FALLBACKS.inc("circuit_open")
+    return secrets.randbelow(num_songs) + 1
+
+
+def get_random_source_stats() -> dict:
+    """
+    Returns the state and counters of the random.org circuit breaker.
+    """
+    return random_org_breaker.stats()
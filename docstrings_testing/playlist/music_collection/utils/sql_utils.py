@@ -4,6 +4,7 @@ import os
 import sqlite3
 
 from music_collection.utils.logger import configure_logger
+from music_collection.utils.sql_trace import connection_factory
 
 
 logger = logging.getLogger(__name__)
@@ -60,7 +61,7 @@ def get_db_connection():
     """
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = sqlite3.connect(DB_PATH, factory=connection_factory())
         yield conn
     except sqlite3.Error as e:
         logger.error("Database connection error: %s", str(e))
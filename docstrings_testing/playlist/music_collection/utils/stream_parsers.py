@@ -0,0 +1,61 @@
+import csv
+import json
+import logging
+from typing import Any, Iterable, Iterator, Tuple, Union
+
+from music_collection.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# A parsed record, or the error explaining why its line could not be parsed
+ParsedRecord = Tuple[int, Union[dict, ValueError]]
+
+
+def iter_csv_records(lines: Iterable[str]) -> Iterator[ParsedRecord]:
+    """
+    Parses CSV text with a header row one record at a time.
+
+    Args:
+        lines (Iterable[str]): The lines of the CSV document, e.g. a text stream.
+
+    Yields:
+        Tuple[int, dict]: The 1-based data row number and the record keyed by the header fields.
+    """
+    reader = csv.DictReader(lines)
+    row_number = 0
+    for record in reader:
+        row_number += 1
+        if None in record:
+            # DictReader collects surplus fields under the None key
+            yield row_number, ValueError(f"Expected {len(reader.fieldnames)} fields, got {len(reader.fieldnames) + len(record[None])}")
+        else:
+            yield row_number, record
+
+
+def iter_ndjson_records(lines: Iterable[Union[str, bytes]]) -> Iterator[ParsedRecord]:
+    """
+    Parses newline-delimited JSON one record at a time. Blank lines are skipped.
+
+    Args:
+        lines (Iterable[Union[str, bytes]]): The lines of the document, e.g. a binary or text stream.
+
+    Yields:
+        Tuple[int, Union[dict, ValueError]]: The 1-based row number and the decoded object,
+            or a ValueError if the line is not a JSON object.
+    """
+    row_number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record: Any = json.loads(line)
+        except ValueError as e:
+            yield row_number, ValueError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield row_number, ValueError("Expected a JSON object")
+            continue
+        yield row_number, record
@@ -151,6 +151,22 @@ get_random_song() {
   fi
 }
 
+get_random_source_stats() {
+  echo "Retrieving random source stats..."
+  response=$(curl -s -X GET "$BASE_URL/random-source-stats")
+
+  if echo "$response" | grep -q '"status": "success"'; then
+    echo "Random source stats retrieved successfully."
+    if [ "$ECHO_JSON" = true ]; then
+      echo "Random Source Stats JSON:"
+      echo "$response" | jq .
+    fi
+  else
+    echo "Failed to retrieve random source stats."
+    exit 1
+  fi
+}
+
 
 ############################################################
 #
@@ -324,6 +340,22 @@ get_playlist_length_duration() {
   fi
 }
 
+get_playlist_stats() {
+  echo "Retrieving playlist stats..."
+  response=$(curl -s -X GET "$BASE_URL/get-playlist-stats")
+
+  if echo "$response" | grep -q '"status": "success"'; then
+    echo "Playlist stats retrieved successfully."
+    if [ "$ECHO_JSON" = true ]; then
+      echo "Playlist Stats JSON:"
+      echo "$response" | jq .
+    fi
+  else
+    echo "Failed to retrieve playlist stats."
+    exit 1
+  fi
+}
+
 go_to_track_number() {
   track_number=$1
   echo "Going to track number ($track_number)..."
@@ -478,6 +510,7 @@ get_all_songs
 get_song_by_id 2
 get_song_by_compound_key "The Beatles" "Let It Be" 1970
 get_random_song
+get_random_source_stats
 
 add_song_to_playlist "The Rolling Stones" "Paint It Black" 1966
 add_song_to_playlist "Queen" "Bohemian Rhapsody" 1975
@@ -501,6 +534,7 @@ get_all_songs_from_playlist
 get_song_from_playlist_by_track_number 1
 
 get_playlist_length_duration
+get_playlist_stats
 
 play_current_song
 rewind_playlist
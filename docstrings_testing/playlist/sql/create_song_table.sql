@@ -9,4 +9,10 @@ CREATE TABLE songs (
     play_count INTEGER DEFAULT 0,
     deleted BOOLEAN DEFAULT FALSE,
     UNIQUE(artist, title, year)
-);
\ No newline at end of file
+);
+
+CREATE INDEX idx_songs_live_play_count ON songs (deleted, play_count DESC, id);
+CREATE INDEX idx_songs_live_id ON songs (deleted, id);
+
+-- Keep in step with the latest file in sql/migrations
+PRAGMA user_version = 2;
@@ -0,0 +1,12 @@
+-- The original schema; a no-op on databases created by create_song_table.sql
+CREATE TABLE IF NOT EXISTS songs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    artist TEXT NOT NULL,
+    title TEXT NOT NULL,
+    year INTEGER NOT NULL CHECK(year >= 1900),
+    genre TEXT NOT NULL,
+    duration INTEGER NOT NULL CHECK(duration > 0),
+    play_count INTEGER DEFAULT 0,
+    deleted BOOLEAN DEFAULT FALSE,
+    UNIQUE(artist, title, year)
+);
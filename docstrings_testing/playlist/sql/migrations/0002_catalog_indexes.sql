@@ -0,0 +1,8 @@
+-- Both indexes lead with deleted, so every catalog read seeks straight to the
+-- live songs and walks them in the order it returns them, without a sort.
+
+-- Live songs by play count: the sorted catalog and its keyset pages
+CREATE INDEX IF NOT EXISTS idx_songs_live_play_count ON songs (deleted, play_count DESC, id);
+
+-- Live songs by id: the id-ordered pages, and a covering index for the random-pick id list
+CREATE INDEX IF NOT EXISTS idx_songs_live_id ON songs (deleted, id);
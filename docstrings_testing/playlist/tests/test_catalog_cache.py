@@ -0,0 +1,93 @@
+import sqlite3
+
+import pytest
+
+from music_collection.models.catalog_cache import CatalogCache
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A file-backed database with a small songs table."""
+    path = str(tmp_path / "catalog.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE songs (id INTEGER PRIMARY KEY, title TEXT)")
+    conn.execute("INSERT INTO songs (title) VALUES ('Song A')")
+    conn.commit()
+    conn.close()
+    return path
+
+@pytest.fixture
+def catalog_cache(db_path):
+    cache = CatalogCache(db_path=db_path, max_size=10)
+    yield cache
+    cache.close()
+
+def read_title(db_path, song_id):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT title FROM songs WHERE id = ?", (song_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+def write_title(db_path, song_id, title):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE songs SET title = ? WHERE id = ?", (title, song_id))
+    conn.commit()
+    conn.close()
+
+######################################################
+#
+#    Cache behaviour
+#
+######################################################
+
+def test_get_or_load_caches(catalog_cache, db_path, mocker):
+    """Test that a second lookup is served without loading."""
+    load = mocker.Mock(side_effect=lambda: read_title(db_path, 1))
+
+    assert catalog_cache.get_or_load(("id", 1), load) == "Song A"
+    assert catalog_cache.get_or_load(("id", 1), load) == "Song A"
+
+    assert load.call_count == 1
+    assert catalog_cache.stats()['hits'] == 1
+
+def test_write_from_other_connection_invalidates(catalog_cache, db_path):
+    """Test that a commit on any other connection drops cached entries."""
+    catalog_cache.get_or_load(("id", 1), lambda: read_title(db_path, 1))
+
+    write_title(db_path, 1, "Song B")
+
+    assert catalog_cache.get_or_load(("id", 1), lambda: read_title(db_path, 1)) == "Song B"
+    assert catalog_cache.stats()['invalidations'] == 1
+
+def test_write_during_load_is_not_cached(catalog_cache, db_path):
+    """Test that a value loaded while the database changed is not kept."""
+    def load_then_write():
+        title = read_title(db_path, 1)
+        write_title(db_path, 1, "Song B")
+        return title
+
+    assert catalog_cache.get_or_load(("id", 1), load_then_write) == "Song A"
+    assert catalog_cache.get_or_load(("id", 1), lambda: read_title(db_path, 1)) == "Song B"
+
+def test_load_errors_are_not_cached(catalog_cache):
+    """Test that exceptions propagate and leave nothing cached."""
+    def fail():
+        raise ValueError("Song with ID 5 not found")
+
+    with pytest.raises(ValueError, match="not found"):
+        catalog_cache.get_or_load(("id", 5), fail)
+
+    assert catalog_cache.stats()['size'] == 0
+
+def test_cache_is_bounded(catalog_cache):
+    """Test that the least recently used entries are evicted past max_size."""
+    for song_id in range(15):
+        catalog_cache.get_or_load(("id", song_id), lambda: song_id)
+
+    assert catalog_cache.stats()['size'] == 10
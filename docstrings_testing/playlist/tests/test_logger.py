@@ -0,0 +1,66 @@
+import logging
+
+from music_collection.utils.logger import RateLimitFilter, configure_logger
+
+
+def make_record(msg="Playing track number: %d", args=(1,), level=logging.INFO):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+######################################################
+#
+#    Handler registration
+#
+######################################################
+
+def test_configure_logger_is_idempotent():
+    """Test that configuring a logger repeatedly attaches a single handler."""
+    logger = logging.getLogger("test_configure_logger_is_idempotent")
+    configure_logger(logger)
+    configure_logger(logger)
+    configure_logger(logger)
+
+    assert len(logger.handlers) == 1
+
+def test_configure_logger_shares_handler():
+    """Test that all loggers write through the same queue handler."""
+    logger1 = logging.getLogger("test_shared_1")
+    logger2 = logging.getLogger("test_shared_2")
+    configure_logger(logger1)
+    configure_logger(logger2)
+
+    assert logger1.handlers[0] is logger2.handlers[0]
+
+######################################################
+#
+#    Rate limiting
+#
+######################################################
+
+def test_rate_limit_drops_repeats():
+    """Test that repeats of the same call beyond the limit are dropped."""
+    rate_filter = RateLimitFilter(limit=3, window=60)
+
+    allowed = [rate_filter.filter(make_record(args=(i,))) for i in range(10)]
+
+    assert allowed == [True] * 3 + [False] * 7
+
+def test_rate_limit_never_drops_errors():
+    """Test that error records are never dropped."""
+    rate_filter = RateLimitFilter(limit=1, window=60)
+
+    allowed = [rate_filter.filter(make_record(level=logging.ERROR)) for _ in range(5)]
+
+    assert all(allowed)
+
+def test_rate_limit_reports_suppressed(mocker):
+    """Test that the first record of a new window reports how many were suppressed."""
+    mock_time = mocker.patch("music_collection.utils.logger.time.monotonic", return_value=0.0)
+    rate_filter = RateLimitFilter(limit=1, window=1)
+    for i in range(4):
+        rate_filter.filter(make_record(args=(i,)))
+
+    mock_time.return_value = 2.0
+    record = make_record(args=(5,))
+
+    assert rate_filter.filter(record)
+    assert record.getMessage() == "Playing track number: 5 (3 similar messages suppressed)"
@@ -0,0 +1,108 @@
+import sqlite3
+
+from flask import Flask
+import pytest
+
+from music_collection.utils.metrics import (
+    Counter,
+    Histogram,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_REQUEST_SECONDS,
+    instrument_app,
+    timed
+)
+
+######################################################
+#
+#    Metric types
+#
+######################################################
+
+def test_histogram_render():
+    """Test that histogram buckets are rendered cumulatively with sum and count."""
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.1, "/a")
+    histogram.observe(5.0, "/a")
+
+    lines = histogram.render()
+
+    assert lines == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1.0"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.15',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+def test_counter_escapes_label_values():
+    """Test that quotes, backslashes and newlines in label values are escaped."""
+    counter = Counter("things_total", "Things.", ("name",))
+    counter.inc('a "b"\\\n')
+
+    assert counter.render()[-1] == 'things_total{name="a \\"b\\"\\\\\\n"} 1'
+
+def test_timed_records_calls_and_errors():
+    """Test that the timing decorator observes every call and counts only the listed errors."""
+    histogram = Histogram("calls_seconds", "Calls.", ("function",))
+    errors = Counter("call_errors_total", "Errors.", ("function",))
+
+    @timed(histogram, errors, (sqlite3.Error,))
+    def query(fail_with=None):
+        if fail_with:
+            raise fail_with
+        return "ok"
+
+    assert query() == "ok"
+    with pytest.raises(ValueError):
+        query(ValueError("not found"))
+    with pytest.raises(sqlite3.Error):
+        query(sqlite3.Error("locked"))
+
+    assert query.__name__ == "query"
+    assert histogram.count("query") == 3
+    assert errors.value("query") == 1
+
+######################################################
+#
+#    Flask instrumentation
+#
+######################################################
+
+@pytest.fixture
+def client():
+    app = Flask("metrics_test")
+
+    @app.route("/items/<int:item_id>")
+    def get_item(item_id):
+        return {"id": item_id}
+
+    @app.route("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    instrument_app(app)
+    return app.test_client()
+
+def test_instrument_app_records_route_pattern(client):
+    """Test that requests are counted by route pattern, method and status."""
+    before = HTTP_REQUESTS.value("GET", "/items/<int:item_id>", "200")
+
+    client.get("/items/1")
+    client.get("/items/2")
+
+    assert HTTP_REQUESTS.value("GET", "/items/<int:item_id>", "200") == before + 2
+    assert HTTP_REQUEST_SECONDS.count("GET", "/items/<int:item_id>") >= 2
+    assert HTTP_REQUESTS_IN_FLIGHT.value() == 0
+
+def test_instrument_app_records_unhandled_errors(client):
+    """Test that a request failing with an unhandled exception is counted as a 500."""
+    before = HTTP_REQUESTS.value("GET", "/boom", "500")
+
+    client.get("/boom")
+
+    assert HTTP_REQUESTS.value("GET", "/boom", "500") == before + 1
+    assert HTTP_REQUESTS_IN_FLIGHT.value() == 0
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+
+import pytest
+
+from music_collection.utils.migrations import MIGRATIONS_DIR, get_schema_version, load_migrations, migrate
+
+CREATE_TABLE_PATH = os.path.join(os.path.dirname(MIGRATIONS_DIR), "create_song_table.sql")
+
+# The schema create_song_table.sql produced before migrations existed
+LEGACY_SCHEMA = """
+    CREATE TABLE songs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        artist TEXT NOT NULL,
+        title TEXT NOT NULL,
+        year INTEGER NOT NULL CHECK(year >= 1900),
+        genre TEXT NOT NULL,
+        duration INTEGER NOT NULL CHECK(duration > 0),
+        play_count INTEGER DEFAULT 0,
+        deleted BOOLEAN DEFAULT FALSE,
+        UNIQUE(artist, title, year)
+    );
+"""
+
+CATALOG_COLUMNS = "SELECT id, artist, title, year, genre, duration, play_count FROM songs WHERE deleted = FALSE"
+
+######################################################
+#
+#    Helpers
+#
+######################################################
+
+def schema_of(db_path: str) -> set:
+    """Returns the tables and indexes of a database, with their normalized SQL."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'").fetchall()
+    finally:
+        conn.close()
+    return {(kind, name, " ".join(sql.replace("IF NOT EXISTS ", "").split())) for kind, name, sql in rows}
+
+def write_migration(directory, file_name: str, sql: str) -> None:
+    (directory / file_name).write_text(sql)
+
+######################################################
+#
+#    Upgrades
+#
+######################################################
+
+def test_migrate_fresh_database(tmp_path):
+    """Test that migrating an empty file produces the same schema as the create script."""
+    migrated = str(tmp_path / "migrated.db")
+    created = str(tmp_path / "created.db")
+
+    version = migrate(migrated)
+
+    conn = sqlite3.connect(created)
+    with open(CREATE_TABLE_PATH) as fh:
+        conn.executescript(fh.read())
+    created_version = get_schema_version(conn)
+    conn.close()
+
+    assert version == load_migrations()[-1].version
+    assert created_version == version, "create_song_table.sql must set the latest schema version."
+    assert schema_of(migrated) == schema_of(created)
+
+def test_migrate_legacy_database_keeps_data(tmp_path):
+    """Test that a database created by the old script is upgraded in place."""
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany(
+        "INSERT INTO songs (artist, title, year, genre, duration, play_count, deleted) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [("Artist A", "Song A", 2001, "Rock", 180, 5, False),
+         ("Artist B", "Song B", 2002, "Pop", 200, 9, True)]
+    )
+    conn.commit()
+    conn.close()
+
+    migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    songs = conn.execute("SELECT title, play_count FROM songs ORDER BY id").fetchall()
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+
+    assert songs == [("Song A", 5), ("Song B", 9)]
+    assert {"idx_songs_live_play_count", "idx_songs_live_id"} <= indexes
+
+def test_migrate_is_idempotent(tmp_path):
+    """Test that a second run finds nothing to apply."""
+    db_path = str(tmp_path / "song_catalog.db")
+    first = migrate(db_path)
+    before = schema_of(db_path)
+
+    assert migrate(db_path) == first
+    assert schema_of(db_path) == before
+
+def test_migrate_failure_rolls_back(tmp_path):
+    """Test that a failing migration leaves the schema and version untouched."""
+    migrations_dir = tmp_path / "migrations"
+    migrations_dir.mkdir()
+    write_migration(migrations_dir, "0001_create.sql", "CREATE TABLE t (id INTEGER PRIMARY KEY);")
+    db_path = str(tmp_path / "song_catalog.db")
+    migrate(db_path, str(migrations_dir))
+
+    write_migration(migrations_dir, "0002_index.sql", "CREATE INDEX idx_t ON t (id);")
+    write_migration(migrations_dir, "0003_broken.sql", "CREATE INDEX idx_missing ON missing (id);")
+
+    with pytest.raises(sqlite3.OperationalError, match="no such table: main.missing"):
+        migrate(db_path, str(migrations_dir))
+
+    conn = sqlite3.connect(db_path)
+    assert get_schema_version(conn) == 1
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'idx_t'").fetchone() is None
+    conn.close()
+
+def test_migrate_rejects_newer_database(tmp_path):
+    """Test that a database from a newer release is not touched."""
+    db_path = str(tmp_path / "song_catalog.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA user_version = 99")
+    conn.close()
+
+    with pytest.raises(ValueError, match="newer than the latest migration"):
+        migrate(db_path)
+
+def test_load_migrations_rejects_gaps(tmp_path):
+    """Test that misnumbered migration files are refused."""
+    write_migration(tmp_path, "0001_create.sql", "SELECT 1;")
+    write_migration(tmp_path, "0003_skipped.sql", "SELECT 1;")
+
+    with pytest.raises(ValueError, match="expected 2, got 3"):
+        load_migrations(str(tmp_path))
+
+######################################################
+#
+#    Query plans
+#
+######################################################
+
+@pytest.mark.parametrize("query, params, expected", [
+    (CATALOG_COLUMNS + " ORDER BY play_count DESC", (),
+     "SEARCH songs USING INDEX idx_songs_live_play_count (deleted=?)"),
+    (CATALOG_COLUMNS + " AND play_count <= ? AND (play_count < ? OR id > ?) ORDER BY play_count DESC, id LIMIT ?",
+     (30, 30, 7, 50), "SEARCH songs USING INDEX idx_songs_live_play_count (deleted=? AND play_count<?)"),
+    (CATALOG_COLUMNS + " AND id > ? ORDER BY id LIMIT ?", (7, 50),
+     "SEARCH songs USING INDEX idx_songs_live_id (deleted=? AND id>?)"),
+    ("SELECT id FROM songs WHERE deleted = FALSE ORDER BY id", (),
+     "SEARCH songs USING COVERING INDEX idx_songs_live_id (deleted=?)"),
+])
+def test_catalog_queries_use_indexes(tmp_path, query, params, expected):
+    """Test that catalog reads walk an index in order instead of scanning and sorting."""
+    db_path = str(tmp_path / "song_catalog.db")
+    migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+    conn.close()
+
+    assert expected in plan
+    assert not any("TEMP B-TREE" in step for step in plan)
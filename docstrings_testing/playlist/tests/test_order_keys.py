@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from music_collection.utils.order_keys import key_between, keys_between
+
+
+##################################################
+# Single Key Test Cases
+##################################################
+
+@pytest.mark.parametrize("a, b, expected", [
+    (None, None, "a0"),
+    ("a0", None, "a1"),
+    (None, "a0", "Zz"),
+    ("a0", "a1", "a0V"),
+    ("az", None, "b00"),
+    ("a0", "a0V", "a0G"),
+    ("a0V", "a1", "a0l"),
+])
+def test_key_between(a, b, expected):
+    """Test the keys generated at the ends of the list and between neighbours."""
+    assert key_between(a, b) == expected
+
+def test_key_between_rejects_unordered_keys():
+    """Test that the first key must sort before the second."""
+    with pytest.raises(ValueError, match="must sort before"):
+        key_between("a1", "a0")
+    with pytest.raises(ValueError, match="must sort before"):
+        key_between("a1", "a1")
+
+@pytest.mark.parametrize("key", ["", "a", "a00", "!0", "a0-", "A" + "0" * 26])
+def test_key_between_rejects_malformed_keys(key):
+    """Test that malformed keys, including ones with a trailing zero fraction, are rejected."""
+    with pytest.raises(ValueError, match="Invalid order key"):
+        key_between(key, None)
+
+def test_repeated_appends_and_prepends_grow_slowly():
+    """Test that keys at the ends of the list stay short."""
+    first = last = key_between(None, None)
+    for _ in range(10000):
+        first = key_between(None, first)
+        last = key_between(last, None)
+    assert first < last
+    assert len(first) <= 4 and len(last) <= 4
+
+def test_random_inserts_stay_sorted():
+    """Test that random inserts always produce a key strictly between the neighbours."""
+    rng = random.Random(21)
+    keys = []
+    for _ in range(5000):
+        index = rng.randint(0, len(keys))
+        before = keys[index - 1] if index > 0 else None
+        after = keys[index] if index < len(keys) else None
+        keys.insert(index, key_between(before, after))
+
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+##################################################
+# Bulk Key Test Cases
+##################################################
+
+@pytest.mark.parametrize("a, b", [(None, None), ("a0", None), (None, "a0"), ("a0", "a1")])
+def test_keys_between(a, b):
+    """Test that bulk keys are ascending, distinct, and between the bounds."""
+    keys = keys_between(a, b, 1000)
+
+    assert len(keys) == 1000
+    assert keys == sorted(keys) and len(set(keys)) == 1000
+    assert a is None or keys[0] > a
+    assert b is None or keys[-1] < b
+    assert max(len(key) for key in keys) <= 4
+
+def test_keys_between_none():
+    """Test that asking for no keys returns an empty list."""
+    assert keys_between("a0", "a1", 0) == []
@@ -0,0 +1,210 @@
+import random
+import sqlite3
+
+import pytest
+
+from music_collection.models.persistent_playlist import MAX_ORDER_KEY_LENGTH, PersistentPlaylistModel
+from music_collection.models.song_model import Song
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "playlist.db")
+
+@pytest.fixture
+def open_models(db_path):
+    """Opens models on the same playlist database, standing in for separate worker processes."""
+    models = []
+
+    def open_model():
+        model = PersistentPlaylistModel(db_path)
+        models.append(model)
+        return model
+
+    yield open_model
+    for model in models:
+        model.store.close()
+
+@pytest.fixture
+def mock_update_play_count(mocker):
+    return mocker.patch("music_collection.models.playlist_model.update_play_count")
+
+def make_songs(count: int) -> list:
+    return [Song(song_id, f"Artist {song_id}", f"Song {song_id}", 2000, "Pop", 100 + song_id)
+            for song_id in range(1, count + 1)]
+
+def stored_song_ids(db_path: str) -> list:
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT song_id FROM playlist_tracks ORDER BY order_key")]
+    finally:
+        conn.close()
+
+
+######################################################
+#
+#    Persistence and sharing
+#
+######################################################
+
+def test_playlist_survives_restart(open_models):
+    """Test that the tracks and cursor are read back by a new model on the same database."""
+    model = open_models()
+    for song in make_songs(3):
+        model.add_song_to_playlist(song)
+    model.go_to_track_number(2)
+    model.store.close()
+
+    restarted = open_models()
+
+    assert [song.id for song in restarted.get_all_songs()] == [1, 2, 3]
+    assert restarted.current_track_number == 2
+    assert restarted.get_current_song().id == 2
+
+def test_changes_are_shared_between_workers(open_models, mock_update_play_count):
+    """Test that each worker sees the others' changes on its next call."""
+    worker1 = open_models()
+    worker2 = open_models()
+
+    for song in make_songs(3):
+        worker1.add_song_to_playlist(song)
+    assert worker2.get_playlist_length() == 3
+
+    worker2.move_song_to_beginning(3)
+    assert [song.id for song in worker1.get_all_songs()] == [3, 1, 2]
+
+    worker1.play_current_song()
+    worker2.play_current_song()
+    assert worker1.current_track_number == 3
+    assert [call.args[0] for call in mock_update_play_count.call_args_list] == [3, 1]
+
+def test_cursor_change_does_not_reload_tracks(open_models, mocker):
+    """Test that moving the shared cursor elsewhere only re-reads the cursor."""
+    worker1 = open_models()
+    worker2 = open_models()
+    for song in make_songs(3):
+        worker1.add_song_to_playlist(song)
+    worker2.get_playlist_length()
+
+    load = mocker.spy(worker2.playlist, "_load")
+    worker1.go_to_track_number(3)
+
+    assert worker2.get_current_song().id == 3
+    load.assert_not_called()
+
+def test_failed_operation_writes_nothing(open_models, db_path):
+    """Test that an operation rejected by validation leaves the stored playlist untouched."""
+    model = open_models()
+    songs = make_songs(2)
+    for song in songs:
+        model.add_song_to_playlist(song)
+
+    with pytest.raises(ValueError, match="already exists in the playlist"):
+        model.add_song_to_playlist(songs[0])
+    with pytest.raises(ValueError, match="Invalid track number: 5"):
+        model.move_song_to_track_number(1, 5)
+
+    assert stored_song_ids(db_path) == [1, 2]
+
+def test_rolled_back_write_reloads_mirror(open_models, db_path):
+    """Test that the mirror is reloaded if a write fails after changing it."""
+    model = open_models()
+    for song in make_songs(2):
+        model.add_song_to_playlist(song)
+
+    with pytest.raises(TypeError):
+        with model.store.write(tracks_changed=True):
+            model.playlist.append(Song(3, "Artist 3", "Song 3", 2000, "Pop", 100))
+            raise TypeError("boom")
+
+    assert [song.id for song in model.get_all_songs()] == [1, 2]
+    assert stored_song_ids(db_path) == [1, 2]
+
+def test_write_inside_read_is_rejected(open_models):
+    """Test that a read cannot be upgraded to a write."""
+    model = open_models()
+
+    with pytest.raises(RuntimeError, match="inside a read"):
+        with model.store.read():
+            model.playlist.append(make_songs(1)[0])
+
+
+######################################################
+#
+#    Stored order
+#
+######################################################
+
+def test_stored_order_matches_mirror(open_models, db_path):
+    """Test that random positional changes keep the stored order identical to the in-memory order."""
+    rng = random.Random(411)
+    model = open_models()
+    songs = make_songs(30)
+    for song in songs[:20]:
+        model.add_song_to_playlist(song)
+    expected = [song.id for song in songs[:20]]
+
+    for _ in range(200):
+        operation = rng.choice(["move", "swap", "remove", "insert"])
+        if operation == "move":
+            song_id = rng.choice(expected)
+            track_number = rng.randint(1, len(expected))
+            model.move_song_to_track_number(song_id, track_number)
+            expected.remove(song_id)
+            expected.insert(track_number - 1, song_id)
+        elif operation == "swap" and len(expected) > 1:
+            first, second = rng.sample(expected, 2)
+            model.swap_songs_in_playlist(first, second)
+            i, j = expected.index(first), expected.index(second)
+            expected[i], expected[j] = expected[j], expected[i]
+        elif operation == "remove" and len(expected) > 1:
+            track_number = rng.randint(1, len(expected))
+            model.remove_song_by_track_number(track_number)
+            del expected[track_number - 1]
+        elif operation == "insert":
+            missing = [song for song in songs if song.id not in expected]
+            if missing:
+                song = rng.choice(missing)
+                model.add_song_to_playlist(song)
+                expected.append(song.id)
+
+    assert [song.id for song in model.get_all_songs()] == expected
+    assert stored_song_ids(db_path) == expected
+    assert [song.id for song in open_models().get_all_songs()] == expected
+
+def stored_order_keys(db_path: str) -> list:
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT order_key FROM playlist_tracks ORDER BY order_key")]
+    finally:
+        conn.close()
+
+def test_reorders_write_one_row(open_models):
+    """Test that moving, inserting and removing a track writes only that track's row."""
+    model = open_models()
+    model.playlist.extend(make_songs(100))
+    conn = model.store._connection()
+
+    for operation in (lambda: model.move_song_to_beginning(100),
+                      lambda: model.move_song_to_track_number(3, 90),
+                      lambda: model.playlist.insert(50, Song(101, "Artist", "Song", 2000, "Pop", 100)),
+                      lambda: model.remove_song_by_track_number(1)):
+        changes_before = conn.total_changes
+        operation()
+        # The track's row, plus the tracks version in playlist_state
+        assert conn.total_changes - changes_before == 2
+
+def test_long_keys_are_rebalanced(open_models, db_path):
+    """Test that inserting repeatedly at the same spot re-keys the neighbourhood instead of growing keys."""
+    model = open_models()
+    model.playlist.extend(make_songs(50))
+    expected = [song.id for song in model.get_all_songs()]
+
+    for song_id in range(51, 551):
+        model.playlist.insert(25, Song(song_id, "Artist", "Song", 2000, "Pop", 100))
+        expected.insert(25, song_id)
+
+    assert [song.id for song in model.get_all_songs()] == expected
+    assert stored_song_ids(db_path) == expected
+    assert model.playlist._keys == stored_order_keys(db_path)
+    assert max(len(key) for key in model.playlist._keys) <= MAX_ORDER_KEY_LENGTH
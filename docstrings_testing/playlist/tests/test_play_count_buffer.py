@@ -0,0 +1,88 @@
+import pytest
+
+from music_collection.models.play_count_buffer import PlayCountBuffer
+
+
+@pytest.fixture
+def mock_flush(mocker):
+    """Mock the batched play count writer."""
+    return mocker.Mock(return_value={})
+
+@pytest.fixture
+def play_count_buffer(mock_flush):
+    """Fixture providing a buffer that is flushed manually."""
+    return PlayCountBuffer(flush_interval=60, flush_threshold=100, flush=mock_flush)
+
+
+##################################################
+# Recording Test Cases
+##################################################
+
+def test_add_collects_pending_plays(play_count_buffer, mock_flush):
+    """Test that plays are aggregated in memory without writing."""
+    play_count_buffer.add(1)
+    play_count_buffer.add(1)
+    play_count_buffer.add_many([2, 3, 2])
+
+    assert play_count_buffer.pending() == {1: 2, 2: 2, 3: 1}
+    mock_flush.assert_not_called()
+
+def test_threshold_triggers_flush(mock_flush):
+    """Test that reaching the threshold flushes the pending plays."""
+    play_count_buffer = PlayCountBuffer(flush_interval=60, flush_threshold=3, flush=mock_flush)
+
+    play_count_buffer.add_many([1, 2])
+    mock_flush.assert_not_called()
+    play_count_buffer.add(1)
+
+    mock_flush.assert_called_once_with({1: 2, 2: 1})
+    assert play_count_buffer.pending() == {}
+
+##################################################
+# Flush Test Cases
+##################################################
+
+def test_flush_writes_once(play_count_buffer, mock_flush):
+    """Test that a flush writes every pending increment in one call."""
+    play_count_buffer.add_many([1, 1, 2])
+
+    play_count_buffer.flush()
+
+    mock_flush.assert_called_once_with({1: 2, 2: 1})
+    assert play_count_buffer.stats()['flushed_plays'] == 3
+
+def test_flush_failure_keeps_pending(play_count_buffer, mock_flush):
+    """Test that increments survive a failed write and are retried."""
+    play_count_buffer.add(1)
+    mock_flush.side_effect = RuntimeError("database is locked")
+
+    with pytest.raises(RuntimeError, match="database is locked"):
+        play_count_buffer.flush()
+
+    assert play_count_buffer.pending() == {1: 1}
+
+def test_stop_flushes_pending(play_count_buffer, mock_flush):
+    """Test that stopping the buffer writes the remaining plays."""
+    play_count_buffer.start()
+    play_count_buffer.add(5)
+
+    play_count_buffer.stop()
+
+    mock_flush.assert_called_once_with({5: 1})
+
+##################################################
+# Leaderboard Merge Test Cases
+##################################################
+
+def test_merge_pending(play_count_buffer):
+    """Test that pending plays are added to database rows and re-sorted."""
+    songs = [
+        {"id": 1, "title": "Song A", "play_count": 10},
+        {"id": 2, "title": "Song B", "play_count": 5},
+    ]
+    play_count_buffer.add(2, count=7)
+
+    merged = play_count_buffer.merge_pending(songs, sort_by_play_count=True)
+
+    assert [(song["id"], song["play_count"]) for song in merged] == [(2, 12), (1, 10)]
+    assert songs[1]["play_count"] == 5, "Expected the original rows to be left unchanged"
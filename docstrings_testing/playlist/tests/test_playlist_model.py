@@ -1,19 +1,36 @@
+from collections import Counter
+import random
+
 import pytest
 
+from music_collection.models.persistent_playlist import PersistentPlaylistModel
 from music_collection.models.playlist_model import PlaylistModel
 from music_collection.models.song_model import Song
 
 
-@pytest.fixture()
-def playlist_model():
-    """Fixture to provide a new instance of PlaylistModel for each test."""
-    return PlaylistModel()
+@pytest.fixture(params=["memory", "blocked", "sqlite"])
+def playlist_model(request, tmp_path):
+    """Fixture to provide a new, empty playlist model for each test, once per backend and storage engine."""
+    if request.param == "memory":
+        yield PlaylistModel(storage="list")
+        return
+    if request.param == "blocked":
+        yield PlaylistModel(storage="blocked")
+        return
+    model = PersistentPlaylistModel(str(tmp_path / "playlist.db"))
+    yield model
+    model.store.close()
 
 @pytest.fixture
 def mock_update_play_count(mocker):
     """Mock the update_play_count function for testing purposes."""
     return mocker.patch("music_collection.models.playlist_model.update_play_count")
 
+@pytest.fixture
+def mock_update_play_counts(mocker):
+    """Mock the batched update_play_counts function for testing purposes."""
+    return mocker.patch("music_collection.models.playlist_model.update_play_counts", return_value={})
+
 """Fixtures providing sample songs for the tests."""
 @pytest.fixture
 def sample_song1():
@@ -181,6 +198,101 @@ def test_get_playlist_duration(playlist_model, sample_playlist):
     playlist_model.playlist.extend(sample_playlist)
     assert playlist_model.get_playlist_duration() == 335, "Expected playlist duration to be 360 seconds"
 
+def test_get_playlist_stats(playlist_model, sample_playlist):
+    """Test getting the playlist aggregates, including the time around the current track."""
+    playlist_model.playlist.extend(sample_playlist)
+    playlist_model.go_to_track_number(2)
+
+    assert playlist_model.get_playlist_stats() == {
+        'length': 2,
+        'duration': 335,
+        'genres': {'Pop': 1, 'Rock': 1},
+        'decades': {2020: 2},
+        'current_track_number': 2,
+        'elapsed_duration': 180,
+        'remaining_duration': 155,
+    }
+
+def test_get_playlist_stats_empty(playlist_model):
+    """Test that an empty playlist has zeroed stats rather than an error."""
+    stats = playlist_model.get_playlist_stats()
+    assert stats['length'] == 0 and stats['duration'] == 0
+    assert stats['genres'] == {} and stats['decades'] == {}
+    assert stats['elapsed_duration'] == 0 and stats['remaining_duration'] == 0
+
+def test_playlist_stats_follow_changes(playlist_model, mock_update_play_count):
+    """Test that random changes keep the stats equal to a full recount, without rescanning the playlist."""
+    rng = random.Random(24)
+    genres = ['Pop', 'Rock', 'Jazz']
+    songs = [Song(song_id, f'Artist {song_id}', f'Song {song_id}', rng.randint(1950, 2024), rng.choice(genres),
+                  rng.randint(60, 600)) for song_id in range(1, 41)]
+    for song in songs[:20]:
+        playlist_model.add_song_to_playlist(song)
+
+    for _ in range(300):
+        operation = rng.choice(['add', 'remove', 'move', 'swap', 'play', 'go'])
+        track_ids = [song.id for song in playlist_model.get_all_songs()]
+        past_end = playlist_model.current_track_number > len(track_ids)
+        if operation == 'add':
+            missing = [song for song in songs if song.id not in track_ids]
+            if missing:
+                playlist_model.add_song_to_playlist(rng.choice(missing))
+        elif operation == 'remove' and len(track_ids) > 2:
+            if rng.random() < 0.5:
+                playlist_model.remove_song_by_song_id(rng.choice(track_ids))
+            else:
+                playlist_model.remove_song_by_track_number(rng.randint(1, len(track_ids)))
+        elif operation == 'move':
+            playlist_model.move_song_to_track_number(rng.choice(track_ids), rng.randint(1, len(track_ids)))
+        elif operation == 'swap' and len(track_ids) > 1:
+            playlist_model.swap_songs_in_playlist(*rng.sample(track_ids, 2))
+        elif operation == 'play' and past_end:
+            with pytest.raises(ValueError, match="Invalid track number"):
+                playlist_model.play_current_song()
+        elif operation == 'play':
+            playlist_model.play_current_song()
+        elif operation == 'go':
+            playlist_model.go_to_track_number(rng.randint(1, len(track_ids)))
+
+        # The operation itself kept the elapsed time current, so reading the stats needs no recount,
+        # unless a removal started with the cursor past the end
+        if not (past_end and operation == 'remove'):
+            assert playlist_model._elapsed_key == (playlist_model.current_track_number, playlist_model.playlist.stats.version)
+
+        tracks = playlist_model.get_all_songs()
+        elapsed = sum(song.duration for song in tracks[:playlist_model.current_track_number - 1])
+        stats = playlist_model.get_playlist_stats()
+        assert stats['length'] == len(tracks)
+        assert stats['duration'] == sum(song.duration for song in tracks)
+        assert stats['genres'] == Counter(song.genre for song in tracks)
+        assert stats['decades'] == Counter(song.year // 10 * 10 for song in tracks)
+        assert stats['elapsed_duration'] == elapsed
+        assert stats['remaining_duration'] == stats['duration'] - elapsed
+
+def test_playlist_stats_cursor_past_end(playlist_model, sample_playlist):
+    """Test that tracks added or removed while the cursor is past the end count toward the elapsed time."""
+    playlist_model.playlist.extend(sample_playlist)
+    playlist_model.go_to_track_number(2)
+    playlist_model.clear_playlist()
+    playlist_model.add_song_to_playlist(Song(10, 'Artist 10', 'Song 10', 2020, 'Pop', 300))
+    playlist_model.add_song_to_playlist(Song(11, 'Artist 11', 'Song 11', 2020, 'Pop', 400))
+
+    stats = playlist_model.get_playlist_stats()
+    assert stats['current_track_number'] == 2
+    assert stats['elapsed_duration'] == 300
+    assert stats['remaining_duration'] == 400
+
+    # Removing a track before the cursor leaves it past the end, covering every track
+    playlist_model.remove_song_by_song_id(10)
+    stats = playlist_model.get_playlist_stats()
+    assert stats['elapsed_duration'] == 400
+    assert stats['remaining_duration'] == 0
+
+    playlist_model.add_song_to_playlist(Song(12, 'Artist 12', 'Song 12', 2020, 'Pop', 500))
+    stats = playlist_model.get_playlist_stats()
+    assert stats['elapsed_duration'] == 400
+    assert stats['remaining_duration'] == 500
+
 ##################################################
 # Utility Function Test Cases
 ##################################################
@@ -283,21 +395,20 @@ def test_go_to_track_number(playlist_model, sample_playlist):
     playlist_model.go_to_track_number(2)
     assert playlist_model.current_track_number == 2, "Expected to be at track 2 after moving song"
 
-def test_play_entire_playlist(playlist_model, sample_playlist, mock_update_play_count):
+def test_play_entire_playlist(playlist_model, sample_playlist, mock_update_play_counts):
     """Test playing the entire playlist."""
     playlist_model.playlist.extend(sample_playlist)
 
-    playlist_model.play_entire_playlist()
+    failures = playlist_model.play_entire_playlist()
 
-    # Check that all play counts were updated
-    mock_update_play_count.assert_any_call(1)
-    mock_update_play_count.assert_any_call(2)
-    assert mock_update_play_count.call_count == len(playlist_model.playlist)
+    # Check that all play counts were updated in a single batch
+    mock_update_play_counts.assert_called_once_with([1, 2])
+    assert failures == {}
 
     # Check that the current track number was updated back to the first song
     assert playlist_model.current_track_number == 1, "Expected to loop back to the beginning of the playlist"
 
-def test_play_rest_of_playlist(playlist_model, sample_playlist, mock_update_play_count):
+def test_play_rest_of_playlist(playlist_model, sample_playlist, mock_update_play_counts):
     """Test playing from the current position to the end of the playlist."""
     playlist_model.playlist.extend(sample_playlist)
     playlist_model.current_track_number = 2
@@ -305,7 +416,28 @@ def test_play_rest_of_playlist(playlist_model, sample_playlist, mock_update_play
     playlist_model.play_rest_of_playlist()
 
     # Check that play counts were updated for the remaining songs
-    mock_update_play_count.assert_any_call(2)
-    assert mock_update_play_count.call_count == 1
+    mock_update_play_counts.assert_called_once_with([2])
+    assert playlist_model.current_track_number == 1, "Expected to loop back to the beginning of the playlist"
+
+def test_play_entire_playlist_reports_failures(playlist_model, sample_playlist, mock_update_play_counts):
+    """Test that songs whose play count could not be updated are reported."""
+    playlist_model.playlist.extend(sample_playlist)
+    mock_update_play_counts.return_value = {2: "Song with ID 2 has been deleted"}
+
+    failures = playlist_model.play_entire_playlist()
+
+    assert failures == {2: "Song with ID 2 has been deleted"}
+    assert playlist_model.current_track_number == 1
+
+def test_play_current_song_write_behind(sample_playlist, mock_update_play_count, mocker):
+    """Test that plays go to the write-behind buffer when one is configured."""
+    play_count_buffer = mocker.Mock()
+    playlist_model = PlaylistModel(play_count_buffer=play_count_buffer)
+    playlist_model.playlist.extend(sample_playlist)
+
+    playlist_model.play_current_song()
+    playlist_model.play_rest_of_playlist()
 
-    assert playlist_model.current_track_number == 1, "Expected to loop back to the beginning of the playlist"
\ No newline at end of file
+    play_count_buffer.add.assert_called_once_with(1)
+    play_count_buffer.add_many.assert_called_once_with([2])
+    mock_update_play_count.assert_not_called()
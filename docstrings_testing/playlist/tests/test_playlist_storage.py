@@ -0,0 +1,184 @@
+from collections import Counter
+import random
+
+import pytest
+
+from music_collection.models.playlist_storage import BlockedSongList, IndexedSongList, make_song_list
+from music_collection.models.song_model import Song
+
+
+@pytest.fixture
+def songs():
+    """Fixture providing five sample songs with IDs 1 through 5."""
+    return [Song(song_id, f'Artist {song_id}', f'Song {song_id}', 2020, 'Pop', 100 + song_id) for song_id in range(1, 6)]
+
+@pytest.fixture(params=[IndexedSongList, BlockedSongList])
+def song_list_type(request):
+    """Fixture providing each song list implementation; blocked lists get tiny blocks so they split and merge."""
+    if request.param is BlockedSongList:
+        return lambda songs=(): BlockedSongList(songs, load=4)
+    return request.param
+
+@pytest.fixture
+def song_list(song_list_type, songs):
+    return song_list_type(songs)
+
+def assert_index_consistent(song_list):
+    """Every song's recorded position must match where it actually is."""
+    index = song_list._positions if isinstance(song_list, IndexedSongList) else song_list._block_of
+    assert len(index) == len(song_list)
+    for index, song in enumerate(song_list):
+        assert song_list.position_of(song.id) == index, f"Song {song.id} indexed at {song_list.position_of(song.id)}, found at {index}"
+
+
+##################################################
+# Index Lookup Test Cases
+##################################################
+
+def test_position_of(song_list):
+    """Test looking up positions by song ID."""
+    assert song_list.position_of(3) == 2
+    assert song_list.position_of(99) is None
+    assert song_list.has_song_id(5)
+    assert not song_list.has_song_id(99)
+
+##################################################
+# Mutation Test Cases
+##################################################
+
+def test_append_and_extend(song_list_type, songs):
+    """Test that appending and extending index the new songs."""
+    song_list = song_list_type()
+    song_list.append(songs[0])
+    song_list.extend(songs[1:])
+    assert_index_consistent(song_list)
+
+def test_extend_partly_filled_block(song_list_type, songs):
+    """Test that extending by fewer songs than the last block has room for counts only the songs added."""
+    song_list = song_list_type()
+    song_list.append(songs[0])
+    song_list.extend(songs[1:2])
+    assert len(song_list) == 2
+    assert song_list[1] == songs[1]
+    with pytest.raises(IndexError):
+        song_list[2]
+    assert_index_consistent(song_list)
+
+def test_insert_and_delete(song_list, songs):
+    """Test that inserting and deleting shift the positions after them."""
+    del song_list[1]
+    assert not song_list.has_song_id(2)
+    song_list.insert(0, songs[1])
+    assert song_list.position_of(2) == 0
+    assert_index_consistent(song_list)
+
+def test_pop_and_remove(song_list, songs):
+    """Test that popping and removing drop songs from the index."""
+    popped = song_list.pop()
+    assert popped.id == 5
+    song_list.remove(songs[0])
+    assert [song.id for song in song_list] == [2, 3, 4]
+    assert_index_consistent(song_list)
+
+def test_clear(song_list):
+    """Test that clearing the list empties the index."""
+    song_list.clear()
+    assert not song_list.has_song_id(1)
+    assert_index_consistent(song_list)
+
+@pytest.mark.parametrize("from_index, to_index, expected", [
+    (4, 0, [5, 1, 2, 3, 4]),
+    (0, 4, [2, 3, 4, 5, 1]),
+    (1, 3, [1, 3, 4, 2, 5]),
+    (2, 2, [1, 2, 3, 4, 5]),
+])
+def test_move(song_list, from_index, to_index, expected):
+    """Test moving a song between positions."""
+    song_list.move(from_index, to_index)
+    assert [song.id for song in song_list] == expected
+    assert_index_consistent(song_list)
+
+def test_swap(song_list):
+    """Test swapping two songs."""
+    song_list.swap(0, 3)
+    assert [song.id for song in song_list] == [4, 2, 3, 1, 5]
+    assert_index_consistent(song_list)
+
+def test_blocked_list_matches_list():
+    """Test that random positional operations on a blocked list give the same order as on a plain list."""
+    rng = random.Random(22)
+    song_list = BlockedSongList(load=8)
+    expected = []
+    next_id = 1
+
+    for _ in range(2000):
+        operation = rng.choice(["insert", "insert", "extend", "delete", "move", "swap", "get"])
+        if operation == "extend":
+            batch = [Song(song_id, f'Artist {song_id}', f'Song {song_id}', 2020, 'Pop', 100)
+                     for song_id in range(next_id, next_id + rng.randint(0, 10))]
+            next_id += len(batch)
+            song_list.extend(batch)
+            expected.extend(batch)
+            assert len(song_list) == len(expected)
+        elif operation == "insert" or not expected:
+            index = rng.randint(-len(expected) - 1, len(expected) + 1)
+            song = Song(next_id, f'Artist {next_id}', f'Song {next_id}', 2020, 'Pop', 100)
+            next_id += 1
+            song_list.insert(index, song)
+            expected.insert(index, song)
+        elif operation == "delete":
+            index = rng.randrange(-len(expected), len(expected))
+            del song_list[index]
+            del expected[index]
+        elif operation == "move":
+            from_index, to_index = rng.randrange(len(expected)), rng.randrange(len(expected))
+            song_list.move(from_index, to_index)
+            expected.insert(to_index, expected.pop(from_index))
+        elif operation == "swap":
+            index1, index2 = rng.randrange(len(expected)), rng.randrange(len(expected))
+            song_list.swap(index1, index2)
+            expected[index1], expected[index2] = expected[index2], expected[index1]
+        else:
+            index = rng.randrange(len(expected))
+            assert song_list[index] == expected[index]
+            assert song_list.position_of(expected[index].id) == index
+
+    assert song_list == expected
+    assert_index_consistent(song_list)
+    assert all(0 < len(block.songs) <= 16 for block in song_list._blocks)
+
+def test_blocked_list_out_of_range(songs):
+    """Test that positional access outside the list raises IndexError."""
+    song_list = BlockedSongList(songs, load=4)
+    with pytest.raises(IndexError):
+        song_list[5]
+    with pytest.raises(IndexError):
+        del song_list[-6]
+
+def test_stats_follow_mutations(song_list, songs):
+    """Test that the running totals match a recount after each kind of change."""
+    def assert_stats_match():
+        assert song_list.stats.count == len(song_list)
+        assert song_list.stats.duration == sum(song.duration for song in song_list)
+        assert song_list.stats.genres == Counter(song.genre for song in song_list)
+        assert song_list.stats.decades == Counter(song.year // 10 * 10 for song in song_list)
+
+    assert_stats_match()
+    del song_list[0]
+    assert_stats_match()
+    song_list[0] = songs[0]
+    assert_stats_match()
+    song_list.insert(2, songs[1])
+    assert_stats_match()
+    version = song_list.stats.version
+    song_list.swap(0, 1)
+    assert song_list.stats.version > version
+    song_list.clear()
+    assert_stats_match()
+
+def test_make_song_list():
+    """Test choosing the storage engine, and rejecting unknown ones."""
+    assert isinstance(make_song_list("list"), IndexedSongList)
+    assert isinstance(make_song_list("blocked"), BlockedSongList)
+    with pytest.raises(ValueError, match="Unknown PLAYLIST_STORAGE: tree"):
+        make_song_list("tree")
@@ -1,50 +1,175 @@
 import pytest
 import requests
 
-from music_collection.utils.random_utils import get_random
+from music_collection.utils import random_utils
+from music_collection.utils.metrics import RANDOM_ORG_FALLBACKS
+from music_collection.utils.random_utils import CircuitBreaker, fetch_random_org, get_random
 
 
 RANDOM_NUMBER = 42
 NUM_SONGS = 100
 
+@pytest.fixture(autouse=True)
+def breaker(mocker):
+    """Give each test a fresh circuit breaker that never treats a mocked call as slow."""
+    fresh = CircuitBreaker(failure_threshold=3, slow_seconds=60, reset_seconds=30)
+    mocker.patch("music_collection.utils.random_utils.random_org_breaker", fresh)
+    return fresh
+
+@pytest.fixture
+def mock_session(mocker):
+    # Patch the pooled session; its get() returns a mock response
+    session = mocker.Mock()
+    mocker.patch("music_collection.utils.random_utils._get_session", return_value=session)
+    return session
+
 @pytest.fixture
-def mock_random_org(mocker):
-    # Patch the requests.get call
-    # requests.get returns an object, which we have replaced with a mock object
+def mock_random_org(mock_session, mocker):
+    # The mock response gets a text attribute like a real requests.Response
     mock_response = mocker.Mock()
-    # We are giving that object a text attribute
     mock_response.text = f"{RANDOM_NUMBER}"
-    mocker.patch("requests.get", return_value=mock_response)
+    mock_session.get.return_value = mock_response
     return mock_response
 
 
-def test_get_random(mock_random_org):
+def test_get_random(mock_random_org, mock_session):
     """Test retrieving a random number from random.org."""
     result = get_random(NUM_SONGS)
 
     # Assert that the result is the mocked random number
     assert result == RANDOM_NUMBER, f"Expected random number {RANDOM_NUMBER}, but got {result}"
 
-    # Ensure that the correct URL was called
-    requests.get.assert_called_once_with("https://www.random.org/integers/?num=1&min=1&max=100&col=1&base=10&format=plain&rnd=new", timeout=5)
+    # Ensure that the correct URL was called through the session
+    mock_session.get.assert_called_once_with("https://www.random.org/integers/?num=1&min=1&max=100&col=1&base=10&format=plain&rnd=new", timeout=5)
 
-def test_get_random_request_failure(mocker):
+def test_fetch_random_org_request_failure(mock_session):
     """Simulate  a request failure."""
-    mocker.patch("requests.get", side_effect=requests.exceptions.RequestException("Connection error"))
+    mock_session.get.side_effect = requests.exceptions.RequestException("Connection error")
 
     with pytest.raises(RuntimeError, match="Request to random.org failed: Connection error"):
-        get_random(NUM_SONGS)
+        fetch_random_org(NUM_SONGS)
 
-def test_get_random_timeout(mocker):
+def test_fetch_random_org_timeout(mock_session):
     """Simulate  a timeout."""
-    mocker.patch("requests.get", side_effect=requests.exceptions.Timeout)
+    mock_session.get.side_effect = requests.exceptions.Timeout
 
     with pytest.raises(RuntimeError, match="Request to random.org timed out."):
-        get_random(NUM_SONGS)
+        fetch_random_org(NUM_SONGS)
 
-def test_get_random_invalid_response(mock_random_org):
+def test_fetch_random_org_invalid_response(mock_random_org):
     """Simulate  an invalid response (non-digit)."""
     mock_random_org.text = "invalid_response"
 
     with pytest.raises(ValueError, match="Invalid response from random.org: invalid_response"):
-        get_random(NUM_SONGS)
\ No newline at end of file
+        fetch_random_org(NUM_SONGS)
+
+def test_session_is_reused(mocker):
+    """Test that consecutive calls share one pooled session, and a forked process gets its own."""
+    mocker.patch.object(random_utils, "_session", None)
+    mocker.patch.object(random_utils, "_session_pid", None)
+    session = random_utils._get_session()
+
+    assert random_utils._get_session() is session
+    assert session.get_adapter("https://www.random.org")._pool_maxsize == random_utils.RANDOM_ORG_POOL_SIZE
+
+    mocker.patch("os.getpid", return_value=-1)
+    assert random_utils._get_session() is not session
+
+
+##################################################
+# Fallback and circuit breaker
+##################################################
+
+def test_get_random_falls_back_on_failure(mock_session):
+    """Test that a failed request is answered locally instead of raising."""
+    mock_session.get.side_effect = requests.exceptions.Timeout
+    before = RANDOM_ORG_FALLBACKS.value("error")
+
+    assert 1 <= get_random(NUM_SONGS) <= NUM_SONGS
+    assert RANDOM_ORG_FALLBACKS.value("error") == before + 1
+
+def test_get_random_falls_back_on_invalid_response(mock_random_org):
+    """Test that non-numeric and out-of-range answers are replaced with local numbers."""
+    mock_random_org.text = "invalid_response"
+    assert 1 <= get_random(NUM_SONGS) <= NUM_SONGS
+
+    mock_random_org.text = f"{NUM_SONGS + 1}"
+    assert 1 <= get_random(NUM_SONGS) <= NUM_SONGS
+
+def test_breaker_opens_after_repeated_failures(mock_session, breaker):
+    """Test that random.org is not called while the breaker is open."""
+    mock_session.get.side_effect = requests.exceptions.RequestException("Connection error")
+    before = RANDOM_ORG_FALLBACKS.value("circuit_open")
+
+    for _ in range(breaker.failure_threshold):
+        get_random(NUM_SONGS)
+    assert breaker.state == "open"
+
+    mock_session.get.reset_mock()
+    for _ in range(5):
+        assert 1 <= get_random(NUM_SONGS) <= NUM_SONGS
+    mock_session.get.assert_not_called()
+    assert RANDOM_ORG_FALLBACKS.value("circuit_open") == before + 5
+    assert breaker.stats() == {'state': 'open', 'consecutive_failures': 3, 'times_opened': 1, 'rejected_calls': 5}
+
+def test_breaker_counts_slow_calls_as_failures():
+    """Test that calls over the slow limit open the breaker even though they succeed."""
+    breaker = CircuitBreaker(failure_threshold=2, slow_seconds=0.5, reset_seconds=30)
+
+    breaker.record_success(1.0)
+    assert breaker.state == "closed"
+    breaker.record_success(1.0)
+    assert breaker.state == "open"
+
+def test_breaker_success_resets_failure_count():
+    """Test that only consecutive failures open the breaker."""
+    breaker = CircuitBreaker(failure_threshold=2, slow_seconds=1, reset_seconds=30)
+
+    breaker.record_failure()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+def test_breaker_half_open_trial(mocker):
+    """Test that one trial call is allowed after the reset time, and its outcome decides the state."""
+    clock = mocker.patch("music_collection.utils.random_utils.time.monotonic", return_value=100.0)
+    breaker = CircuitBreaker(failure_threshold=1, slow_seconds=1, reset_seconds=30)
+
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.return_value = 131.0
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow(), "Only one trial call should run at a time"
+
+    # A failed trial reopens the breaker for another reset period
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.return_value = 162.0
+    assert breaker.allow()
+    breaker.record_success(0.1)
+    assert breaker.state == "closed"
+    assert breaker.allow()
+    assert breaker.stats()['times_opened'] == 1
+
+def test_get_random_unexpected_error_ends_trial(mocker, mock_session, breaker):
+    """Test that an unexpected error in a half-open trial reopens the breaker instead of blocking it for good."""
+    clock = mocker.patch("music_collection.utils.random_utils.time.monotonic", return_value=100.0)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    clock.return_value = 131.0
+    mock_session.get.side_effect = KeyError("boom")
+    with pytest.raises(KeyError):
+        get_random(NUM_SONGS)
+    assert breaker.state == "open"
+
+    clock.return_value = 162.0
+    assert breaker.allow(), "The next trial call should be let through"
+
+def test_breaker_invalid_threshold():
+    """Test that a breaker needs at least one failure to open."""
+    with pytest.raises(ValueError, match="Failure threshold must be at least 1, got 0"):
+        CircuitBreaker(failure_threshold=0)
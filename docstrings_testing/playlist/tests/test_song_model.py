@@ -1,6 +1,7 @@
 from contextlib import contextmanager
 import re
 import sqlite3
+import threading
 
 import pytest
 
@@ -12,8 +13,16 @@ from music_collection.models.song_model import (
     get_song_by_compound_key,
     get_all_songs,
     get_random_song,
-    update_play_count
+    get_songs_page,
+    import_songs,
+    invalidate_live_song_ids,
+    iter_all_songs,
+    update_play_count,
+    update_play_counts,
+    _discard_live_song_id
 )
+from music_collection.utils.migrations import migrate
+from music_collection.utils.sql_utils import get_db_connection
 
 ######################################################
 #
@@ -45,6 +54,13 @@ def mock_cursor(mocker):
 
     return mock_cursor  # Return the mock cursor so we can set expectations per test
 
+@pytest.fixture(autouse=True)
+def reset_live_song_ids():
+    """Make sure no cached song ids leak between tests."""
+    invalidate_live_song_ids()
+    yield
+    invalidate_live_song_ids()
+
 ######################################################
 #
 #    Add and delete
@@ -106,42 +122,106 @@ def test_create_song_invalid_year():
     with pytest.raises(ValueError, match="Invalid year provided: invalid \(must be an integer greater than or equal to 1900\)."):
         create_song(artist="Artist Name", title="Song Title", year="invalid", genre="Pop", duration=180)
 
+def test_import_songs(mock_cursor):
+    """Test bulk importing songs in chunked transactions."""
+    mock_cursor.rowcount = 2
+    records = [
+        (1, {"artist": "Artist A", "title": "Song A", "year": "2020", "genre": "Rock", "duration": "210"}),
+        (2, {"artist": "Artist B", "title": "Song B", "year": 2021, "genre": "Pop", "duration": 180}),
+    ]
+
+    summary = import_songs(records, chunk_size=10)
+
+    assert summary == {'rows': 2, 'inserted': 2, 'duplicates': 0, 'invalid': 0, 'issues': [], 'issues_truncated': False}
+
+    expected_query = normalize_whitespace("""
+        SELECT artist, title, year FROM songs WHERE (artist, title, year) IN (VALUES (?, ?, ?), (?, ?, ?))
+    """)
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == ["Artist A", "Song A", 2020, "Artist B", "Song B", 2021]
+
+    expected_insert = normalize_whitespace("""
+        INSERT INTO songs (artist, title, year, genre, duration)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(artist, title, year) DO NOTHING
+    """)
+    assert normalize_whitespace(mock_cursor.executemany.call_args[0][0]) == expected_insert
+    assert mock_cursor.executemany.call_args[0][1] == [
+        ("Artist A", "Song A", 2020, "Rock", 210),
+        ("Artist B", "Song B", 2021, "Pop", 180),
+    ]
+
+def test_import_songs_reports_duplicates(mock_cursor):
+    """Test that existing songs and repeated rows are reported without aborting the import."""
+    mock_cursor.fetchall.return_value = [("Artist A", "Song A", 2020)]
+    mock_cursor.rowcount = 1
+    song_a = {"artist": "Artist A", "title": "Song A", "year": 2020, "genre": "Rock", "duration": 210}
+    song_b = {"artist": "Artist B", "title": "Song B", "year": 2021, "genre": "Pop", "duration": 180}
+
+    summary = import_songs([(1, song_a), (2, song_b), (3, song_b)])
+
+    assert summary['inserted'] == 1
+    assert summary['duplicates'] == 2
+    assert [issue['row'] for issue in summary['issues']] == [1, 3]
+    assert mock_cursor.executemany.call_args[0][1] == [("Artist B", "Song B", 2021, "Pop", 180)]
+
+def test_import_songs_reports_invalid_rows(mock_cursor):
+    """Test that rows failing the Song rules or parsing are reported and skipped."""
+    records = [
+        (1, {"artist": "Artist A", "title": "Song A", "year": 1800, "genre": "Rock", "duration": 210}),
+        (2, {"artist": "Artist B", "title": "Song B", "year": 2021, "genre": "Pop", "duration": "long"}),
+        (3, {"artist": "", "title": "Song C", "year": 2021, "genre": "Pop", "duration": 10}),
+        (4, ValueError("Invalid JSON")),
+    ]
+
+    summary = import_songs(records)
+
+    assert summary['invalid'] == 4
+    assert summary['issues'] == [
+        {'row': 1, 'error': "Year must be greater than 1900, got 1800"},
+        {'row': 2, 'error': "Missing or invalid duration"},
+        {'row': 3, 'error': "Missing or invalid artist"},
+        {'row': 4, 'error': "Invalid JSON"},
+    ]
+    mock_cursor.executemany.assert_not_called()
+
+def test_import_songs_commits_per_chunk(mock_cursor):
+    """Test that each chunk is inserted and committed separately."""
+    mock_cursor.rowcount = 2
+    records = [
+        (n, {"artist": "Artist", "title": f"Song {n}", "year": 2020, "genre": "Rock", "duration": 100})
+        for n in range(1, 6)
+    ]
+
+    import_songs(records, chunk_size=2)
+
+    assert mock_cursor.executemany.call_count == 3
+
+
 def test_delete_song(mock_cursor):
     """Test soft deleting a song from the catalog by song ID."""
 
-    # Simulate that the song exists (id = 1)
-    mock_cursor.fetchone.return_value = ([False])
+    # Simulate that the conditional update matched the live song (id = 1)
+    mock_cursor.fetchone.return_value = (1,)
 
     # Call the delete_song function
     delete_song(1)
 
-    # Normalize the SQL for both queries (SELECT and UPDATE)
-    expected_select_sql = normalize_whitespace("SELECT deleted FROM songs WHERE id = ?")
-    expected_update_sql = normalize_whitespace("UPDATE songs SET deleted = TRUE WHERE id = ?")
-
-    # Access both calls to `execute()` using `call_args_list`
-    actual_select_sql = normalize_whitespace(mock_cursor.execute.call_args_list[0][0][0])
-    actual_update_sql = normalize_whitespace(mock_cursor.execute.call_args_list[1][0][0])
-
-    # Ensure the correct SQL queries were executed
-    assert actual_select_sql == expected_select_sql, "The SELECT query did not match the expected structure."
+    # Ensure the song was marked deleted in a single conditional statement
+    expected_update_sql = normalize_whitespace("UPDATE songs SET deleted = TRUE WHERE id = ? AND deleted = FALSE RETURNING id")
+    actual_update_sql = normalize_whitespace(mock_cursor.execute.call_args[0][0])
     assert actual_update_sql == expected_update_sql, "The UPDATE query did not match the expected structure."
 
-    # Ensure the correct arguments were used in both SQL queries
-    expected_select_args = (1,)
-    expected_update_args = (1,)
-
-    actual_select_args = mock_cursor.execute.call_args_list[0][0][1]
-    actual_update_args = mock_cursor.execute.call_args_list[1][0][1]
-
-    assert actual_select_args == expected_select_args, f"The SELECT query arguments did not match. Expected {expected_select_args}, got {actual_select_args}."
-    assert actual_update_args == expected_update_args, f"The UPDATE query arguments did not match. Expected {expected_update_args}, got {actual_update_args}."
+    # Ensure the correct arguments were used and no existence check was needed
+    actual_update_args = mock_cursor.execute.call_args[0][1]
+    assert actual_update_args == (1,), f"The UPDATE query arguments did not match. Expected (1,), got {actual_update_args}."
+    assert mock_cursor.execute.call_count == 1
 
 def test_delete_song_bad_id(mock_cursor):
     """Test error when trying to delete a non-existent song."""
 
-    # Simulate that no song exists with the given ID
-    mock_cursor.fetchone.return_value = None
+    # Simulate that the update matched nothing and no song exists with the given ID
+    mock_cursor.fetchone.side_effect = [None, None]
 
     # Expect a ValueError when attempting to delete a non-existent song
     with pytest.raises(ValueError, match="Song with ID 999 not found"):
@@ -150,13 +230,16 @@ def test_delete_song_bad_id(mock_cursor):
 def test_delete_song_already_deleted(mock_cursor):
     """Test error when trying to delete a song that's already marked as deleted."""
 
-    # Simulate that the song exists but is already marked as deleted
-    mock_cursor.fetchone.return_value = ([True])
+    # Simulate that the update matched nothing because the song is already deleted
+    mock_cursor.fetchone.side_effect = [None, (True,)]
 
     # Expect a ValueError when attempting to delete a song that's already been deleted
     with pytest.raises(ValueError, match="Song with ID 999 has already been deleted"):
         delete_song(999)
 
+    # Ensure the miss was explained by looking the song up
+    mock_cursor.execute.assert_called_with("SELECT deleted FROM songs WHERE id = ?", (999,))
+
 ######################################################
 #
 #    Get Song
@@ -257,6 +340,83 @@ def test_get_all_songs(mock_cursor):
 
     assert actual_query == expected_query, "The SQL query did not match the expected structure."
 
+def test_get_songs_page(mock_cursor):
+    """Test retrieving a page of songs after a given id."""
+    mock_cursor.fetchall.return_value = [
+        (11, "Artist A", "Song A", 2020, "Rock", 210, 10),
+        (12, "Artist B", "Song B", 2021, "Pop", 180, 20)
+    ]
+
+    songs = get_songs_page(limit=2, after_id=10)
+
+    assert [song["id"] for song in songs] == [11, 12]
+    assert songs[0]["play_count"] == 10
+
+    expected_query = normalize_whitespace("""
+        SELECT id, artist, title, year, genre, duration, play_count
+        FROM songs
+        WHERE deleted = FALSE AND id > ? ORDER BY id LIMIT ?
+    """)
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+
+    assert actual_query == expected_query, "The SQL query did not match the expected structure."
+    assert mock_cursor.execute.call_args[0][1] == [10, 2]
+
+def test_get_songs_page_sorted_by_play_count(mock_cursor):
+    """Test that the sorted mode pages on the (play_count, id) keyset."""
+    get_songs_page(limit=50, after_id=7, after_play_count=30, sort_by_play_count=True)
+
+    expected_query = normalize_whitespace("""
+        SELECT id, artist, title, year, genre, duration, play_count
+        FROM songs
+        WHERE deleted = FALSE AND play_count <= ? AND (play_count < ? OR id > ?)
+        ORDER BY play_count DESC, id LIMIT ?
+    """)
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+
+    assert actual_query == expected_query, "The SQL query did not match the expected structure."
+    assert mock_cursor.execute.call_args[0][1] == [30, 30, 7, 50]
+
+def test_get_songs_page_first_page(mock_cursor):
+    """Test that the first page has no keyset condition."""
+    get_songs_page(limit=5)
+
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+
+    assert actual_query.endswith("WHERE deleted = FALSE ORDER BY id LIMIT ?")
+    assert mock_cursor.execute.call_args[0][1] == [5]
+
+@pytest.mark.parametrize("kwargs", [
+    {"limit": 0},
+    {"limit": 100000},
+    {"after_id": 3, "after_play_count": 10},
+    {"after_id": 3, "sort_by_play_count": True},
+])
+def test_get_songs_page_invalid(mock_cursor, kwargs):
+    """Test that out-of-range limits and incomplete keysets are rejected."""
+    with pytest.raises(ValueError):
+        get_songs_page(**kwargs)
+
+    mock_cursor.execute.assert_not_called()
+
+def test_iter_all_songs(mock_cursor):
+    """Test that streaming fetches rows in chunks until the cursor is exhausted."""
+    mock_cursor.fetchmany.side_effect = [
+        [(1, "Artist A", "Song A", 2020, "Rock", 210, 10), (2, "Artist B", "Song B", 2021, "Pop", 180, 20)],
+        [(3, "Artist C", "Song C", 2022, "Jazz", 200, 5)],
+        []
+    ]
+
+    songs = list(iter_all_songs(chunk_size=2))
+
+    assert [song["id"] for song in songs] == [1, 2, 3]
+    assert mock_cursor.fetchmany.call_count == 3
+    mock_cursor.fetchmany.assert_called_with(2)
+    mock_cursor.fetchall.assert_not_called()
+
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert actual_query.endswith("WHERE deleted = FALSE ORDER BY id")
+
 def test_get_all_songs_empty_catalog(mock_cursor, caplog):
     """Test that retrieving all songs returns an empty list when the catalog is empty and logs a warning."""
 
@@ -316,11 +476,8 @@ def test_get_random_song(mock_cursor, mocker):
     """Test retrieving a random song from the catalog."""
 
     # Simulate that there are multiple songs in the database
-    mock_cursor.fetchall.return_value = [
-        (1, "Artist A", "Song A", 2020, "Rock", 210, 10),
-        (2, "Artist B", "Song B", 2021, "Pop", 180, 20),
-        (3, "Artist C", "Song C", 2022, "Jazz", 200, 5)
-    ]
+    mock_cursor.fetchall.return_value = [(1,), (2,), (3,)]
+    mock_cursor.fetchone.return_value = (2, "Artist B", "Song B", 2021, "Pop", 180, False)
 
     # Mock random number generation to return the 2nd song
     mock_random = mocker.patch("music_collection.models.song_model.get_random", return_value=2)
@@ -328,7 +485,7 @@ def test_get_random_song(mock_cursor, mocker):
     # Call the get_random_song method
     result = get_random_song()
 
-    # Expected result based on the mock random number and fetchall return value
+    # Expected result based on the mock random number and fetchone return value
     expected_result = Song(2, "Artist B", "Song B", 2021, "Pop", 180)
 
     # Ensure the result matches the expected output
@@ -337,28 +494,75 @@ def test_get_random_song(mock_cursor, mocker):
     # Ensure that the random number was called with the correct number of songs
     mock_random.assert_called_once_with(3)
 
-    # Ensure the SQL query was executed correctly
-    expected_query = normalize_whitespace("SELECT id, artist, title, year, genre, duration, play_count FROM songs WHERE deleted = FALSE")
-    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    # Ensure only the ids were listed and only the chosen row was read
+    expected_ids_query = normalize_whitespace("SELECT id FROM songs WHERE deleted = FALSE ORDER BY id")
+    actual_ids_query = normalize_whitespace(mock_cursor.execute.call_args_list[0][0][0])
+    assert actual_ids_query == expected_ids_query, "The id query did not match the expected structure."
 
-    # Assert that the SQL query was correct
+    expected_query = normalize_whitespace("SELECT id, artist, title, year, genre, duration, deleted FROM songs WHERE id = ?")
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
     assert actual_query == expected_query, "The SQL query did not match the expected structure."
+    assert mock_cursor.execute.call_args[0][1] == (2,)
+
+def test_get_random_song_reuses_cached_ids(mock_cursor, mocker):
+    """Test that consecutive random picks do not reload the song ids."""
+
+    mock_cursor.fetchall.return_value = [(1,), (2,), (3,)]
+    mock_cursor.fetchone.return_value = (1, "Artist A", "Song A", 2020, "Rock", 210, False)
+    mocker.patch("music_collection.models.song_model.get_random", return_value=1)
+
+    get_random_song()
+    get_random_song()
+
+    assert mock_cursor.fetchall.call_count == 1, "Expected the song ids to be loaded once"
+
+def test_get_random_song_stale_id(mock_cursor, mocker):
+    """Test that a pick of a song deleted elsewhere reloads the ids and retries."""
+
+    mock_cursor.fetchall.side_effect = [[(1,), (2,)], [(1,)]]
+    mock_cursor.fetchone.side_effect = [
+        (2, "Artist B", "Song B", 2021, "Pop", 180, True),
+        (1, "Artist A", "Song A", 2020, "Rock", 210, False),
+    ]
+    mocker.patch("music_collection.models.song_model.get_random", side_effect=[2, 1])
+
+    result = get_random_song()
+
+    assert result == Song(1, "Artist A", "Song A", 2020, "Rock", 210)
+    assert mock_cursor.fetchall.call_count == 2, "Expected the song ids to be reloaded once"
+
+def test_get_random_song_concurrent_delete(mock_cursor, mocker):
+    """Test that a delete between drawing the index and reading the id does not shift the picked list."""
+
+    mock_cursor.fetchall.return_value = [(1,), (2,), (3,)]
+    mock_cursor.fetchone.return_value = (3, "Artist C", "Song C", 2022, "Jazz", 200, False)
+
+    def draw_during_delete(num_songs):
+        # Another thread deletes a song after the pick has taken the list length
+        _discard_live_song_id(1)
+        return num_songs
+
+    mocker.patch("music_collection.models.song_model.get_random", side_effect=draw_during_delete)
+
+    assert get_random_song() == Song(3, "Artist C", "Song C", 2022, "Jazz", 200)
+    assert mock_cursor.execute.call_args[0][1] == (3,)
 
 def test_get_random_song_empty_catalog(mock_cursor, mocker):
     """Test retrieving a random song when the catalog is empty."""
 
     # Simulate that the catalog is empty
     mock_cursor.fetchall.return_value = []
+    mock_random = mocker.patch("music_collection.models.song_model.get_random")
 
     # Expect a ValueError to be raised when calling get_random_song with an empty catalog
     with pytest.raises(ValueError, match="The song catalog is empty"):
         get_random_song()
 
     # Ensure that the random number was not called since there are no songs
-    mocker.patch("music_collection.models.song_model.get_random").assert_not_called()
+    mock_random.assert_not_called()
 
     # Ensure the SQL query was executed correctly
-    expected_query = normalize_whitespace("SELECT id, artist, title, year, genre, duration, play_count FROM songs WHERE deleted = FALSE")
+    expected_query = normalize_whitespace("SELECT id FROM songs WHERE deleted = FALSE ORDER BY id")
     actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
 
     # Assert that the SQL query was correct
@@ -367,8 +571,8 @@ def test_get_random_song_empty_catalog(mock_cursor, mocker):
 def test_update_play_count(mock_cursor):
     """Test updating the play count of a song."""
 
-    # Simulate that the song exists and is not deleted (id = 1)
-    mock_cursor.fetchone.return_value = [False]
+    # Simulate that the conditional update matched the live song (id = 1)
+    mock_cursor.fetchone.return_value = (1,)
 
     # Call the update_play_count function with a sample song ID
     song_id = 1
@@ -376,32 +580,146 @@ def test_update_play_count(mock_cursor):
 
     # Normalize the expected SQL query
     expected_query = normalize_whitespace("""
-        UPDATE songs SET play_count = play_count + 1 WHERE id = ?
+        UPDATE songs SET play_count = play_count + 1 WHERE id = ? AND deleted = FALSE RETURNING id
     """)
 
     # Ensure the SQL query was executed correctly
-    actual_query = normalize_whitespace(mock_cursor.execute.call_args_list[1][0][0])
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
 
     # Assert that the SQL query was correct
     assert actual_query == expected_query, "The SQL query did not match the expected structure."
 
     # Extract the arguments used in the SQL call
-    actual_arguments = mock_cursor.execute.call_args_list[1][0][1]
+    actual_arguments = mock_cursor.execute.call_args[0][1]
 
     # Assert that the SQL query was executed with the correct arguments (song ID)
     expected_arguments = (song_id,)
     assert actual_arguments == expected_arguments, f"The SQL query arguments did not match. Expected {expected_arguments}, got {actual_arguments}."
+    assert mock_cursor.execute.call_count == 1
 
 ### Test for Updating a Deleted Song:
 def test_update_play_count_deleted_song(mock_cursor):
     """Test error when trying to update play count for a deleted song."""
 
-    # Simulate that the song exists but is marked as deleted (id = 1)
-    mock_cursor.fetchone.return_value = [True]
+    # Simulate that the update matched nothing because the song is deleted (id = 1)
+    mock_cursor.fetchone.side_effect = [None, (True,)]
 
     # Expect a ValueError when attempting to update a deleted song
     with pytest.raises(ValueError, match="Song with ID 1 has been deleted"):
         update_play_count(1)
 
-    # Ensure that no SQL query for updating play count was executed
-    mock_cursor.execute.assert_called_once_with("SELECT deleted FROM songs WHERE id = ?", (1,))
+    # Ensure the miss was explained by looking the song up
+    mock_cursor.execute.assert_called_with("SELECT deleted FROM songs WHERE id = ?", (1,))
+
+def test_update_play_count_missing_song(mock_cursor):
+    """Test error when trying to update play count for a song that does not exist."""
+
+    mock_cursor.fetchone.side_effect = [None, None]
+
+    with pytest.raises(ValueError, match="Song with ID 1 not found"):
+        update_play_count(1)
+
+def test_update_play_counts(mock_cursor):
+    """Test updating the play counts of several songs in one batch."""
+
+    # Simulate that songs 1 and 2 exist and are not deleted
+    mock_cursor.fetchall.return_value = [(1, False), (2, False)]
+
+    failures = update_play_counts([1, 2, 1])
+
+    assert failures == {}, f"Expected no failures, got {failures}"
+
+    # Ensure existence was checked with a single set-based query
+    expected_select = normalize_whitespace("SELECT id, deleted FROM songs WHERE id IN (?, ?)")
+    actual_select = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert actual_select == expected_select, "The SELECT query did not match the expected structure."
+    assert mock_cursor.execute.call_args[0][1] == [1, 2]
+
+    # Ensure repeated songs were aggregated into one increment each
+    assert mock_cursor.execute.call_args_list[0][0][0] == "BEGIN IMMEDIATE", "Expected the check to run under the write lock"
+    expected_update = normalize_whitespace("UPDATE songs SET play_count = play_count + ? WHERE id = ? AND deleted = FALSE")
+    actual_update = normalize_whitespace(mock_cursor.executemany.call_args[0][0])
+    assert actual_update == expected_update, "The UPDATE query did not match the expected structure."
+    assert mock_cursor.executemany.call_args[0][1] == [(2, 1), (1, 2)]
+
+def test_update_play_counts_reports_failures(mock_cursor):
+    """Test that missing and deleted songs are reported without aborting the batch."""
+
+    # Simulate that song 1 exists, song 2 is deleted and song 3 is missing
+    mock_cursor.fetchall.return_value = [(1, False), (2, True)]
+
+    failures = update_play_counts([1, 2, 3])
+
+    assert failures == {
+        2: "Song with ID 2 has been deleted",
+        3: "Song with ID 3 not found",
+    }
+    assert mock_cursor.executemany.call_args[0][1] == [(1, 1)], "Expected only song 1 to be updated"
+
+def test_update_play_counts_concurrent_delete(tmp_path, mocker):
+    """Test that a song cannot be deleted between the batch checking it and counting its plays."""
+    db_path = str(tmp_path / "song_catalog.db")
+    migrate(db_path)
+    mocker.patch("music_collection.utils.sql_utils.DB_PATH", db_path)
+    create_song("Artist A", "Song A", 2020, "Pop", 180)
+    create_song("Artist B", "Song B", 2021, "Rock", 200)
+
+    deleter = threading.Thread(target=delete_song, args=(1,))
+    delete_waited = []
+
+    def delete_after_check(statement):
+        # Another worker deletes song 1 once the batch has checked it and starts writing
+        if statement.startswith("UPDATE songs SET play_count") and deleter.ident is None:
+            deleter.start()
+            deleter.join(0.2)
+            delete_waited.append(deleter.is_alive())
+
+    @contextmanager
+    def traced_connection():
+        with get_db_connection() as conn:
+            conn.set_trace_callback(delete_after_check)
+            yield conn
+
+    mocker.patch("music_collection.models.song_model.get_db_connection", traced_connection)
+    failures = update_play_counts([1, 2])
+    deleter.join()
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT id, play_count, deleted FROM songs ORDER BY id").fetchall()
+    conn.close()
+    # The delete waits for the batch that had already checked the song, and then goes through
+    assert delete_waited == [True], "The delete landed between the check and the writes"
+    assert failures == {}
+    assert rows == [(1, 1, True), (2, 1, False)]
+
+def test_update_play_counts_empty(mock_cursor):
+    """Test that an empty batch does not touch the database."""
+    assert update_play_counts([]) == {}
+    mock_cursor.execute.assert_not_called()
+
+######################################################
+#
+#    Song records
+#
+######################################################
+
+def test_song_validates_fields():
+    """Test that building a song directly still validates year and duration."""
+    with pytest.raises(ValueError, match="Duration must be greater than 0"):
+        Song(1, "Artist", "Title", 2000, "Pop", 0)
+    with pytest.raises(ValueError, match="Year must be greater than 1900"):
+        Song(1, "Artist", "Title", 1900, "Pop", 100)
+
+def test_song_from_row():
+    """Test that a trusted row builds an equal song, and that songs carry no per-instance dict."""
+    song = Song.from_row((1, "Artist", "Title", 2000, "Pop", 100))
+
+    assert song == Song(1, "Artist", "Title", 2000, "Pop", 100)
+    assert not hasattr(song, "__dict__")
+    with pytest.raises(AttributeError):
+        song.album = "Album"
+
+def test_song_to_dict():
+    """Test serializing a song to a dictionary."""
+    song = Song(1, "Artist", "Title", 2000, "Pop", 100)
+    assert song.to_dict() == {"id": 1, "artist": "Artist", "title": "Title", "year": 2000, "genre": "Pop", "duration": 100}
@@ -0,0 +1,98 @@
+import logging
+import sqlite3
+
+import pytest
+
+from music_collection.utils import sql_trace
+from music_collection.utils.sql_trace import (
+    StatementStats,
+    TracingConnection,
+    get_sql_trace_stats,
+    reset_sql_trace_stats,
+    statement_template
+)
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture
+def traced_conn():
+    """An in-memory database opened through the tracing connection class."""
+    reset_sql_trace_stats()
+    conn = sqlite3.connect(":memory:", factory=TracingConnection)
+    conn.execute("CREATE TABLE meals (id INTEGER PRIMARY KEY, meal TEXT UNIQUE)")
+    yield conn
+    conn.close()
+    reset_sql_trace_stats()
+
+######################################################
+#
+#    Templates and stats
+#
+######################################################
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT id\n   FROM meals\n  WHERE id = ?", "SELECT id FROM meals WHERE id = ?"),
+    ("SELECT id FROM meals WHERE meal IN (?, ?, ?)", "SELECT id FROM meals WHERE meal IN (?...)"),
+    ("SELECT id FROM meals WHERE meal IN (?)", "SELECT id FROM meals WHERE meal IN (?...)"),
+    ("INSERT INTO meals (meal) VALUES (?)", "INSERT INTO meals (meal) VALUES (?)"),
+    ("SELECT 1 WHERE (a, b) IN (VALUES (?, ?), (?, ?))", "SELECT 1 WHERE (a, b) IN (VALUES (?...)...)"),
+])
+def test_statement_template(sql, expected):
+    """Test that variants of the same statement share a template."""
+    assert statement_template(sql) == expected
+
+def test_statement_stats_percentile():
+    """Test that p99 is taken from the sampled durations."""
+    stats = StatementStats(samples=100)
+    for ms in range(1, 101):
+        stats.record(ms / 1000, slow=False)
+
+    assert stats.count == 100
+    assert stats.percentile(0.99) == pytest.approx(0.099)
+    assert stats.percentile(0.5) == pytest.approx(0.050)
+
+def test_statement_stats_bounded():
+    """Test that only the most recent durations are sampled."""
+    stats = StatementStats(samples=10)
+    for _ in range(1000):
+        stats.record(0.001, slow=False)
+
+    assert stats.count == 1000
+    assert len(stats._samples) == 10
+
+######################################################
+#
+#    Tracing connection
+#
+######################################################
+
+def test_tracing_connection_aggregates(traced_conn):
+    """Test that statements run through cursors and connection shortcuts are aggregated by template."""
+    cursor = traced_conn.cursor()
+    cursor.execute("INSERT INTO meals (meal) VALUES (?)", ("Pizza",))
+    traced_conn.execute("INSERT INTO meals (meal) VALUES (?)", ("Tacos",))
+    cursor.executemany("INSERT INTO meals (meal) VALUES (?)", [("Sushi",), ("Ramen",)])
+    cursor.execute("SELECT id FROM meals WHERE meal IN (?, ?)", ("Pizza", "Tacos"))
+
+    stats = {entry['statement']: entry for entry in get_sql_trace_stats()}
+
+    assert stats["INSERT INTO meals (meal) VALUES (?)"]['count'] == 3
+    assert stats["SELECT id FROM meals WHERE meal IN (?...)"]['count'] == 1
+    assert cursor.fetchall() == [(1,), (2,)]
+
+def test_slow_query_logged_with_plan(traced_conn, mocker, caplog):
+    """Test that statements over the threshold are logged with their query plan."""
+    mocker.patch.object(sql_trace, "SQL_SLOW_QUERY_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger="music_collection.utils.sql_trace.slow"):
+        traced_conn.execute("SELECT id FROM meals WHERE meal = ?", ("Pizza",)).fetchall()
+
+    assert "Slow query" in caplog.text
+    assert "SELECT id FROM meals WHERE meal = ?" in caplog.text
+    assert "sqlite_autoindex_meals_1" in caplog.text
+    stats = {entry['statement']: entry for entry in get_sql_trace_stats()}
+    assert stats["SELECT id FROM meals WHERE meal = ?"]['slow_count'] == 1